@@ -10,7 +10,7 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.tools import tool
 from langchain_core.runnables import RunnablePassthrough, RunnableSequence
 from langchain_core.callbacks.base import BaseCallbackHandler
-from langchain_openai import OpenAIEmbeddings
+from AIBookAgent.embedding_provider import get_embedding_provider
 
 
 # Streamlit 페이지 설정
@@ -42,7 +42,7 @@ st.markdown(
 load_dotenv()
 
 # 임베딩 모델 초기화
-embedding_model = OpenAIEmbeddings(model=os.getenv("OPENAI_EMBEDDING_MODEL"))
+embedding_model = get_embedding_provider().embeddings  # RAG_EMBEDDING_PROVIDER (openai, hashing)
 
 # 환경 변수에서 OpenAI API 키를 불러오기
 openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -58,7 +58,8 @@ NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
 if not NAVER_CLIENT_SECRET:
     print("NAVER_CLIENT_SECRET 환경 변수를 설정해주세요.")
 
-NAVER_BOOKS_URL = "https://openapi.naver.com/v1/search/book.json?"
+# 부하/지연 테스트 때는 로컬 대역 서버(benchmarks/api_stand_in.py)를 가리키도록 바꿀 수 있음
+NAVER_BOOKS_URL = os.getenv("NAVER_BOOKS_URL", "https://openapi.naver.com/v1/search/book.json?")
 
 
 # 도서 검색
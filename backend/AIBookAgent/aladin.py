@@ -1,11 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from AIBookAgent import metrics
+from AIBookAgent.aladin_cache import AladinCache
+from AIBookAgent.aladin_scheduler import AladinScheduler
+from AIBookAgent.embedding_cache import normalize_query
+from typing import Callable, Dict, List, Optional
 from dotenv import load_dotenv
+import threading
 import requests
 import json
+import time
 import os
 
 load_dotenv()
 
 ALADIN_API_KEY = os.getenv("ALADIN_API_KEY")
+ALADIN_CONCURRENCY = int(os.getenv("ALADIN_CONCURRENCY", "8"))  # 동시에 보내는 ItemLookUp 요청 수
+ALADIN_CONNECT_TIMEOUT = float(os.getenv("ALADIN_CONNECT_TIMEOUT", "3"))
+ALADIN_READ_TIMEOUT = float(os.getenv("ALADIN_READ_TIMEOUT", "5"))
+
+# 부하/지연 테스트 때는 로컬 대역 서버(benchmarks/api_stand_in.py)를 가리키도록 바꿀 수 있음
+ALADIN_API_BASE_URL = os.getenv("ALADIN_API_BASE_URL", "http://www.aladin.co.kr/ttb/api").rstrip("/")
+
+ITEM_SEARCH_URL = f"{ALADIN_API_BASE_URL}/ItemSearch.aspx"
+ITEM_LOOKUP_URL = f"{ALADIN_API_BASE_URL}/ItemLookUp.aspx"
+ITEM_LIST_URL = f"{ALADIN_API_BASE_URL}/ItemList.aspx"
+ITEM_LIST_MAX_RESULTS = 50  # ItemList 한 페이지의 최대 상품 수
+
+# 알라딘 API 호출용 keep-alive 세션 (프로세스 공용, 처음 사용할 때 생성)
+# - 연결 풀 크기를 동시 요청 수에 맞춰서 요청마다 TCP 연결을 새로 맺지 않음
+_session = None
+_session_lock = threading.Lock()
+# 여러 권의 ItemLookUp을 동시에 보내기 위한 스레드 풀 (동시 요청 수 제한)
+_lookup_pool = ThreadPoolExecutor(max_workers=ALADIN_CONCURRENCY, thread_name_prefix="aladin")
+# 검색 결과와 책 정보 영구 캐시 (ALADIN_CACHE_* 설정)
+response_cache = AladinCache()
+# 요청 한도, 동일 요청 합치기, 재시도, 차단 (ALADIN_RATE_*, ALADIN_BREAKER_* 등 설정)
+scheduler = AladinScheduler()
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=ALADIN_CONCURRENCY)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _request(name: str, url: str, params: Dict) -> requests.Response:
+    """
+    스케줄러를 거쳐 GET 요청
+    - 알라딘이 차단 중이거나 요청 한도 대기 시간을 넘으면 AladinUnavailable
+    - 재시도 후에도 실패하면 requests.RequestException
+    """
+    key = (url, json.dumps({k: v for k, v in params.items() if k != "ttbkey"}, sort_keys=True, ensure_ascii=False))
+    return scheduler.request(key, lambda: _send(name, url, params))
+
+
+def _send(name: str, url: str, params: Dict) -> requests.Response:
+    """세션으로 GET 요청 (연결/읽기 시간 제한 적용, 소요 시간은 metrics의 aladin.<name>에 기록)"""
+    start = time.perf_counter()
+    try:
+        return get_session().get(url=url, params=params, timeout=(ALADIN_CONNECT_TIMEOUT, ALADIN_READ_TIMEOUT))
+    except requests.RequestException:
+        metrics.incr(f"aladin.{name}.error")
+        raise
+    finally:
+        metrics.observe(f"aladin.{name}", time.perf_counter() - start)
+
+
+def _parse_js(text: str) -> Dict:
+    """알라딘 JS 응답을 JSON으로 변환 (마지막의 ;를 빼고 역슬래시를 이스케이프)"""
+    return json.loads(rf"{text[:-1]}".replace('\\', '\\\\'))
+
 
 def get_isbn13(query, k):
     """
@@ -25,12 +97,6 @@ def get_isbn13(query, k):
     2. Response
     - item: 상품 정보 
     """
-    # 검색된 도서를 담을 리스트 생성 
-    isbns = []
-
-    # API URL
-    get_isbn_url = "http://www.aladin.co.kr/ttb/api/ItemSearch.aspx"
-
     # Request 정의
     isbn_params = {
         "ttbkey": ALADIN_API_KEY,
@@ -38,17 +104,28 @@ def get_isbn13(query, k):
         "QueryType": "Keyword",  # 제목&저자 검색
         "SearchTarget": "Book",
         "start": 1,
-        "MaxResult": k,
+        "MaxResults": k,
         "output": "js",  # JSON 형식 
     }
 
+    # 같은 (검색어, QueryType, MaxResults)의 결과는 캐시에서 반환
+    key = json.dumps(
+        [normalize_query(query).casefold(), isbn_params["QueryType"], isbn_params["SearchTarget"], k],
+        ensure_ascii=False,
+    )
+    return response_cache.get_or_fetch("search", key, lambda: _fetch_isbn13(isbn_params))
+
+def _fetch_isbn13(isbn_params: Dict) -> List[Dict]:
+    # 검색된 도서를 담을 리스트 생성
+    isbns = []
+
     # GET 요청 
-    isbn_response = requests.get(url=get_isbn_url, params=isbn_params)
+    isbn_response = _request("item_search", ITEM_SEARCH_URL, isbn_params)
 
     # 응답 확인 
     if isbn_response.status_code == 200:
         # json으로 변환 
-        json_data = json.loads(rf"{isbn_response.text[:-1]}".replace('\\', '\\\\'))  # 마지막에 ;를 빼기 위함 
+        json_data = _parse_js(isbn_response.text)  # 마지막에 ;를 빼기 위함
         
         # 도서 정보 추출 
         json_data_items = json_data["item"]
@@ -62,6 +139,51 @@ def get_isbn13(query, k):
 
     return isbns
 
+def get_book(isbn13: str, before_request: Callable[[], None] = None) -> Optional[Dict]:
+    """
+    ISBN13 한 권의 제목, 저자, 분야, 목차 등 (응답을 해석할 수 없으면 None, 캐시된 값이 있으면 캐시에서 반환)
+    - before_request: 캐시에 없어서 실제로 요청하기 직전에 호출 (동기화 작업의 요청 수/속도 제한용)
+    """
+    def fetch():
+        if before_request is not None:
+            before_request()
+        return _fetch_book(isbn13)
+
+    return response_cache.get_or_fetch("lookup", isbn13, fetch)
+
+def _fetch_book(isbn13: str) -> Optional[Dict]:
+    # Request 정의
+    toc_params = {
+        "ttbkey": ALADIN_API_KEY,
+        "ItemId": isbn13,
+        "ItemIdType": "ISBN13",
+        "Output": "js",  # JSON 형식
+        "OptResult": ["Toc", "categoryIdList"]
+    }
+
+    # GET 요청
+    toc_response = _request("item_lookup", ITEM_LOOKUP_URL, toc_params)
+
+    # 응답 확인
+    if toc_response.status_code != 200:
+        raise Exception(f"목차 요청 실패: {toc_response.status_code}")
+
+    try:
+        # json으로 변환
+        json_data = _parse_js(toc_response.text)["item"][0]
+
+        # 목차 추출
+        return {
+            'title': json_data['title'],
+            'author': json_data['author'],
+            'pubDate': json_data['pubDate'],
+            'description': json_data['description'],
+            'categoryName': json_data['categoryName'],
+            'toc': json_data['bookinfo']['toc'],
+        }
+    except Exception:
+        return None
+
 def get_books(isbns):
     """
     검색된 isbn13으로 책의 제목과 목차를 얻어오는 함수 
@@ -76,51 +198,48 @@ def get_books(isbns):
 
     2. Response
     - item: 상품 정보 
+
+    여러 권은 스레드 풀에서 동시에(최대 ALADIN_CONCURRENCY개) 요청하므로 전체 소요 시간은 대략 요청 한 번
+    결과는 입력 순서대로 반환하고, 해석할 수 없는 응답은 건너뜀
     """
-    # API URL
-    get_toc_url = "http://www.aladin.co.kr/ttb/api/ItemLookUp.aspx"
-
-    # 검색된 도서의 목차들을 담을 리스트 생성  
-    tocs = []
-
-    for isbn in isbns:
-        # Request 정의
-        toc_params = {
-            "ttbkey": ALADIN_API_KEY,
-            "ItemId": isbn["isbn13"],
-            "ItemIdType": "ISBN13",
-            "Output": "js",  # JSON 형식 
-            "OptResult": ["Toc", "categoryIdList"]
-        }
+    start = time.perf_counter()
+    # 검색된 도서의 목차들을 담을 리스트 생성
+    futures = [_lookup_pool.submit(get_book, isbn["isbn13"]) for isbn in isbns]
+    tocs = [book for book in (future.result() for future in futures) if book is not None]
+    metrics.observe("aladin.get_books", time.perf_counter() - start)
+    return tocs
+
+def get_item_list(category_id: int, page: int = 1, query_type: str = "ItemNewAll", k: int = ITEM_LIST_MAX_RESULTS) -> Dict:
+    """
+    분야별 상품 리스트 한 페이지 (알라딘 OpenAPI 메뉴얼의 상품 리스트 API, 캐시하지 않음)
 
-        # GET 요청 
-        toc_response = requests.get(url=get_toc_url, params=toc_params)
-
-        # 응답 확인 
-        if toc_response.status_code == 200:
-            try:
-                # json으로 변환
-                json_data = json.loads(rf"{toc_response.text[:-1]}".replace('\\', '\\\\'))["item"][0]
-                
-                # 목차 추출 
-                json_data_item = {
-                    'title': json_data['title'],
-                    'author': json_data['author'],
-                    'pubDate': json_data['pubDate'],
-                    'description': json_data['description'],
-                    'categoryName': json_data['categoryName'],
-                    'toc': json_data['bookinfo']['toc'],
-                }
-                tocs.append(json_data_item)
-            except Exception:
-                continue
+    1. Request
+    - QueryType: 리스트 종류 (ItemNewAll: 신간 전체, Bestseller: 베스트셀러 등)
+    - CategoryId: 분야 CID
+    - start: 페이지 번호 (1부터)
+    - MaxResults: 한 페이지 당 최대 출력 개수 (최대 50)
 
-        else:
-            raise Exception(f"목차 요청 실패: {toc_response.status_code}")
+    2. Response
+    - totalResults: 전체 상품 수
+    - item: 상품 정보 (isbn13 포함)
+    """
+    list_params = {
+        "ttbkey": ALADIN_API_KEY,
+        "QueryType": query_type,
+        "CategoryId": category_id,
+        "SearchTarget": "Book",
+        "start": page,
+        "MaxResults": k,
+        "output": "js",  # JSON 형식
+        "Version": "20131101",
+    }
 
-    return tocs
+    list_response = _request("item_list", ITEM_LIST_URL, list_params)
+    if list_response.status_code != 200:
+        raise Exception(f"상품 리스트 요청 실패: {list_response.status_code}")
+    return _parse_js(list_response.text)
 
 def search_aladin(query, k):
     isbns = get_isbn13(query, k)
     books = get_books(isbns)
-    return books
\ No newline at end of file
+    return books
@@ -0,0 +1,193 @@
+from concurrent.futures import ThreadPoolExecutor
+from AIBookAgent import metrics
+from typing import Any, Callable, Dict, Optional
+from dotenv import load_dotenv
+import threading
+import sqlite3
+import json
+import time
+import os
+
+load_dotenv()
+
+ALADIN_CACHE_PATH = os.path.abspath(os.getenv("ALADIN_CACHE_PATH", "./AIBookAgent/cache/aladin.sqlite3"))
+ALADIN_CACHE_SIZE = int(os.getenv("ALADIN_CACHE_SIZE", "100000"))
+# 종류별 (신선한 기간, 만료 후에도 옛 값을 주면서 백그라운드에서 갱신하는 기간) 초
+# - search: ItemSearch 검색 결과 (신간이 들어오므로 짧게)
+# - lookup: ItemLookUp 책 정보와 목차 (거의 바뀌지 않으므로 길게)
+ALADIN_CACHE_TTLS = {
+    "search": (
+        float(os.getenv("ALADIN_CACHE_TTL_SEARCH", str(24 * 3600))),
+        float(os.getenv("ALADIN_CACHE_STALE_SEARCH", str(7 * 24 * 3600))),
+    ),
+    "lookup": (
+        float(os.getenv("ALADIN_CACHE_TTL_LOOKUP", str(30 * 24 * 3600))),
+        float(os.getenv("ALADIN_CACHE_STALE_LOOKUP", str(90 * 24 * 3600))),
+    ),
+}
+
+
+class AladinCache:
+    """
+    알라딘 API 응답 영구 캐시 (SQLite, 워커 간 공유, 재시작 후에도 유지)
+    - 키는 (종류, 요청 키). 검색은 (검색어, QueryType, MaxResults 등), 책 정보는 ISBN13
+    - 신선한 기간 안이면 API를 호출하지 않고 반환
+    - 신선한 기간이 지났어도 갱신 기간 안이면 옛 값을 바로 반환하고 백그라운드 스레드에서 다시 받아옴
+      (stale-while-revalidate. 같은 키는 한 번만 갱신)
+    - 갱신 기간까지 지났거나 없으면 바로 API 호출
+    - 최대 개수를 넘으면 오래 사용하지 않은 항목부터 삭제
+    - 적중/만료 적중/실패 횟수는 metrics의 aladin_cache.<종류>.hit / stale / miss에 기록
+    """
+
+    def __init__(
+        self,
+        cache_path: str = ALADIN_CACHE_PATH,
+        max_size: int = ALADIN_CACHE_SIZE,
+        ttls: Dict[str, tuple] = None,
+    ):
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self.ttls = ALADIN_CACHE_TTLS if ttls is None else ttls
+        self._conn = None
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._refreshing = set()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="aladin-refresh")
+
+    # 1. 저장소 (SQLite)
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """(lock을 잡은 상태에서 호출) 처음 사용할 때 연결. 열 수 없으면 캐시 없이 동작"""
+        if self._conn is not None or self.cache_path is None:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            conn = sqlite3.connect(self.cache_path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS aladin_responses (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_aladin_responses_last_used ON aladin_responses(last_used)")
+            self._conn = conn
+        except sqlite3.Error as e:
+            print(f"⚠️ 알라딘 캐시를 열 수 없습니다. 캐시 없이 API를 호출합니다: {str(e)}")
+            self.cache_path = None
+        return self._conn
+
+    def get(self, kind: str, key: str):
+        """(값, 받아온 뒤 지난 시간(초)). 없으면 (None, None)"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                if conn is None:
+                    return None, None
+                row = conn.execute(
+                    "SELECT value, fetched_at FROM aladin_responses WHERE kind = ? AND key = ?", (kind, key)
+                ).fetchone()
+                if row is None:
+                    return None, None
+                now = time.time()
+                conn.execute(
+                    "UPDATE aladin_responses SET last_used = ? WHERE kind = ? AND key = ?", (now, kind, key)
+                )
+        except sqlite3.Error:
+            return None, None
+        return json.loads(row[0]), now - row[1]
+
+    def put(self, kind: str, key: str, value: Any):
+        try:
+            with self._lock:
+                conn = self._connect()
+                if conn is None:
+                    return
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO aladin_responses (kind, key, value, fetched_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (kind, key, json.dumps(value, ensure_ascii=False), now, now),
+                )
+                self._inserts += 1
+                # 삽입 100번마다 크기 제한을 넘은 만큼 오래된 항목 삭제
+                if self._inserts % 100 == 0:
+                    self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"⚠️ 알라딘 캐시 저장 실패: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        (count,) = conn.execute("SELECT COUNT(*) FROM aladin_responses").fetchone()
+        if count > self.max_size:
+            conn.execute(
+                """
+                DELETE FROM aladin_responses WHERE rowid IN (
+                    SELECT rowid FROM aladin_responses ORDER BY last_used LIMIT ?
+                )
+                """,
+                (count - self.max_size,),
+            )
+            metrics.incr("aladin_cache.evicted", count - self.max_size)
+
+    # 2. 조회 (stale-while-revalidate)
+    def get_or_fetch(self, kind: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """
+        캐시에서 찾고, 없거나 너무 오래됐으면 fetch()로 받아와서 저장
+        - fetch()가 None을 반환하면(해석할 수 없는 응답 등) 저장하지 않음
+        """
+        fresh_ttl, stale_ttl = self.ttls[kind]
+        value, age = self.get(kind, key)
+        if value is not None and age < fresh_ttl:
+            metrics.incr(f"aladin_cache.{kind}.hit")
+            return value
+        if value is not None and age < fresh_ttl + stale_ttl:
+            metrics.incr(f"aladin_cache.{kind}.stale")
+            self._refresh(kind, key, fetch)
+            return value
+
+        metrics.incr(f"aladin_cache.{kind}.miss")
+        value = fetch()
+        if value is not None:
+            self.put(kind, key, value)
+        return value
+
+    def _refresh(self, kind: str, key: str, fetch: Callable[[], Any]):
+        """백그라운드에서 다시 받아와 저장 (같은 키를 갱신 중이면 건너뜀)"""
+        with self._lock:
+            if (kind, key) in self._refreshing:
+                return
+            self._refreshing.add((kind, key))
+
+        def refresh():
+            try:
+                value = fetch()
+                if value is not None:
+                    self.put(kind, key, value)
+                    metrics.incr(f"aladin_cache.{kind}.refreshed")
+            except Exception as e:
+                # 갱신에 실패해도 옛 값은 남아 있으므로 다음 요청에서 다시 시도
+                metrics.incr(f"aladin_cache.{kind}.refresh_error")
+                print(f"⚠️ 알라딘 캐시 갱신 실패 ({kind}, {key}): {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard((kind, key))
+
+        self._refresh_pool.submit(refresh)
+
+    def stats(self) -> Dict:
+        """종류별 적중/만료 적중/미스 횟수와 적중률"""
+        counters = metrics.snapshot()["counters"]
+        return {
+            kind: {
+                "hit": counters.get(f"aladin_cache.{kind}.hit", 0),
+                "stale": counters.get(f"aladin_cache.{kind}.stale", 0),
+                "miss": counters.get(f"aladin_cache.{kind}.miss", 0),
+                "hit_rate": metrics.hit_rate(f"aladin_cache.{kind}"),
+            }
+            for kind in self.ttls
+        }
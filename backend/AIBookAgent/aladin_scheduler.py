@@ -0,0 +1,260 @@
+from AIBookAgent import metrics
+from AIBookAgent.result_cache import SingleFlight
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+from typing import Callable, Hashable, Optional
+from dotenv import load_dotenv
+import threading
+import requests
+import sqlite3
+import time
+import os
+
+load_dotenv()
+
+ALADIN_RATE_LIMIT_PATH = os.path.abspath(
+    os.getenv("ALADIN_RATE_LIMIT_PATH", "./AIBookAgent/cache/aladin_rate.sqlite3")
+)
+ALADIN_RATE_LIMIT = float(os.getenv("ALADIN_RATE_LIMIT", "5"))  # 모든 워커를 합친 초당 요청 수
+ALADIN_RATE_BURST = float(os.getenv("ALADIN_RATE_BURST", "10"))  # 한 번에 몰아서 보낼 수 있는 요청 수
+ALADIN_MAX_QUEUE_WAIT = float(os.getenv("ALADIN_MAX_QUEUE_WAIT", "2"))  # 요청 차례를 기다리는 최대 시간(초)
+ALADIN_RETRY_ATTEMPTS = int(os.getenv("ALADIN_RETRY_ATTEMPTS", "3"))
+ALADIN_BREAKER_FAILURES = int(os.getenv("ALADIN_BREAKER_FAILURES", "5"))  # 연속 실패가 이만큼이면 차단
+ALADIN_BREAKER_RESET = float(os.getenv("ALADIN_BREAKER_RESET", "30"))  # 차단 후 다시 시도해 보기까지의 시간(초)
+ALADIN_SLOW_CALL_SECONDS = float(os.getenv("ALADIN_SLOW_CALL_SECONDS", "3"))  # 이보다 오래 걸린 응답은 실패로 셈
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AladinUnavailable(Exception):
+    """알라딘 API를 지금 호출할 수 없음 (차단 중이거나 요청 한도 대기 시간 초과). 로컬 결과로 대신해야 함"""
+
+
+class TokenBucket:
+    """
+    워커 간에 공유하는 토큰 버킷 요청 한도 (상태는 SQLite 한 행)
+    - 요청마다 토큰을 하나씩 미리 가져가고(음수가 될 수 있음), 모자란 만큼 기다렸다가 보냄
+      그래서 기다리는 요청들은 들어온 순서대로 rate 간격으로 나감
+    - 기다려야 하는 시간이 max_wait보다 길면 토큰을 가져가지 않고 AladinUnavailable
+    - SQLite를 열 수 없으면 프로세스 안에서만 제한
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float = ALADIN_RATE_LIMIT,
+        burst: float = ALADIN_RATE_BURST,
+        path: str = ALADIN_RATE_LIMIT_PATH,
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._tokens, self._updated_at = burst, time.time()  # SQLite를 쓰지 못할 때의 상태
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self.path is None:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS token_buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn = conn
+        except sqlite3.Error as e:
+            print(f"⚠️ 요청 한도 저장소를 열 수 없습니다. 프로세스 안에서만 제한합니다: {str(e)}")
+            self.path = None
+        return self._conn
+
+    def _reserve(self, tokens: float, updated_at: float, now: float, max_wait: float):
+        """(남은 토큰, 기다릴 시간). 기다릴 시간이 max_wait보다 길면 토큰은 그대로"""
+        tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+        wait = max(0.0, (1 - tokens) / self.rate)
+        if wait > max_wait:
+            return tokens, None
+        return tokens - 1, wait
+
+    def _take(self, max_wait: float) -> Optional[float]:
+        """토큰 하나를 예약하고 기다릴 시간을 반환. 한도를 넘으면 None"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    # 다른 워커와 동시에 갱신하지 않도록 쓰기 잠금을 잡고 읽음
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        row = conn.execute(
+                            "SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (self.name,)
+                        ).fetchone()
+                        tokens, updated_at = row if row is not None else (self.burst, now)
+                        tokens, wait = self._reserve(tokens, updated_at, now, max_wait)
+                        conn.execute(
+                            "INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                            (self.name, tokens, now),
+                        )
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                    return wait
+                except sqlite3.Error as e:
+                    print(f"⚠️ 요청 한도 확인 실패. 프로세스 안에서만 제한합니다: {str(e)}")
+
+            self._tokens, wait = self._reserve(self._tokens, self._updated_at, now, max_wait)
+            self._updated_at = now
+            return wait
+
+    def acquire(self, max_wait: float = ALADIN_MAX_QUEUE_WAIT) -> float:
+        """차례가 올 때까지 기다리고 기다린 시간(초)을 반환"""
+        if self.rate <= 0:
+            return 0.0
+        wait = self._take(max_wait)
+        if wait is None:
+            metrics.incr(f"{self.name}.rejected")
+            raise AladinUnavailable(f"요청 한도 초과: {max_wait}초 안에 보낼 수 없습니다")
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번이면 reset_timeout초 동안 호출을 막음 (바로 AladinUnavailable)
+    - 시간이 지나면 한 번만 시험 호출을 허용하고(half open), 성공하면 다시 열고 실패하면 다시 막음
+    - 상태는 metrics의 {name}.state 게이지에 기록 (0: 정상, 1: 차단, 2: 시험 중)
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = ALADIN_BREAKER_FAILURES,
+        reset_timeout: float = ALADIN_BREAKER_RESET,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: int):
+        self.state = state
+        metrics.set_gauge(f"{self.name}.state", state)
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            # 시험 호출이 끝나지 않은 채로(요청 한도 초과 등) reset_timeout이 지나도 다시 시험 호출 허용
+            now = time.monotonic()
+            if now - self._opened_at >= self.reset_timeout:
+                self._opened_at = now
+                self._set_state(self.HALF_OPEN)
+                return
+        metrics.incr(f"{self.name}.rejected")
+        raise AladinUnavailable("알라딘 API 호출이 잠시 차단되었습니다 (연속 실패)")
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    metrics.incr(f"{self.name}.opened")
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+
+
+def _retryable(e: BaseException) -> bool:
+    """네트워크 오류와 429/5xx 응답만 다시 시도 (차단/요청 한도 초과는 바로 실패)"""
+    return isinstance(e, requests.RequestException)
+
+
+class AladinScheduler:
+    """
+    알라딘 API로 나가는 요청을 한 곳에서 관리
+    1. 같은 요청이 동시에 들어오면 한 번만 보내고 응답을 나눠 가짐 (SingleFlight)
+    2. 차단 중이면 바로 AladinUnavailable (CircuitBreaker)
+    3. 워커 간 공유 토큰 버킷으로 초당 요청 수 제한 (TokenBucket)
+    4. 네트워크 오류와 429/5xx 응답은 무작위 지수 백오프로 다시 시도
+    - 대기 중인 요청 수는 aladin.scheduler.queue_depth 게이지, 대기 시간은 aladin.scheduler.wait에 기록
+    """
+
+    def __init__(self, name: str = "aladin", attempts: int = ALADIN_RETRY_ATTEMPTS):
+        self.name = name
+        self.attempts = attempts
+        self.bucket = TokenBucket(f"{name}.rate_limit")
+        self.breaker = CircuitBreaker(f"{name}.circuit")
+        self._flight = SingleFlight(f"{name}.scheduler")
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def request(self, key: Hashable, send: Callable[[], requests.Response]) -> requests.Response:
+        """send()로 요청을 보내고 응답을 반환. 같은 key의 요청은 하나로 합침"""
+        return self._flight.do(key, lambda: self._send_with_retry(send))
+
+    def _send_with_retry(self, send: Callable[[], requests.Response]) -> requests.Response:
+        @retry(
+            stop=stop_after_attempt(self.attempts),
+            wait=wait_random_exponential(multiplier=0.2, max=2),
+            retry=retry_if_exception(_retryable),
+            before_sleep=lambda _: metrics.incr(f"{self.name}.scheduler.retries"),
+            reraise=True,
+        )
+        def call():
+            return self._send(send)
+
+        return call()
+
+    def _send(self, send: Callable[[], requests.Response]) -> requests.Response:
+        self.breaker.before_call()
+        self._wait_turn()
+
+        start = time.perf_counter()
+        try:
+            response = send()
+        except requests.RequestException:
+            self.breaker.record_failure()
+            raise
+        elapsed = time.perf_counter() - start
+
+        if response.status_code in RETRY_STATUS_CODES:
+            self.breaker.record_failure()
+            raise requests.HTTPError(f"알라딘 응답 오류: {response.status_code}", response=response)
+        # 응답은 왔지만 너무 느리면 실패로 세서 계속 느릴 때 차단되도록 함
+        if elapsed > ALADIN_SLOW_CALL_SECONDS:
+            metrics.incr(f"{self.name}.scheduler.slow")
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _wait_turn(self):
+        with self._lock:
+            self._waiting += 1
+            metrics.set_gauge(f"{self.name}.scheduler.queue_depth", self._waiting)
+        try:
+            wait = self.bucket.acquire()
+            metrics.observe(f"{self.name}.scheduler.wait", wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+                metrics.set_gauge(f"{self.name}.scheduler.queue_depth", self._waiting)
@@ -0,0 +1,132 @@
+"""
+알라딘 검색(search_aladin) 부하/지연 벤치마크 (로컬 대역 서버 사용, 실제 API 호출 없음)
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.aladin_benchmark --requests 200 --concurrency 16
+    python -m AIBookAgent.benchmarks.aladin_benchmark --latency lognormal:0.1,0.5 --tail 0.02:4 --error-rate 0.05
+    python -m AIBookAgent.benchmarks.aladin_benchmark --rate-limit 10 --repeat 0.5
+
+- api_stand_in 대역 서버를 같은 프로세스에서 띄우고 ALADIN_API_BASE_URL을 그 주소로 바꾼 뒤 aladin 모듈을 불러옴
+- 응답 캐시와 요청 한도 상태는 임시 디렉토리를 사용 (--repeat 비율만큼 이미 보낸 검색어를 다시 보내 캐시 효과 측정)
+- 요청별 소요 시간 p50/p95/p99, 실패 종류별 수, 스케줄러 지표(재시도, 대기, 차단)와 대역 서버가 받은 요청 수를 출력
+- 결과는 실행 설정과 함께 JSON으로 저장 (--output)
+"""
+from AIBookAgent import metrics
+from AIBookAgent.benchmarks.api_stand_in import LatencyModel, load_catalog, start_server
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+import argparse
+import tempfile
+import random
+import json
+import time
+import os
+
+
+def run(args) -> dict:
+    catalog = load_catalog(args.data, args.books, args.seed)
+    server = start_server(
+        catalog,
+        latency=LatencyModel(args.latency, args.tail),
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+    tmp = tempfile.mkdtemp(prefix="aladin-benchmark-")
+    # aladin 모듈은 불러올 때 설정을 읽으므로 환경 변수를 먼저 바꿈
+    os.environ["ALADIN_API_BASE_URL"] = server.aladin_base_url
+    os.environ["ALADIN_CACHE_PATH"] = os.path.join(tmp, "aladin.sqlite3")
+    os.environ["ALADIN_RATE_LIMIT_PATH"] = os.path.join(tmp, "aladin_rate.sqlite3")
+    from AIBookAgent import aladin
+
+    rng = random.Random(args.seed)
+    queries = []
+    for _ in range(args.requests):
+        if queries and rng.random() < args.repeat:
+            queries.append(rng.choice(queries))
+        else:
+            queries.append(" ".join(rng.choice(catalog.books)["title"].split()[:2]))
+
+    def search(query: str):
+        start = time.perf_counter()
+        try:
+            aladin.search_aladin(query, args.k)
+            error = None
+        except Exception as e:
+            error = type(e).__name__
+        return time.perf_counter() - start, error
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(search, queries))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    latencies = np.asarray([seconds for seconds, _ in results]) * 1000
+    errors = {}
+    for _, error in results:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    snapshot = metrics.snapshot()
+    wait = snapshot["timings"].get("aladin.scheduler.wait", {})
+    return {
+        "requests": len(results),
+        "throughput": len(results) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+        "errors": errors,
+        "cache": aladin.response_cache.stats(),
+        "scheduler": {
+            "coalesced": snapshot["counters"].get("aladin.scheduler.coalesced", 0),
+            "retries": snapshot["counters"].get("aladin.scheduler.retries", 0),
+            "wait_p95_ms": wait.get("p95", 0) * 1000,
+            "rate_limited": snapshot["counters"].get("aladin.rate_limit.rejected", 0),
+            "circuit_opened": snapshot["counters"].get("aladin.circuit.opened", 0),
+            "circuit_rejected": snapshot["counters"].get("aladin.circuit.rejected", 0),
+        },
+        "stand_in_requests": {
+            name: value for name, value in snapshot["counters"].items() if name.startswith("stand_in.")
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="알라딘 검색 부하/지연 벤치마크 (로컬 대역 서버)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=float, default=0.0, help="이미 보낸 검색어를 다시 보낼 비율")
+    parser.add_argument("--data", default=None, help="기록해 둔 책 JSON / JSONL 디렉토리 (없으면 가짜 카탈로그)")
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--latency", default="lognormal:0.1,0.4")
+    parser.add_argument("--tail", default=None, help="확률:초 (예: 0.01:3)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="대역 서버의 초당 요청 한도 (0이면 제한 없음)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: AIBookAgent/cache/benchmarks/aladin-<시각>.json)")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(
+        f"요청 {result['requests']}개, 처리량 {result['throughput']:.1f}/s, "
+        f"p50 {result['p50_ms']:.0f}ms, p95 {result['p95_ms']:.0f}ms, p99 {result['p99_ms']:.0f}ms, "
+        f"최대 {result['max_ms']:.0f}ms"
+    )
+    print(f"실패: {result['errors'] or '없음'}")
+    print(f"스케줄러: {result['scheduler']}")
+    print(f"캐시: {result['cache']}")
+
+    output = args.output or os.path.abspath(
+        f"./AIBookAgent/cache/benchmarks/aladin-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"settings": vars(args), "result": result}, f, ensure_ascii=False, indent=2)
+    print(f"✅ 결과를 {output}에 저장했습니다.")
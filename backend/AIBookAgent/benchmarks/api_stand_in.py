@@ -0,0 +1,385 @@
+"""
+알라딘 / 네이버 도서 검색 API 로컬 대역 서버 (실제 API와 한도를 쓰지 않는 부하/지연 테스트용)
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.api_stand_in --port 8081 --books 5000
+    python -m AIBookAgent.benchmarks.api_stand_in --latency lognormal:0.15,0.6 --tail 0.01:3 --error-rate 0.02 --rate-limit 20
+    python -m AIBookAgent.benchmarks.api_stand_in --data ./AIBookAgent/books
+
+    클라이언트 설정 (.env 또는 환경 변수):
+    ALADIN_API_BASE_URL=http://127.0.0.1:8081/ttb/api
+    NAVER_BOOKS_URL=http://127.0.0.1:8081/v1/search/book.json
+
+- 알라딘 ItemSearch / ItemLookUp / ItemList: 실제 API처럼 JS 응답 끝에 ;를 붙이고 역슬래시를 이스케이프하지 않음
+  ItemSearch/ItemList 페이지 크기는 MaxResults(기본 10, 최대 50), start는 페이지 번호
+- 네이버 /v1/search/book.json: query, display(최대 100), start(1부터), X-Naver-Client-Id 헤더가 없으면 401
+- 데이터: 기본은 synthetic.make_catalog의 가짜 카탈로그, --data를 주면 기록해 둔 책 JSON / JSONL 디렉토리
+- 지연시간 분포(--latency): fixed:초, uniform:최소,최대, normal:평균,표준편차, lognormal:중앙값,sigma
+  --tail 확률:초를 주면 그 확률로 지연이 더해짐 (꼬리 지연 재현)
+- 오류: --error-rate 비율만큼 --error-status(기본 503) 응답, --hang-rate 비율만큼 --hang-seconds 동안 응답하지 않음
+- 요청 한도: --rate-limit 초당 요청 수를 넘으면 429
+- GET /_stats: 엔드포인트별 요청 수, 상태 코드별 수, 지연시간 요약 (metrics의 stand_in.*)
+- 코드에서 쓸 때는 start_server(...)로 백그라운드 스레드에서 띄우고 server.aladin_base_url / server.naver_books_url 사용
+"""
+from AIBookAgent import metrics
+from AIBookAgent.benchmarks.synthetic import make_catalog
+from AIBookAgent.book_loader import iter_books
+from AIBookAgent.categories import load_categories
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.utils import formatdate
+from urllib.parse import parse_qs, urlparse
+from typing import Dict, List, Optional, Tuple
+import threading
+import argparse
+import random
+import json
+import time
+
+ALADIN_MAX_RESULTS = 50
+NAVER_MAX_DISPLAY = 100
+NAVER_MAX_START = 1000
+
+
+class LatencyModel:
+    """응답 지연시간 분포 (초)"""
+
+    def __init__(self, spec: str = "fixed:0", tail: Optional[str] = None):
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(value) for value in args.split(",") if value]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"알 수 없는 지연시간 분포입니다: {spec}")
+        self.tail = tuple(float(value) for value in tail.split(":")) if tail else None  # (확률, 추가 지연)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            delay = self.args[0] if self.args else 0.0
+        elif self.kind == "uniform":
+            delay = rng.uniform(*self.args)
+        elif self.kind == "normal":
+            delay = rng.gauss(*self.args)
+        else:
+            median, sigma = self.args
+            delay = median * rng.lognormvariate(0, sigma)
+        if self.tail and rng.random() < self.tail[0]:
+            delay += self.tail[1]
+        return max(0.0, delay)
+
+
+class StandInCatalog:
+    """대역 서버가 응답할 책 목록 (알라딘 ItemLookUp 결과와 같은 필드: title, author, isbn13, categoryName, toc 등)"""
+
+    def __init__(self, books: List[Dict]):
+        self.books = [book for book in books if book.get("isbn13")]
+        self.by_isbn = {book["isbn13"]: book for book in self.books}
+        self._haystacks = [
+            " ".join(str(book.get(field, "")) for field in ("title", "author", "description")).casefold()
+            for book in self.books
+        ]
+        self._category_paths = {category["cid"]: category["path"] for category in load_categories()}
+
+    def search(self, query: str) -> List[Dict]:
+        """검색어 단어가 제목/저자/설명에 많이 들어간 순서 (같으면 목록 순서)"""
+        words = query.casefold().split()
+        scored = []
+        for i, haystack in enumerate(self._haystacks):
+            score = sum(word in haystack for word in words)
+            if score:
+                scored.append((-score, i))
+        return [self.books[i] for _, i in sorted(scored)]
+
+    def category(self, cid: int) -> List[Dict]:
+        """분야(하위 분야 포함)에 속한 책. 최근 출간 순 (ItemNewAll처럼)"""
+        path = self._category_paths.get(cid)
+        if path is None:
+            return []
+        books = [
+            book for book in self.books
+            if book.get("categoryName") == path or str(book.get("categoryName", "")).startswith(path + ">")
+        ]
+        return sorted(books, key=lambda book: str(book.get("pubDate", "")), reverse=True)
+
+
+def load_catalog(data_dir: Optional[str] = None, n_books: int = 5000, seed: int = 0) -> StandInCatalog:
+    if data_dir:
+        return StandInCatalog(list(iter_books(data_dir)))
+    books, _, _ = make_catalog(n_books, load_categories(), seed=seed)
+    return StandInCatalog(books)
+
+
+# 응답 형식
+def _aladin_item(book: Dict) -> Dict:
+    isbn13 = book["isbn13"]
+    return {
+        "title": book.get("title", ""),
+        "link": f"http://www.aladin.co.kr/shop/wproduct.aspx?ISBN={isbn13}",
+        "author": book.get("author", ""),
+        "pubDate": book.get("pubDate", ""),
+        "description": book.get("description", ""),
+        "isbn": isbn13[3:],
+        "isbn13": isbn13,
+        "itemId": int(isbn13[-9:]),
+        "priceSales": 18000,
+        "priceStandard": 20000,
+        "mallType": "BOOK",
+        "stockStatus": "",
+        "cover": "",
+        "categoryId": 0,
+        "categoryName": book.get("categoryName", ""),
+        "publisher": book.get("publisher", ""),
+        "adult": False,
+    }
+
+
+def _aladin_js(body: Dict) -> bytes:
+    """알라딘 JS 출력 형식: 끝에 ;가 붙고 문자열 안의 역슬래시를 이스케이프하지 않음"""
+    text = json.dumps(body, ensure_ascii=False).replace("\\\\", "\\")
+    return f"{text};".encode("utf-8")
+
+
+def _naver_item(book: Dict) -> Dict:
+    return {
+        "title": book.get("title", ""),
+        "link": f"https://search.shopping.naver.com/book/catalog/{book['isbn13']}",
+        "image": "",
+        "author": book.get("author", ""),
+        "discount": "18000",
+        "publisher": book.get("publisher", ""),
+        "pubdate": str(book.get("pubDate", "")).replace("-", ""),
+        "isbn": book["isbn13"],
+        "description": book.get("description", ""),
+    }
+
+
+def _int_param(params: Dict, name: str, default: int) -> int:
+    try:
+        return int(params.get(name, [default])[0])
+    except ValueError:
+        return default
+
+
+class StandInServer(ThreadingHTTPServer):
+    """알라딘 / 네이버 API 대역 HTTP 서버 (요청마다 스레드)"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        catalog: StandInCatalog,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: LatencyModel = None,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 30.0,
+        rate_limit: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__((host, port), _Handler)
+        self.catalog = catalog
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        # 요청 한도 토큰 버킷 (버스트는 1초 분량)
+        self.rate_limit = rate_limit
+        self._tokens, self._updated_at = max(1.0, rate_limit), time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def aladin_base_url(self) -> str:
+        return f"{self.base_url}/ttb/api"
+
+    @property
+    def naver_books_url(self) -> str:
+        return f"{self.base_url}/v1/search/book.json"
+
+    def admit(self) -> bool:
+        """요청 한도 안이면 토큰을 하나 쓰고 True (한도를 넘으면 429)"""
+        if self.rate_limit <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(max(1.0, self.rate_limit), self._tokens + (now - self._updated_at) * self.rate_limit)
+            self._updated_at = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def draw(self) -> Tuple[float, float, float]:
+        """요청 하나의 (지연시간, 오류 여부 난수, 무응답 여부 난수). 시드가 같으면 같은 순서로 재현됨"""
+        with self._lock:
+            return self.latency.sample(self._rng), self._rng.random(), self._rng.random()
+
+    # 엔드포인트
+    def item_search(self, params: Dict, headers) -> Tuple[int, bytes]:
+        query = params.get("Query", [""])[0]
+        page = max(1, _int_param(params, "start", 1))
+        size = min(ALADIN_MAX_RESULTS, max(1, _int_param(params, "MaxResults", 10)))
+        books = self.catalog.search(query)
+        return 200, _aladin_js({
+            "version": "20070901",
+            "title": f"알라딘 검색결과 - {query}",
+            "pubDate": formatdate(usegmt=True),
+            "totalResults": len(books),
+            "startIndex": page,
+            "itemsPerPage": size,
+            "query": query,
+            "item": [_aladin_item(book) for book in books[(page - 1) * size:page * size]],
+        })
+
+    def item_lookup(self, params: Dict, headers) -> Tuple[int, bytes]:
+        isbn13 = params.get("ItemId", [""])[0]
+        book = self.catalog.by_isbn.get(isbn13)
+        if book is None:
+            return 200, _aladin_js({"errorCode": 8, "errorMessage": "존재하지 않는 상품입니다."})
+        item = dict(_aladin_item(book), bookinfo={"toc": book.get("toc", "")}, subInfo={})
+        return 200, _aladin_js({"version": "20070901", "totalResults": 1, "item": [item]})
+
+    def item_list(self, params: Dict, headers) -> Tuple[int, bytes]:
+        cid = _int_param(params, "CategoryId", 0)
+        page = max(1, _int_param(params, "start", 1))
+        size = min(ALADIN_MAX_RESULTS, max(1, _int_param(params, "MaxResults", 10)))
+        books = self.catalog.category(cid)
+        return 200, _aladin_js({
+            "version": "20131101",
+            "pubDate": formatdate(usegmt=True),
+            "totalResults": len(books),
+            "startIndex": page,
+            "itemsPerPage": size,
+            "searchCategoryId": cid,
+            "item": [_aladin_item(book) for book in books[(page - 1) * size:page * size]],
+        })
+
+    def naver_books(self, params: Dict, headers) -> Tuple[int, bytes]:
+        if not headers.get("X-Naver-Client-Id"):
+            body = {"errorMessage": "Not Exist Client ID : Authentication failed. (인증에 실패했습니다.)", "errorCode": "024"}
+            return 401, json.dumps(body, ensure_ascii=False).encode("utf-8")
+        query = params.get("query", [""])[0]
+        display = min(NAVER_MAX_DISPLAY, max(1, _int_param(params, "display", 10)))
+        start = min(NAVER_MAX_START, max(1, _int_param(params, "start", 1)))
+        books = self.catalog.search(query)
+        body = {
+            "lastBuildDate": formatdate(localtime=True),
+            "total": len(books),
+            "start": start,
+            "display": display,
+            "items": [_naver_item(book) for book in books[start - 1:start - 1 + display]],
+        }
+        return 200, json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+
+ROUTES = {
+    "/ttb/api/ItemSearch.aspx": ("item_search", StandInServer.item_search),
+    "/ttb/api/ItemLookUp.aspx": ("item_lookup", StandInServer.item_lookup),
+    "/ttb/api/ItemList.aspx": ("item_list", StandInServer.item_list),
+    "/v1/search/book.json": ("naver_books", StandInServer.naver_books),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (클라이언트 연결 풀 재사용)
+    server: StandInServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/_stats":
+            stats = {
+                kind: {name: value for name, value in values.items() if name.startswith("stand_in.")}
+                for kind, values in metrics.snapshot().items()
+            }
+            return self._send(200, json.dumps(stats).encode("utf-8"), "application/json")
+
+        route = ROUTES.get(url.path)
+        if route is None:
+            return self._send(404, b"not found", "text/plain")
+        name, handler = route
+        is_naver = name == "naver_books"
+        content_type = "application/json; charset=UTF-8" if is_naver else "text/javascript; charset=utf-8"
+        start = time.perf_counter()
+
+        # 1. 요청 한도
+        if not self.server.admit():
+            status = 429
+            body = {"errorMessage": "Rate limit exceeded. (속도 제한을 초과했습니다.)", "errorCode": "012"}
+            self._send(status, json.dumps(body, ensure_ascii=False).encode("utf-8"), content_type)
+        else:
+            # 2. 지연 / 무응답 / 오류
+            delay, error_draw, hang_draw = self.server.draw()
+            if hang_draw < self.server.hang_rate:
+                delay = self.server.hang_seconds
+            time.sleep(delay)
+            if error_draw < self.server.error_rate:
+                status = self.server.error_status
+                self._send(status, b"", content_type)
+            else:
+                status, body = handler(self.server, parse_qs(url.query), self.headers)
+                self._send(status, body, content_type)
+
+        metrics.incr(f"stand_in.{name}.requests")
+        metrics.incr(f"stand_in.{name}.status_{status}")
+        metrics.observe(f"stand_in.{name}", time.perf_counter() - start)
+
+
+def start_server(catalog: StandInCatalog, **options) -> StandInServer:
+    """대역 서버를 백그라운드 스레드에서 시작 (종료는 server.shutdown())"""
+    server = StandInServer(catalog, **options)
+    threading.Thread(target=server.serve_forever, name="api-stand-in", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="알라딘 / 네이버 도서 검색 API 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--data", default=None, help="기록해 둔 책 JSON / JSONL 디렉토리 (없으면 가짜 카탈로그)")
+    parser.add_argument("--books", type=int, default=5000, help="가짜 카탈로그 책 수")
+    parser.add_argument("--latency", default="fixed:0", help="fixed:초 | uniform:최소,최대 | normal:평균,표준편차 | lognormal:중앙값,sigma")
+    parser.add_argument("--tail", default=None, help="확률:초 (예: 0.01:3 -> 1%% 요청에 3초 추가)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="초당 요청 수 (0이면 제한 없음)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    catalog = load_catalog(args.data, args.books, args.seed)
+    server = StandInServer(
+        catalog,
+        host=args.host,
+        port=args.port,
+        latency=LatencyModel(args.latency, args.tail),
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+    print(f"✅ 책 {len(catalog.books)}권으로 대역 서버를 시작합니다: {server.base_url}")
+    print(f"   ALADIN_API_BASE_URL={server.aladin_base_url}")
+    print(f"   NAVER_BOOKS_URL={server.naver_books_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,67 @@
+"""
+문서 metadata 크기 비교 벤치마크 (책 정보를 모든 문서에 복사 vs BookStore의 book_id만 저장)
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.book_store_benchmark --books 2000 --toc-items 80
+
+- 같은 가짜 코퍼스로 두 형식의 docstore를 만들어 pickle 크기와 파이썬 메모리 사용량(tracemalloc)을 출력
+"""
+from AIBookAgent.benchmarks.synthetic import make_books
+from AIBookAgent.hybridRAG import AIBooksRAG, get_book_key
+from AIBookAgent.book_store import BookStore
+from langchain.schema import Document
+import tracemalloc
+import argparse
+import tempfile
+import pickle
+import os
+
+
+def legacy_documents(rag: AIBooksRAG, books):
+    """예전 형식: 모든 문서 metadata에 제목/저자/분류/목차 HTML을 복사"""
+    documents = []
+    for book in books:
+        info = {key: book[key] for key in ("title", "author", "pubDate", "categoryName")}
+        documents.append(Document(page_content=book["title"], metadata={"type": "title", **info, "toc": book["toc"]}))
+        documents.append(Document(page_content=book["description"], metadata={"type": "description", **info, "toc": book["toc"]}))
+        for chapter in rag.parse_toc(book["toc"]):
+            for item in chapter["items"]:
+                documents.append(Document(
+                    page_content=f"{chapter['chapter']} - {item}",
+                    metadata={"type": "toc", **info, "item": item, "toc": book["toc"]},
+                ))
+    return documents
+
+
+def measure(build):
+    """문서 목록 생성 시 늘어난 메모리(MB)와 pickle 크기(MB)"""
+    tracemalloc.start()
+    documents = build()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(documents), memory / 2**20, len(pickle.dumps(documents)) / 2**20
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="문서 metadata 크기 비교")
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--toc-items", type=int, default=80)
+    args = parser.parse_args()
+
+    books = make_books(args.books, toc_items=args.toc_items)
+    rag = AIBooksRAG()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rag.book_store = BookStore(os.path.join(tmp, "books.sqlite3"))
+        book_ids = rag.book_store.upsert_books(books, [get_book_key(book) for book in books])
+        store_size = os.path.getsize(rag.book_store.path) / 2**20
+
+        n_legacy, legacy_memory, legacy_pickle = measure(lambda: legacy_documents(rag, books))
+        n_compact, compact_memory, compact_pickle = measure(lambda: rag.create_documents(books, book_ids))
+
+    print(f"책 {len(books)}권, 문서 {n_compact}개 (책당 목차 {args.toc_items}줄)")
+    print(f"{'':<10}{'memory(MB)':>12}{'pickle(MB)':>12}")
+    print(f"{'legacy':<10}{legacy_memory:>12.1f}{legacy_pickle:>12.1f}")
+    print(f"{'compact':<10}{compact_memory:>12.1f}{compact_pickle:>12.1f}  (+ books.sqlite3 {store_size:.1f}MB)")
+    print(f"감소율: memory {1 - compact_memory / legacy_memory:.1%}, pickle {1 - compact_pickle / legacy_pickle:.1%}")
+    assert n_legacy == n_compact
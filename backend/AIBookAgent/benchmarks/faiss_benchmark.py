@@ -0,0 +1,127 @@
+"""
+FAISS 인덱스 종류별 recall@k / 검색 지연시간 / 메모리(RSS) 비교 벤치마크
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.faiss_benchmark --sizes 10000 100000 1000000 --dim 256
+    python -m AIBookAgent.benchmarks.faiss_benchmark --sizes 100000 --types flat ivf_flat --dim 1536
+
+- 임베딩과 비슷하게 군집을 이룬 단위 벡터를 만들어 flat 인덱스의 결과를 정답으로 recall@k 계산
+- 인덱스 생성과 측정은 각각 별도 프로세스에서 실행해 RSS가 서로 섞이지 않게 함
+- 측정 프로세스는 hybridRAG와 같은 방식(read_index, 메모리 매핑)으로 인덱스를 읽음
+"""
+from AIBookAgent.faiss_index import INDEX_TYPES, build_index, read_index, search_parameters
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+import argparse
+import tempfile
+import faiss
+import time
+import os
+
+
+def rss_mb():
+    """현재 프로세스의 (익명 메모리, 파일 매핑 메모리) RSS (MB)"""
+    status = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            status[key] = value
+    return int(status["RssAnon"].split()[0]) / 1024, int(status["RssFile"].split()[0]) / 1024
+
+
+def make_vectors(n: int, d: int, n_clusters: int, seed: int) -> np.ndarray:
+    """군집 중심 주변에 흩어진 단위 벡터"""
+    rng = np.random.default_rng(seed)
+    centers = np.random.default_rng(0).standard_normal((n_clusters, d), dtype=np.float32)
+    vectors = centers[rng.integers(n_clusters, size=n)]
+    vectors += 0.5 * rng.standard_normal((n, d), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def build(index_type: str, base_path: str, index_path: str) -> float:
+    """인덱스 생성 후 저장. 소요 시간(초) 반환"""
+    vectors = np.load(base_path, mmap_mode="r")
+    start = time.perf_counter()
+    index = build_index(vectors, index_type)
+    for i in range(0, len(vectors), 100_000):
+        index.add(np.ascontiguousarray(vectors[i:i + 100_000]))
+    elapsed = time.perf_counter() - start
+    faiss.write_index(index, index_path)
+    return elapsed
+
+
+def measure(index_path: str, queries_path: str, truth_path: str, k: int):
+    """메모리 매핑으로 인덱스를 읽고 질의를 하나씩 검색해서 recall@k, 지연시간, RSS 측정"""
+    queries = np.load(queries_path)
+    truth = np.load(truth_path)
+    anon_before, file_before = rss_mb()
+
+    index = read_index(index_path)
+    params = search_parameters(index)
+    latencies, found = [], []
+    for query in queries:
+        start = time.perf_counter()
+        _, positions = index.search(query[None, :], k, params=params)
+        latencies.append(time.perf_counter() - start)
+        found.append(positions[0])
+
+    anon_after, file_after = rss_mb()
+    hits = sum(len(np.intersect1d(f, t)) for f, t in zip(found, truth))
+    return {
+        "recall": hits / truth.size,
+        "p50_ms": 1000 * float(np.percentile(latencies, 50)),
+        "p95_ms": 1000 * float(np.percentile(latencies, 95)),
+        "rss_anon_mb": anon_after - anon_before,
+        "rss_file_mb": file_after - file_before,
+        "type": type(index).__name__,
+    }
+
+
+def run(sizes, types, d: int, k: int, n_queries: int):
+    # fork한 프로세스는 부모의 메모리를 공유하므로 spawn 사용
+    context = multiprocessing.get_context("spawn")
+    print(f"{'n':>9} {'index':<10}{'faiss type':<16}{'build(s)':>9}{'size(MB)':>10}"
+          f"{f'recall@{k}':>10}{'p50(ms)':>9}{'p95(ms)':>9}{'anon(MB)':>10}{'file(MB)':>10}")
+
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_path, queries_path, truth_path = (os.path.join(tmp, f"{name}.npy") for name in ("base", "queries", "truth"))
+            n_clusters = max(16, n // 1000)
+            base = make_vectors(n, d, n_clusters, seed=1)
+            queries = make_vectors(n_queries, d, n_clusters, seed=2)
+            np.save(base_path, base)
+            np.save(queries_path, queries)
+
+            # 정답: 전수 탐색 결과
+            exact = faiss.IndexFlatL2(d)
+            exact.add(base)
+            np.save(truth_path, exact.search(queries, k)[1])
+            del base, exact
+
+            for index_type in types:
+                index_path = os.path.join(tmp, f"{index_type}.faiss")
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    build_time = pool.submit(build, index_type, base_path, index_path).result()
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    result = pool.submit(measure, index_path, queries_path, truth_path, k).result()
+                print(
+                    f"{n:>9,} {index_type:<10}{result['type']:<16}{build_time:>9.1f}"
+                    f"{os.path.getsize(index_path) / 2**20:>10.1f}{result['recall']:>10.3f}"
+                    f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                    f"{result['rss_anon_mb']:>10.1f}{result['rss_file_mb']:>10.1f}"
+                )
+                os.remove(index_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FAISS 인덱스 종류별 성능 비교")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    run(args.sizes, args.types, args.dim, args.k, args.queries)
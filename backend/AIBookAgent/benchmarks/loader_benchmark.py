@@ -0,0 +1,114 @@
+"""
+책 JSON 로더 처리량 / 최대 메모리 비교 벤치마크 (기존 전체 로드 vs 스트리밍 로더)
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.loader_benchmark --books 20000 --workers 0 2 4
+
+- 가짜 도서를 세 가지 형식(책 목록 JSON 한 파일, 책 한 권당 JSON 파일, JSONL 묶음)으로 저장
+- 기존 방식: 모든 JSON을 json.load로 읽어 리스트로 만든 뒤 문서 내용 생성, 그다음 TokenCache로 토큰화
+- 스트리밍: iter_prepared_books로 같은 작업을 묶음 단위로 처리 (workers > 0이면 프로세스 풀)
+- 두 방식 모두 색인 생성처럼 문서 내용과 토큰은 끝까지 보관하고, 결과가 같은지 확인
+- 측정은 각각 별도 프로세스에서 실행해 최대 RSS가 섞이지 않게 함 (워커 프로세스의 메모리는 제외)
+"""
+from AIBookAgent.benchmarks.synthetic import make_books
+from AIBookAgent.book_loader import document_contents, iter_prepared_books
+from AIBookAgent.toc_parser import parse_toc
+from AIBookAgent.tokenizer import TokenCache, get_tokenizer
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import argparse
+import tempfile
+import resource
+import hashlib
+import json
+import time
+import os
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+
+def write_corpus(directory: str, n: int, toc_items: int):
+    """형식별 디렉토리 (list / files / jsonl)"""
+    books = make_books(n, toc_items=toc_items)
+    for name in ("list", "files", "jsonl"):
+        os.makedirs(os.path.join(directory, name))
+    with open(os.path.join(directory, "list", "books.json"), "w", encoding="utf-8") as f:
+        json.dump(books, f, ensure_ascii=False)
+    for i, book in enumerate(books):
+        with open(os.path.join(directory, "files", f"{i:08d}.json"), "w", encoding="utf-8") as f:
+            json.dump(book, f, ensure_ascii=False)
+    with open(os.path.join(directory, "jsonl", "books.jsonl"), "w", encoding="utf-8") as f:
+        for book in books:
+            f.write(json.dumps(book, ensure_ascii=False) + "\n")
+
+
+def legacy(directory: str, token_cache: TokenCache):
+    """기존 load_json_files + create_documents + _fit_bm25와 같은 순서 (전체 책 목록을 먼저 메모리에 올림)"""
+    data = []
+    for filename in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+            data.append(json.load(f))
+    contents = []
+    for book_data in data:
+        for book in book_data:
+            contents.extend(document_contents(book, parse_toc(book["toc"])))
+    tokens = token_cache.tokenize_corpus(text for text, _, _ in contents)
+    return len(data[0]), contents, tokens
+
+
+def streaming(directory: str, token_cache: TokenCache, workers: int):
+    """AIBooksRAG.create_vector_store와 같은 순서"""
+    n_books, contents, tokens = 0, [], []
+    for prepared in iter_prepared_books(directory, token_cache.tokenizer, workers=workers):
+        for _, book_contents, book_tokens in prepared:
+            contents.extend(book_contents)
+            tokens.extend(token_cache.add((text for text, _, _ in book_contents), book_tokens))
+        n_books += len(prepared)
+    return n_books, contents, tokens
+
+
+def measure(mode: str, directory: str, workers: int):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        token_cache = TokenCache(get_tokenizer(), cache_dir)
+        baseline = rss_mb()
+        start = time.perf_counter()
+        if mode == "legacy":
+            n_books, contents, tokens = legacy(directory, token_cache)
+        else:
+            n_books, contents, tokens = streaming(directory, token_cache, workers)
+        elapsed = time.perf_counter() - start
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    digest = hashlib.sha256()
+    for content, token_list in zip(contents, tokens):
+        digest.update(json.dumps([content, token_list], ensure_ascii=False).encode("utf-8"))
+    return n_books, elapsed, peak - baseline, digest.hexdigest()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="책 JSON 로더 비교")
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--toc-items", type=int, default=80)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        write_corpus(tmp, args.books, args.toc_items)
+        runs = [("legacy", "list", 0)] + [
+            ("stream", corpus, workers) for corpus in ("list", "files", "jsonl") for workers in args.workers
+        ]
+
+        print(f"{'loader':<8}{'format':<8}{'workers':>8}{'books/s':>10}{'peak RSS(MB)':>14}")
+        expected = None
+        for mode, corpus, workers in runs:
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                n, elapsed, peak, digest = pool.submit(measure, mode, os.path.join(tmp, corpus), workers).result()
+            expected = expected or digest
+            assert digest == expected, f"{mode}/{corpus}/{workers} 결과가 다릅니다"
+            print(f"{mode:<8}{corpus:<8}{workers:>8}{n / elapsed:>10,.0f}{peak:>14.1f}")
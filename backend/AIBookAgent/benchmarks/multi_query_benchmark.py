@@ -0,0 +1,59 @@
+"""
+hybrid_search N번 순차 호출 vs hybrid_search_many 한 번 호출 처리량 비교 벤치마크
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.multi_query_benchmark --books 2000 --batch 1 4 16 64
+
+- 가짜 도서로 만든 임시 인덱스와, 요청마다 지연이 있는 가짜 임베딩(API 대역)을 사용
+- 매 측정마다 질의 임베딩 캐시를 비워서 임베딩 요청 비용까지 포함해 비교
+"""
+from AIBookAgent.benchmarks.synthetic import EXAMS, SUBJECTS, TOPICS, LatencyEmbeddings, make_books, make_rag
+from AIBookAgent.embedding_cache import CachedQueryEmbeddings
+import argparse
+import tempfile
+import random
+import time
+
+
+def make_queries(n: int, seed: int):
+    rng = random.Random(seed)
+    return [f"{rng.choice(EXAMS)} {rng.choice(SUBJECTS)} {rng.choice(TOPICS)}" for _ in range(n)]
+
+
+def timed(rag, embeddings, search):
+    """캐시를 비운 상태에서 (소요 시간, 임베딩 요청 수)"""
+    rag.embeddings = CachedQueryEmbeddings(embeddings, model_name="synthetic", cache_path=None)
+    requests = embeddings.requests
+    start = time.perf_counter()
+    search()
+    return time.perf_counter() - start, embeddings.requests - requests
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="다중 질의 검색 처리량 비교")
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="임베딩 요청당 지연(초)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    embeddings = LatencyEmbeddings(request_latency=0, per_text_latency=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        rag = make_rag(tmp, make_books(args.books, toc_items=16), embeddings)
+        print(f"문서 수: {len(rag.documents)}, 임베딩 요청 지연: {args.latency * 1000:.0f}ms")
+        embeddings.request_latency = args.latency
+
+        print(f"{'batch':>6}{'sequential(q/s)':>17}{'requests':>10}{'many(q/s)':>12}{'requests':>10}{'speedup':>9}")
+        for n in args.batch:
+            sequential, many = [], []
+            for r in range(args.repeat):
+                queries = make_queries(n, seed=r)
+                sequential.append(timed(rag, embeddings, lambda: [rag.hybrid_search(q, k=args.k) for q in queries]))
+                many.append(timed(rag, embeddings, lambda: rag.hybrid_search_many(queries, k=args.k)))
+
+            (seq_time, seq_requests), (many_time, many_requests) = min(sequential), min(many)
+            print(
+                f"{n:>6}{n / seq_time:>17.1f}{seq_requests:>10}{n / many_time:>12.1f}{many_requests:>10}"
+                f"{seq_time / many_time:>8.1f}x"
+            )
@@ -0,0 +1,90 @@
+"""
+임베딩 차원 / 벡터 저장 형식별 검색 품질, 지연시간, 메모리 비교 벤치마크
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.quantization_benchmark --books 5000
+    python -m AIBookAgent.benchmarks.quantization_benchmark --books 20000 --dimensions 512 256 --storages float32 sq8 --types flat hnsw
+
+- retrieval_benchmark와 같은 가짜 카탈로그와 질의 세트를 한 번 만들고, 설정마다 색인을 다시 만들어 실제 hybrid_search 경로로 측정
+- 차원: hashing 임베딩의 차원 (OpenAI text-embedding-3 모델의 RAG_EMBEDDING_DIMENSIONS로 줄인 차원에 해당)
+- 저장 형식: float32(원래 값), fp16, sq8 (RAG_FAISS_STORAGE)
+- 같은 차원의 문서 임베딩은 체크포인트를 재사용하므로 두 번째 저장 형식부터는 build(s)에 임베딩 시간이 빠짐
+- 결과는 실행 환경과 함께 JSON으로 저장 (--output)
+"""
+from AIBookAgent.benchmarks.retrieval_benchmark import build, directory_size_mb, environment, make_queries, search
+from AIBookAgent.benchmarks.synthetic import make_catalog
+from AIBookAgent.categories import load_categories
+from AIBookAgent.faiss_index import INDEX_TYPES, STORAGE_TYPES, read_index, vector_bytes
+from AIBookAgent.hybridRAG import current_store_dir
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+import argparse
+import tempfile
+import shutil
+import json
+import os
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="임베딩 차원 / 벡터 저장 형식 벤치마크")
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--semantic-weight", type=float, default=0.5)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[256, 128, 64])
+    parser.add_argument("--storages", nargs="+", choices=STORAGE_TYPES, default=list(STORAGE_TYPES))
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=["flat"])
+    parser.add_argument("--books-per-topic", type=int, default=5)
+    parser.add_argument("--categories-per-topic", type=int, default=3)
+    parser.add_argument("--toc-items", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: AIBookAgent/cache/benchmarks/quantization-<시각>.json)")
+    args = parser.parse_args()
+    args.dimension = args.dimensions  # environment() 기록용
+
+    output = args.output or os.path.abspath(
+        f"./AIBookAgent/cache/benchmarks/quantization-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    context = multiprocessing.get_context("spawn")
+    results = []
+
+    print(f"{'type':>9}{'dim':>6}{'storage':>9}{'B/vec':>7}{'faiss(MB)':>11}{'build(s)':>10}{'rss(MB)':>9}"
+          f"{'p50(ms)':>9}{'p95(ms)':>9}{f'recall@{args.k}':>11}{'filt.p50':>10}{'filt.rec':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        books, book_groups, groups = make_catalog(
+            args.books, load_categories(), seed=args.seed, books_per_topic=args.books_per_topic,
+            categories_per_topic=args.categories_per_topic, toc_items=args.toc_items,
+        )
+        os.makedirs(os.path.join(tmp, "books"))
+        with open(os.path.join(tmp, "books", "catalog.jsonl"), "w", encoding="utf-8") as f:
+            for book in books:
+                f.write(json.dumps(book, ensure_ascii=False) + "\n")
+        queries = make_queries(books, book_groups, groups, args.queries, seed=args.seed + 1)
+        del books, book_groups, groups
+
+        store_dir = os.path.join(tmp, "books_vectorstore")
+        for index_type in args.types:
+            for dimension in args.dimensions:
+                for storage in args.storages:
+                    shutil.rmtree(store_dir, ignore_errors=True)
+                    with ProcessPoolExecutor(1, mp_context=context) as pool:
+                        row = pool.submit(build, tmp, dimension, index_type, storage).result()
+                    index_path = os.path.join(current_store_dir(store_dir), "index.faiss")
+                    row["vector_bytes"] = vector_bytes(read_index(index_path, mmap=False))
+                    row["faiss_size_mb"] = os.path.getsize(index_path) / 2**20
+                    row["index_size_mb"] = directory_size_mb(store_dir)
+                    with ProcessPoolExecutor(1, mp_context=context) as pool:
+                        row.update(pool.submit(search, tmp, dimension, queries, args.k, args.semantic_weight).result())
+
+                    row = {"faiss_index": index_type, "dimension": dimension, "storage": storage, **row}
+                    results.append(row)
+                    print(f"{index_type:>9}{dimension:>6}{storage:>9}{row['vector_bytes']:>7}{row['faiss_size_mb']:>11.1f}"
+                          f"{row['build_s']:>10.1f}{row['rss_mb']:>9.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                          f"{row[f'recall@{args.k}']:>11.3f}{row['filtered_p50_ms']:>10.2f}"
+                          f"{row[f'filtered_recall@{args.k}']:>10.3f}")
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(args), "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
@@ -0,0 +1,248 @@
+"""
+AIBooksRAG 검색 벤치마크 (카탈로그 크기별 색인 생성 시간, 인덱스 크기, 메모리, 검색 지연시간, recall@k)
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.retrieval_benchmark --sizes 1000 10000 50000
+    python -m AIBookAgent.benchmarks.retrieval_benchmark --sizes 10000 --baseline ./AIBookAgent/cache/benchmarks/before.json
+
+- aladin_CID.csv의 분야 트리로 가짜 카탈로그(한글 제목/설명/부>장>절 목차)를 만들어 JSONL로 저장
+- 임베딩은 네트워크 없이 계산하는 hashing 제공자 사용 (OpenAI API 키 불필요)
+- 같은 (분야, 주제어) 묶음의 책들을 정답으로 하는 질의 세트로 recall@k 계산
+- 같은 질의를 정답 분야의 2단계 분야(예: 국내도서>수험서/자격증) 필터를 걸어 한 번 더 검색 (filtered_*)
+- 색인 생성과 검색은 크기마다 별도 프로세스에서 실행해 RSS가 섞이지 않게 함
+- 결과는 실행 환경/설정과 함께 JSON으로 저장 (--output). --baseline을 주면 이전 결과 대비 변화도 출력
+- FAISS 인덱스 종류, 결합 방식 등은 평소처럼 환경 변수(RAG_FAISS_INDEX, RAG_FUSION_METHOD 등)로 설정
+"""
+from AIBookAgent.benchmarks.synthetic import make_catalog, open_rag
+from AIBookAgent.categories import CATEGORY_SEPARATOR, load_categories
+from AIBookAgent.embedding_provider import get_embedding_provider
+from AIBookAgent.faiss_index import FAISS_INDEX_TYPE
+from AIBookAgent.hybridRAG import FUSION_CANDIDATES, FUSION_METHOD
+from AIBookAgent.tokenizer import RAG_TOKENIZER
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+import multiprocessing
+import numpy as np
+import subprocess
+import platform
+import argparse
+import tempfile
+import resource
+import random
+import faiss
+import json
+import time
+import os
+
+QUERY_TEMPLATES = ["{topic} {leaf}", "{leaf} {topic} 책 추천", "{topic} 관련 {leaf} 도서", "{topic} 공부"]
+
+
+def rss_mb() -> Dict[str, float]:
+    """현재 프로세스의 RSS (전체, 익명 메모리, 파일 매핑 메모리) MB"""
+    status = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            status[key] = value
+    return {key: int(status[field].split()[0]) / 1024 for key, field in
+            (("rss", "VmRSS"), ("anon", "RssAnon"), ("file", "RssFile"))}
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def directory_size_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 2**20
+
+
+def make_queries(books: List[Dict], book_groups: List[int], groups, n: int, seed: int) -> List[Dict]:
+    """정답 세트가 있는 질의 목록 ({"query", "category": 2단계 분야, "relevant": 정답 책 제목 목록})"""
+    rng = random.Random(seed)
+    members = {}
+    for book, group in zip(books, book_groups):
+        members.setdefault(group, []).append(book["title"])
+
+    queries = []
+    for group in rng.sample(range(len(groups)), min(n, len(groups))):
+        category, topic = groups[group]
+        query = rng.choice(QUERY_TEMPLATES).format(topic=topic, leaf=category.rsplit(">", 1)[-1])
+        queries.append({
+            "query": query,
+            "category": CATEGORY_SEPARATOR.join(category.split(CATEGORY_SEPARATOR)[:2]),
+            "relevant": members[group],
+        })
+    return queries
+
+
+def build(directory: str, dimension: int, index_type: str = None, storage: str = None) -> Dict:
+    """
+    벡터스토어, BM25 인덱스, 책 정보 테이블 생성 (별도 프로세스에서 실행)
+    - index_type, storage를 주지 않으면 RAG_FAISS_INDEX, RAG_FAISS_STORAGE 설정 사용
+    """
+    rag = open_rag(directory, get_embedding_provider("hashing", str(dimension)))
+    rag.faiss_index_type = index_type or rag.faiss_index_type
+    rag.faiss_storage = storage or rag.faiss_storage
+    start = time.perf_counter()
+    rag.create_vector_store()
+    return {
+        "build_s": time.perf_counter() - start,
+        "documents": len(rag.documents),
+        "build_peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def measure(rag, queries: List[Dict], k: int, semantic_weight: float, filtered: bool) -> Dict:
+    """질의를 하나씩 검색한 지연시간 백분위수와 recall@k"""
+    latencies, recalls = [], []
+    for query in queries:
+        category = query["category"] if filtered else None
+        start = time.perf_counter()
+        results = rag.hybrid_search(query["query"], k=k, semantic_weight=semantic_weight, category=category)
+        latencies.append(time.perf_counter() - start)
+        found = {book["title"] for book, _ in results}
+        recalls.append(len(found & set(query["relevant"])) / min(k, len(query["relevant"])))
+
+    latencies_ms = 1000 * np.asarray(latencies)
+    prefix = "filtered_" if filtered else ""
+    return {
+        f"{prefix}p50_ms": float(np.percentile(latencies_ms, 50)),
+        f"{prefix}p95_ms": float(np.percentile(latencies_ms, 95)),
+        f"{prefix}p99_ms": float(np.percentile(latencies_ms, 99)),
+        f"{prefix}mean_ms": float(latencies_ms.mean()),
+        f"{prefix}recall@{k}": float(np.mean(recalls)),
+    }
+
+
+def search(directory: str, dimension: int, queries: List[Dict], k: int, semantic_weight: float) -> Dict:
+    """서버 워커처럼 인덱스를 로드하고 질의를 하나씩 검색 (별도 프로세스에서 실행)"""
+    before = rss_mb()
+    start = time.perf_counter()
+    rag = open_rag(directory, get_embedding_provider("hashing", str(dimension)))
+    rag.load_vector_store()
+    rag.initialize_bm25()
+    load_s = time.perf_counter() - start
+    after = rss_mb()
+
+    # 첫 호출의 지연(스레드 풀 시작, 페이지 적재 등)은 제외
+    for query in queries[:5]:
+        rag.hybrid_search(query["query"], k=k, semantic_weight=semantic_weight)
+
+    return {
+        "load_s": load_s,
+        "rss_mb": after["rss"] - before["rss"],
+        "rss_anon_mb": after["anon"] - before["anon"],
+        "rss_file_mb": after["file"] - before["file"],
+        **measure(rag, queries, k, semantic_weight, filtered=False),
+        **measure(rag, queries, k, semantic_weight, filtered=True),
+        "queries": len(queries),
+    }
+
+
+def environment(args) -> Dict:
+    """결과를 비교할 때 필요한 실행 환경과 설정"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "faiss": faiss.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "embedding": {"provider": "hashing", "dimension": args.dimension},
+        "faiss_index": FAISS_INDEX_TYPE,
+        "fusion_method": FUSION_METHOD,
+        "fusion_candidates": FUSION_CANDIDATES,
+        "tokenizer": RAG_TOKENIZER,
+        "k": args.k,
+        "semantic_weight": args.semantic_weight,
+        "books_per_topic": args.books_per_topic,
+        "categories_per_topic": args.categories_per_topic,
+        "toc_items": args.toc_items,
+        "seed": args.seed,
+    }
+
+
+def compare(results: List[Dict], baseline_path: str, k: int):
+    """같은 크기의 이전 결과 대비 변화 (지연시간, 메모리는 비율, recall은 차이)"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {row["books"]: row for row in json.load(f)["results"]}
+
+    print(f"\n기준 결과와 비교: {baseline_path}")
+    print(f"{'books':>9}{'build':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'rss':>9}{f'recall@{k}':>12}")
+    for row in results:
+        base = baseline.get(row["books"])
+        if base is None:
+            continue
+        ratios = [row[key] / base[key] if base.get(key) else float("nan")
+                  for key in ("build_s", "p50_ms", "p95_ms", "p99_ms", "rss_mb")]
+        recall_key = f"recall@{k}"
+        delta = row[recall_key] - base.get(recall_key, float("nan"))
+        print(f"{row['books']:>9,}" + "".join(f"{ratio:>8.2f}x" for ratio in ratios) + f"{delta:>+12.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AIBooksRAG 검색 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--semantic-weight", type=float, default=0.5)
+    parser.add_argument("--dimension", type=int, default=256, help="hashing 임베딩 차원")
+    parser.add_argument("--books-per-topic", type=int, default=5)
+    parser.add_argument("--categories-per-topic", type=int, default=3)
+    parser.add_argument("--toc-items", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: AIBookAgent/cache/benchmarks/retrieval-<시각>.json)")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    output = args.output or os.path.abspath(
+        f"./AIBookAgent/cache/benchmarks/retrieval-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    categories = load_categories()
+    # fork한 프로세스는 부모의 메모리를 공유하므로 spawn 사용
+    context = multiprocessing.get_context("spawn")
+    results = []
+
+    print(f"{'books':>9}{'docs':>11}{'build(s)':>10}{'size(MB)':>10}{'load(s)':>9}{'rss(MB)':>9}"
+          f"{'p50(ms)':>9}{'p95(ms)':>9}{'p99(ms)':>9}{f'recall@{args.k}':>11}{'filt.p50':>10}{'filt.rec':>10}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            books, book_groups, groups = make_catalog(
+                size, categories, seed=args.seed, books_per_topic=args.books_per_topic,
+                categories_per_topic=args.categories_per_topic, toc_items=args.toc_items,
+            )
+            os.makedirs(os.path.join(tmp, "books"))
+            with open(os.path.join(tmp, "books", "catalog.jsonl"), "w", encoding="utf-8") as f:
+                for book in books:
+                    f.write(json.dumps(book, ensure_ascii=False) + "\n")
+            queries = make_queries(books, book_groups, groups, args.queries, seed=args.seed + 1)
+            del books, book_groups, groups
+
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                row = pool.submit(build, tmp, args.dimension).result()
+            row["index_size_mb"] = directory_size_mb(os.path.join(tmp, "books_vectorstore"))
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                row.update(pool.submit(search, tmp, args.dimension, queries, args.k, args.semantic_weight).result())
+
+        row = {"books": size, **row}
+        results.append(row)
+        print(f"{size:>9,}{row['documents']:>11,}{row['build_s']:>10.1f}{row['index_size_mb']:>10.1f}"
+              f"{row['load_s']:>9.2f}{row['rss_mb']:>9.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+              f"{row['p99_ms']:>9.2f}{row[f'recall@{args.k}']:>11.3f}"
+              f"{row['filtered_p50_ms']:>10.2f}{row[f'filtered_recall@{args.k}']:>10.3f}")
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(args), "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if args.baseline:
+        compare(results, args.baseline, args.k)
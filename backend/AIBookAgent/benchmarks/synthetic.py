@@ -0,0 +1,214 @@
+from AIBookAgent.hybridRAG import AIBooksRAG
+from AIBookAgent.book_store import BookStore
+from AIBookAgent.embedding_cache import CachedQueryEmbeddings
+from AIBookAgent.embedding_provider import EmbeddingProvider
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_core.embeddings import Embeddings
+from typing import Dict, List, Tuple
+import numpy as np
+import random
+import json
+import time
+import os
+
+# 벤치마크용 가짜 도서 데이터 생성
+
+SUBJECTS = [
+    "전기자기학", "전력공학", "전기기기", "회로이론", "제어공학", "전기설비기술기준",
+    "소프트웨어 설계", "소프트웨어 개발", "데이터베이스 구축", "프로그래밍 언어 활용", "정보시스템 구축관리",
+    "재무회계", "원가회계", "세법", "경영학", "행정법", "형법", "민법", "한국사", "영어",
+]
+TOPICS = [
+    "기본 개념", "핵심 이론", "공식 정리", "유형별 문제", "실전 모의고사", "기출 분석", "오답 노트",
+    "진공 중의 정전계", "유전체", "정자계", "전자 유도", "송전 특성", "고장 계산", "동기 발전기",
+    "변압기", "라플라스 변환", "전달함수", "정규화", "트랜잭션", "객체지향", "자료구조", "알고리즘",
+]
+EXAMS = ["전기기사", "정보처리기사", "전산회계", "공인중개사", "9급 공무원", "컴퓨터활용능력", "토익", "한국사능력검정"]
+PUBLISHERS = ["시대고시", "에듀윌", "길벗", "영진닷컴", "성안당", "해커스", "동일출판사"]
+
+
+def make_toc(rng: random.Random, n_chapters: int, items_per_chapter: int) -> str:
+    """
+    알라딘 목차 형식의 HTML 생성
+    - AIBooksRAG.parse_toc가 장(chapter)을 인식하도록 <b>의 제목을 <br> 뒤 텍스트로도 한 번 더 적음
+    """
+    parts = ["<p>"]
+    for c in range(1, n_chapters + 1):
+        chapter = f"{c}과목 {rng.choice(SUBJECTS)}"
+        parts.append(f"<b>{chapter}</b><br>{chapter}<br>")
+        for i in range(1, items_per_chapter + 1):
+            parts.append(f"{i:02d}. {rng.choice(TOPICS)}<br>")
+        parts.append("최근기출문제<br>2011~2022년 기출문제<br>")
+    parts.append("</p>")
+    return "".join(parts)
+
+
+def make_book(rng: random.Random, index: int, category: str = "국내도서>수험서/자격증", toc_items: int = 80) -> Dict:
+    """가짜 도서 한 권 (알라딘 ItemLookUp 결과와 같은 필드)"""
+    exam = rng.choice(EXAMS)
+    n_chapters = max(1, toc_items // 16)
+    year = rng.randint(2020, 2026)
+    return {
+        "title": f"{year} {exam} {rng.choice(SUBJECTS)} {rng.choice(['필기', '실기', '기본서', '문제집'])} {index}",
+        "author": f"{rng.choice(PUBLISHERS)} 편집부",
+        "pubDate": f"{year - 1}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "description": f"{exam} 시험 대비 {rng.choice(TOPICS)}부터 {rng.choice(TOPICS)}까지 정리한 수험서",
+        "categoryName": category,
+        "isbn13": f"979{index:010d}",
+        "toc": make_toc(rng, n_chapters, max(1, toc_items // n_chapters - 3)),
+    }
+
+
+def make_books(n: int, seed: int = 0, toc_items: int = 80) -> List[Dict]:
+    rng = random.Random(seed)
+    return [make_book(rng, i, toc_items=toc_items) for i in range(n)]
+
+
+# 분야 트리(aladin_CID.csv)를 사용하는 대규모 가짜 카탈로그
+
+SYLLABLES = (
+    "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후"
+    "기니디리미비시이지치키티피히개내대래매배새애재채캐태패해강남당랑망방상앙장창탕항"
+)
+FORMS = ["입문", "기본서", "완벽 가이드", "핵심 정리", "문제집", "실전 연습", "개론", "워크북", "길잡이", "교과서"]
+SURNAMES = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임", "한", "오", "서", "신", "권"]
+
+
+def make_word(rng: random.Random, min_syllables: int = 2, max_syllables: int = 4) -> str:
+    """의미 없는 한글 단어 (주제어, 인명 등에 사용)"""
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(min_syllables, max_syllables)))
+
+
+def make_nested_toc(rng: random.Random, topic: str, vocabulary: List[str], n_items: int) -> str:
+    """
+    부 > 장 > 절 구조의 알라딘 형식 목차 HTML
+    - 부 제목은 <b>에 넣고 <br> 뒤에 한 번 더 적어서 parse_toc가 장(chapter)으로 인식하게 함
+    - 장/절 제목은 "3장 ...", "3.2 ..." 형식의 항목. 첫 장에는 책의 주제어가 들어감
+    """
+    n_parts = max(1, n_items // 12)
+    parts = ["<p>"]
+    chapter = 0
+    for p in range(1, n_parts + 1):
+        part = f"제{p}부 {rng.choice(vocabulary)}"
+        parts.append(f"<b>{part}</b><br>{part}<br>")
+        for _ in range(max(1, n_items // n_parts // 4)):
+            chapter += 1
+            title = f"{topic}의 {rng.choice(vocabulary)}" if chapter == 1 else f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}"
+            parts.append(f"{chapter}장 {title}<br>")
+            for section in range(1, 4):
+                parts.append(f"{chapter}.{section} {rng.choice(vocabulary)}<br>")
+    parts.append("</p>")
+    return "".join(parts)
+
+
+def make_catalog(
+    n: int,
+    categories: List[Dict],
+    seed: int = 0,
+    books_per_topic: int = 5,
+    categories_per_topic: int = 3,
+    toc_items: int = 24,
+) -> Tuple[List[Dict], List[int], List[Tuple[str, str]]]:
+    """
+    분야 트리를 사용한 가짜 카탈로그
+    - 책 books_per_topic권마다 같은 (분야, 주제어) 묶음을 공유하고, 묶음이 검색 정답 세트가 됨
+    - 같은 주제어를 categories_per_topic개 분야에서 함께 써서, 분야를 구분하지 못하면 정답을 놓치게 함
+    - 분야는 categories(load_categories 결과) 중 국내도서 2단계 이상에서 고름
+    - 반환값: (책 목록, 책별 묶음 번호, 묶음별 (분야 경로, 주제어))
+    """
+    rng = random.Random(seed)
+    leaves = [c["path"] for c in categories if c["path"].startswith("국내도서>") and c["path"].count(">") >= 2]
+    vocabulary = [make_word(rng) for _ in range(max(2000, n // 2))]
+    used_topics = set()
+
+    books, book_groups, groups = [], [], []
+    while len(books) < n:
+        topic = make_word(rng, 3, 4)
+        while topic in used_topics:
+            topic = make_word(rng, 3, 4)
+        used_topics.add(topic)
+        for category in rng.sample(leaves, categories_per_topic):
+            if len(books) >= n:
+                break
+            n_books = min(books_per_topic, n - len(books))
+            _add_group(rng, books, book_groups, groups, category, topic, vocabulary, n_books, toc_items)
+    return books, book_groups, groups
+
+
+def _add_group(rng, books, book_groups, groups, category, topic, vocabulary, n_books, toc_items):
+    """(분야, 주제어) 묶음 하나의 책 n_books권 추가"""
+    leaf = category.rsplit(">", 1)[-1]
+    for _ in range(n_books):
+        i = len(books)
+        form = rng.choice(FORMS)
+        year = rng.randint(2005, 2026)
+        books.append({
+            "title": f"{topic} {leaf} {form} {i + 1}",
+            "author": f"{rng.choice(SURNAMES)}{make_word(rng, 2, 2)} 지음",
+            "pubDate": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "description": (
+                f"{leaf} 분야에서 {topic}을 {rng.choice(vocabulary)}, {rng.choice(vocabulary)}, "
+                f"{rng.choice(vocabulary)} 중심으로 설명하는 {form}입니다."
+            ),
+            "categoryName": category,
+            "isbn13": f"979{i:010d}",
+            "toc": make_nested_toc(rng, topic, vocabulary, toc_items),
+        })
+        book_groups.append(len(groups))
+    groups.append((category, topic))
+
+
+class LatencyEmbeddings(Embeddings):
+    """
+    임베딩 API 대역 (요청마다 고정 지연 + 텍스트 수에 비례한 지연)
+    - 벡터는 DeterministicFakeEmbedding으로 만들어 같은 텍스트는 항상 같은 벡터
+    - OpenAI 임베딩처럼 길이 1로 정규화
+    """
+
+    def __init__(self, size: int = 256, request_latency: float = 0.05, per_text_latency: float = 0.001):
+        self.fake = DeterministicFakeEmbedding(size=size)
+        self.request_latency = request_latency
+        self.per_text_latency = per_text_latency
+        self.requests = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.requests += 1
+        time.sleep(self.request_latency + self.per_text_latency * len(texts))
+        vectors = np.asarray(self.fake.embed_documents(texts), dtype=np.float32)
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def make_rag(directory: str, books: List[Dict], embeddings: Embeddings) -> AIBooksRAG:
+    """directory 아래에 가짜 도서로 벡터스토어, BM25 인덱스, 책 정보 테이블을 만들어 로드한 AIBooksRAG"""
+    books_dir = os.path.join(directory, "books")
+    os.makedirs(books_dir, exist_ok=True)
+    with open(os.path.join(books_dir, "books.json"), "w", encoding="utf-8") as f:
+        json.dump(books, f, ensure_ascii=False)
+
+    rag = open_rag(directory, EmbeddingProvider("synthetic", type(embeddings).__name__, None, embeddings))
+    rag.load_vector_store()
+    rag.initialize_bm25()
+    return rag
+
+
+def open_rag(directory: str, provider: EmbeddingProvider) -> AIBooksRAG:
+    """
+    모든 경로(책 JSON, 벡터스토어, 캐시)가 directory 아래를 가리키는 AIBooksRAG (로드는 하지 않음)
+    - 책 JSON은 directory/books, 벡터스토어는 directory/books_vectorstore
+    - 질의 임베딩 캐시는 메모리만 사용
+    """
+    books_dir = os.path.join(directory, "books")
+    store_dir = os.path.join(directory, "books_vectorstore")
+    rag = AIBooksRAG(provider)
+    rag.embeddings = CachedQueryEmbeddings(provider.embeddings, model_name=provider.cache_name, cache_path=None)
+    rag.json_dir = books_dir
+    rag.vector_store_path = store_dir
+    rag.lexical_index_path = os.path.join(directory, "cache", "bm25")
+    rag.token_cache_dir = os.path.join(directory, "cache", "tokens")
+    rag.tombstone_path = os.path.join(store_dir, "tombstones.json")
+    rag.embedding_checkpoint_dir = os.path.join(directory, "embeddings")
+    rag.book_store = BookStore(os.path.join(store_dir, "books.sqlite3"))
+    return rag
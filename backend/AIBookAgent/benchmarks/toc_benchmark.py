@@ -0,0 +1,40 @@
+"""
+목차 파싱 처리량 비교 벤치마크 (BeautifulSoup vs 정규식 파서)
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.toc_benchmark --books 5000 --toc-items 80
+
+- 가짜 도서의 알라딘 형식 목차를 두 방식으로 파싱해 초당 처리 권수를 비교
+- 정규식 파서의 결과가 BeautifulSoup 결과와 모두 같은지도 확인
+"""
+from AIBookAgent.benchmarks.synthetic import make_books
+from AIBookAgent.toc_parser import parse_toc, parse_toc_soup
+import argparse
+import time
+
+
+def throughput(parse, tocs):
+    start = time.perf_counter()
+    results = [parse(toc) for toc in tocs]
+    return len(tocs) / (time.perf_counter() - start), results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="목차 파싱 처리량 비교")
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--toc-items", type=int, default=80)
+    args = parser.parse_args()
+
+    tocs = [book["toc"] for book in make_books(args.books, toc_items=args.toc_items)]
+    print(f"목차 수: {len(tocs)}, 평균 길이: {sum(map(len, tocs)) / len(tocs):.0f}자")
+
+    soup_rate, expected = throughput(parse_toc_soup, tocs)
+    fast_rate, fast = throughput(parse_toc, tocs)
+
+    assert fast == expected, "파싱 결과가 다릅니다"
+    print(f"{'parser':<22}{'docs/s':>12}{'speedup':>9}")
+    for name, rate in [
+        ("BeautifulSoup", soup_rate),
+        ("regex parser", fast_rate),
+    ]:
+        print(f"{name:<22}{rate:>12,.0f}{rate / soup_rate:>8.1f}x")
@@ -0,0 +1,65 @@
+"""
+토크나이저 처리량 비교 벤치마크
+
+사용법 (backend 디렉토리에서):
+    python -m AIBookAgent.benchmarks.tokenizer_benchmark
+    python -m AIBookAgent.benchmarks.tokenizer_benchmark --source json --repeat 5
+
+- 기존 코퍼스(books_vectorstore/index.pkl의 문서, 또는 AIBookAgent/books의 JSON)를 읽어서
+  토크나이저별 문서/초, 토큰/초, 문서당 평균 토큰 수, 어휘 크기를 출력
+"""
+from AIBookAgent.hybridRAG import AIBooksRAG, JSON_DIR, current_store_dir
+from AIBookAgent.tokenizer import TOKENIZERS, get_tokenizer
+from typing import List
+import argparse
+import pickle
+import time
+import os
+
+
+def load_corpus(source: str) -> List[str]:
+    """벤치마크에 사용할 문서 내용 목록"""
+    if source == "vectorstore":
+        # index.pkl은 (docstore, index_to_docstore_id) 튜플
+        with open(os.path.join(current_store_dir(), "index.pkl"), "rb") as f:
+            docstore, _ = pickle.load(f)
+        return [doc.page_content for doc in docstore._dict.values()]
+
+    rag = AIBooksRAG()
+    book_data = rag.load_json_files(JSON_DIR)
+    book_ids = list(range(len(book_data)))  # 책 정보 테이블에는 저장하지 않음
+    return [doc.page_content for doc in rag.create_documents(book_data, book_ids)]
+
+
+def run(texts: List[str], repeat: int):
+    print(f"문서 수: {len(texts)}, 반복: {repeat}회")
+    print(f"{'tokenizer':<12}{'docs/s':>12}{'tokens/s':>14}{'tokens/doc':>12}{'vocab':>10}")
+    for name in TOKENIZERS:
+        tokenizer = get_tokenizer(name)
+
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            corpus = [tokenizer.tokenize(text) for text in texts]
+            best = min(best, time.perf_counter() - start)
+
+        n_tokens = sum(len(tokens) for tokens in corpus)
+        vocab = {token for tokens in corpus for token in tokens}
+        print(
+            f"{name:<12}{len(texts) / best:>12,.0f}{n_tokens / best:>14,.0f}"
+            f"{n_tokens / max(len(texts), 1):>12.1f}{len(vocab):>10,}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="토크나이저 처리량 비교")
+    parser.add_argument("--source", choices=["vectorstore", "json"], default="vectorstore")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    source = args.source
+    if source == "vectorstore" and not os.path.exists(METADATA_PATH):
+        print(f"⚠️ {METADATA_PATH}가 없어 JSON 코퍼스를 사용합니다.")
+        source = "json"
+
+    run(load_corpus(source), args.repeat)
@@ -0,0 +1,257 @@
+from typing import Dict, List, Optional, Tuple
+from scipy import sparse
+from AIBookAgent import versioned_dir
+import numpy as np
+import json
+import os
+
+# 저장 형식이 바뀌면 올려서 이전 형식의 인덱스를 다시 만들도록 함
+LEXICAL_INDEX_VERSION = 2
+
+
+class SparseBM25:
+    """
+    희소 행렬 기반 BM25 검색 엔진 (rank_bm25.BM25Okapi와 같은 점수 계산식)
+    - 행이 단어, 열이 문서인 CSR term-document 행렬에 IDF와 문서 길이 정규화를 미리 반영
+    - 질의 점수 계산은 희소 행렬-벡터 곱 한 번으로 처리 (질의 단어의 postings만 읽음)
+    - 상위 k개 선택은 전체 정렬 대신 argpartition 사용
+    - 가중치와 같은 위치에 원래 단어 빈도(tf)도 보관해서, 문서를 추가할 때 기존 문서를 다시 토큰화하지 않고 가중치만 다시 계산
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25):
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self.vocab: Dict[str, int] = {}
+        self.matrix = None  # (단어 수, 문서 수) CSR 행렬
+        self.tf = None  # matrix.data와 같은 순서의 단어 빈도
+        self.idf = None
+        self.doc_len = None
+        self.avgdl = 0.0
+        self._term_max = None  # 단어별 최대 가중치 (질의의 최대 가능 점수 계산용, 처음 사용할 때 계산)
+
+    @property
+    def n_docs(self) -> int:
+        return 0 if self.doc_len is None else len(self.doc_len)
+
+    # 1. 인덱스 생성
+    def fit(self, tokenized_corpus: List[List[str]]) -> "SparseBM25":
+        """토큰화된 문서 목록으로 가중치 행렬 생성"""
+        self.vocab = {}
+        self._set_counts(self._count_terms(tokenized_corpus))
+        return self
+
+    def append(self, tokenized_docs: List[List[str]]) -> "SparseBM25":
+        """
+        기존 문서 뒤에 문서 추가 (같은 문서 목록으로 fit한 결과와 같음)
+        - 새 문서만 단어 빈도를 세고, 기존 문서는 보관한 tf 행렬 뒤에 행으로 붙임
+        - 문서 수와 평균 길이가 바뀌므로 IDF와 가중치는 전체를 다시 계산 (배열 연산만 사용)
+        """
+        if self.matrix is None:
+            return self.fit(tokenized_docs)
+
+        # 새 단어는 어휘 끝에 추가되므로 기존 단어 번호는 그대로
+        new_rows = self._count_terms(tokenized_docs)
+        old_rows = sparse.csr_matrix((self.tf, self.matrix.indices, self.matrix.indptr), shape=self.matrix.shape).T.tocsr()
+        old_rows.resize(old_rows.shape[0], len(self.vocab))
+        self._set_counts(sparse.vstack([old_rows, new_rows], format="csr"))
+        return self
+
+    def _count_terms(self, tokenized_corpus: List[List[str]]):
+        """문서 x 단어 tf 행렬 (처음 나온 단어는 self.vocab에 추가)"""
+        vocab = self.vocab
+        indices = []
+        indptr = [0]
+        for tokens in tokenized_corpus:
+            indices.extend(vocab.setdefault(token, len(vocab)) for token in tokens)
+            indptr.append(len(indices))
+
+        # 같은 단어가 여러 번 나오면 합쳐져서 tf가 됨
+        doc_term = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(vocab)),
+        )
+        doc_term.sum_duplicates()
+        return doc_term
+
+    def _set_counts(self, doc_term):
+        """문서 x 단어 tf 행렬로 IDF, 문서 길이, 가중치 행렬 계산"""
+        n_docs, n_terms = doc_term.shape
+        doc_len = np.asarray(doc_term.sum(axis=1), dtype=np.float32).ravel()
+
+        # IDF (음수 IDF는 BM25Okapi처럼 평균 IDF * epsilon으로 대체)
+        df = np.bincount(doc_term.indices, minlength=n_terms)
+        idf = np.log(n_docs - df + 0.5) - np.log(df + 0.5)
+        if n_terms:
+            idf[idf < 0] = self.epsilon * idf.mean()
+
+        # BM25 가중치: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+        # 단어별 postings 형태로 전치한 뒤 계산 (행 = 단어, 열 = 문서)
+        avgdl = float(doc_len.mean()) if n_docs else 0.0
+        postings = doc_term.T.tocsr()
+        tf = postings.data
+        term_ids = np.repeat(np.arange(n_terms), np.diff(postings.indptr))
+        norm = self.k1 * (1 - self.b + self.b * doc_len[postings.indices] / max(avgdl, 1e-9))
+        weights = (idf[term_ids] * tf * (self.k1 + 1) / (tf + norm)).astype(np.float32)
+
+        self.matrix = sparse.csr_matrix((weights, postings.indices, postings.indptr), shape=postings.shape)
+        self.tf = tf
+        self.idf = idf.astype(np.float32)
+        self.doc_len = doc_len
+        self.avgdl = avgdl
+        self._term_max = None
+
+    # 2. 질의 점수 계산
+    def _query_matrix(self, tokenized_queries: List[List[str]]):
+        """질의 목록을 (질의 수, 단어 수) 희소 행렬로 변환. 사전에 없는 단어는 무시"""
+        rows, term_ids = [], []
+        for row, tokens in enumerate(tokenized_queries):
+            for token in tokens:
+                term_id = self.vocab.get(token)
+                if term_id is not None:
+                    rows.append(row)
+                    term_ids.append(term_id)
+        # 같은 (질의, 단어) 쌍은 CSR 변환 시 합쳐져서 질의 내 단어 빈도가 됨
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (np.asarray(rows, dtype=np.int32), np.asarray(term_ids, dtype=np.int32))),
+            shape=(len(tokenized_queries), len(self.vocab)),
+        )
+
+    def score_sparse(self, tokenized_query: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """질의 단어가 하나라도 등장한 문서들의 (문서 번호, 점수)"""
+        result = (self._query_matrix([tokenized_query]) @ self.matrix).tocsr()
+        return result.indices, result.data
+
+    def max_scores(self, tokenized_queries: List[List[str]]) -> np.ndarray:
+        """
+        질의마다 어떤 문서가 받을 수 있는 최대 점수 (각 질의 단어의 최대 가중치 합)
+        - 점수를 이 값으로 나누면 질의 길이와 상관없이 0~1 범위가 됨
+        """
+        if self._term_max is None:
+            self._term_max = self.matrix.max(axis=1).toarray().ravel()
+        return self._query_matrix(tokenized_queries) @ self._term_max
+
+    def get_scores(self, tokenized_query: List[str]) -> np.ndarray:
+        """전체 문서에 대한 점수 (BM25Okapi.get_scores와 같은 형태)"""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        doc_ids, values = self.score_sparse(tokenized_query)
+        scores[doc_ids] = values
+        return scores
+
+    # 3. 상위 k개 검색
+    def top_k(self, tokenized_query: List[str], k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        점수가 높은 순서대로 최대 k개의 (문서 번호, 점수). 점수가 0인 문서는 제외
+        - mask가 주어지면 mask[문서 번호]가 True인 문서만 후보로 사용
+        """
+        doc_ids, values = self.score_sparse(tokenized_query)
+        return self._select_top_k(doc_ids, values, k, mask)
+
+    def top_k_many(
+        self, tokenized_queries: List[List[str]], k: int, mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        여러 질의의 상위 k개를 한 번에 계산
+        - (질의 수, 단어 수) x (단어 수, 문서 수) 희소 행렬 곱 한 번으로 모든 질의의 점수 계산
+        """
+        result = (self._query_matrix(tokenized_queries) @ self.matrix).tocsr()
+        return [
+            self._select_top_k(result.indices[start:end], result.data[start:end], k, mask)
+            for start, end in zip(result.indptr[:-1], result.indptr[1:])
+        ]
+
+    def _select_top_k(
+        self, doc_ids: np.ndarray, values: np.ndarray, k: int, mask: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if mask is not None:
+            keep = mask[doc_ids]
+            doc_ids, values = doc_ids[keep], values[keep]
+        if k <= 0 or len(values) == 0:
+            return doc_ids[:0], values[:0]
+
+        if len(values) > k:
+            top = np.argpartition(-values, k - 1)[:k]
+            doc_ids, values = doc_ids[top], values[top]
+
+        order = np.argsort(-values, kind="stable")
+        return doc_ids[order], values[order]
+
+    # 4. 저장 및 로드
+    def save(self, path: str, fingerprint: str):
+        """
+        어휘, postings(CSR 행렬), 단어 빈도, 문서 길이, IDF를 저장
+        - 각 배열은 .npy로 저장해 로드 시 메모리 매핑 가능
+        - 새 버전 디렉토리에 모두 쓴 뒤 path 링크를 한 번에 교체하므로, 읽는 쪽이 서로 다른 버전의 파일을 섞어 읽지 않고
+          기존 파일을 매핑 중인 프로세스에도 영향을 주지 않음 (쓰는 쪽은 색인 잠금을 잡은 상태에서 호출)
+        """
+        def write(directory: str):
+            arrays = {
+                "data": self.matrix.data,
+                "indices": self.matrix.indices,
+                "indptr": self.matrix.indptr,
+                "tf": self.tf,
+                "doc_len": self.doc_len,
+                "idf": self.idf,
+            }
+            for name, array in arrays.items():
+                np.save(os.path.join(directory, f"{name}.npy"), array)
+
+            terms = sorted(self.vocab, key=self.vocab.get)
+            with open(os.path.join(directory, "vocab.json"), "w", encoding="utf-8") as f:
+                json.dump(terms, f, ensure_ascii=False)
+
+            meta = {
+                "version": LEXICAL_INDEX_VERSION,
+                "fingerprint": fingerprint,
+                "k1": self.k1,
+                "b": self.b,
+                "epsilon": self.epsilon,
+                "avgdl": self.avgdl,
+                "shape": list(self.matrix.shape),
+            }
+            with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        versioned_dir.publish(path, write)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str, mmap: bool = True) -> Optional["SparseBM25"]:
+        """
+        저장된 인덱스 로드. 없거나 버전/fingerprint가 맞지 않으면 None 반환
+        - mmap=True이면 배열을 읽기 전용으로 메모리 매핑 (gunicorn 워커끼리 페이지 캐시 공유)
+        - 링크를 한 번만 따라가서 모든 파일을 같은 버전 디렉토리에서 읽음
+        """
+        path = versioned_dir.resolve(path) or path
+        try:
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if meta.get("version") != LEXICAL_INDEX_VERSION or meta.get("fingerprint") != fingerprint:
+            return None
+
+        mmap_mode = "r" if mmap else None
+        try:
+            arrays = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                for name in ("data", "indices", "indptr", "tf", "doc_len", "idf")
+            }
+            with open(os.path.join(path, "vocab.json"), "r", encoding="utf-8") as f:
+                terms = json.load(f)
+        except FileNotFoundError:
+            # 읽는 도중 새 버전이 공개되어 이전 버전 디렉토리가 정리된 경우
+            return None
+
+        bm25 = cls(k1=meta["k1"], b=meta["b"], epsilon=meta["epsilon"])
+        bm25.vocab = {term: i for i, term in enumerate(terms)}
+        bm25.matrix = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(meta["shape"]),
+            copy=False,
+        )
+        bm25.tf = arrays["tf"]
+        bm25.doc_len = arrays["doc_len"]
+        bm25.idf = arrays["idf"]
+        bm25.avgdl = meta["avgdl"]
+        return bm25
@@ -0,0 +1,158 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from AIBookAgent.toc_parser import parse_toc
+from AIBookAgent.tokenizer import get_tokenizer
+import multiprocessing
+import orjson
+import os
+
+load_dotenv()
+
+LOADER_WORKERS = int(os.getenv("RAG_LOADER_WORKERS", "0"))  # 0이면 현재 프로세스에서 처리
+LOADER_CHUNK_SIZE = int(os.getenv("RAG_LOADER_CHUNK_SIZE", "256"))  # 작업 단위 (JSON 파일 수 또는 JSONL 줄 수)
+TOKEN_MEMO_SIZE = 65536  # 프로세스마다 최근 토큰화 결과 보관 ("최근기출문제"처럼 반복되는 목차 항목)
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+BOOK_FILE_SUFFIXES = (".json",) + JSONL_SUFFIXES
+
+# 문서 내용: (page_content, 문서 종류, 목차 항목)
+DocumentContent = Tuple[str, str, Optional[str]]
+# 파싱/토큰화까지 끝난 책: (책 정보, 문서 내용 목록, 문서별 토큰 목록)
+PreparedBook = Tuple[Dict, List[DocumentContent], List[List[str]]]
+
+
+# 1. 파일 읽기
+def book_files(directory: str) -> List[str]:
+    """디렉토리의 책 파일 목록 (*.json: 책 한 권 또는 책 목록, *.jsonl / *.ndjson: 한 줄에 한 권)"""
+    return [
+        os.path.join(directory, filename)
+        for filename in sorted(os.listdir(directory))
+        if filename.endswith(BOOK_FILE_SUFFIXES)
+    ]
+
+
+def iter_payloads(directory: str, chunk_size: int = LOADER_CHUNK_SIZE) -> Iterator[List[Tuple[str, bytes]]]:
+    """
+    (출처, JSON 원문)을 chunk_size개씩 묶어서 반환
+    - 디코딩하지 않은 바이트만 읽으므로 워커로 보내는 비용이 작음
+    - JSONL 파일은 줄 단위로 읽으므로 파일 전체가 메모리에 올라오지 않음
+    """
+    chunk = []
+    for path in book_files(directory):
+        if path.endswith(JSONL_SUFFIXES):
+            with open(path, "rb") as f:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    chunk.append((f"{path}:{line_number}", line))
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+        else:
+            with open(path, "rb") as f:
+                chunk.append((path, f.read()))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def decode_books(payloads: List[Tuple[str, bytes]]) -> List[Dict]:
+    """JSON 원문을 책 정보 목록으로 변환 (읽을 수 없는 원문은 경고 후 건너뜀)"""
+    books = []
+    for source, raw in payloads:
+        try:
+            value = orjson.loads(raw)
+        except orjson.JSONDecodeError as e:
+            print(f"⚠️ {source}를 읽을 수 없어 건너뜁니다: {str(e)}")
+            continue
+
+        if isinstance(value, dict):
+            books.append(value)
+        elif isinstance(value, list):
+            books.extend(value)
+        else:
+            print(f"⚠️ {source}는 책 정보가 아니므로 건너뜁니다.")
+    return books
+
+
+def iter_books(directory: str, chunk_size: int = LOADER_CHUNK_SIZE) -> Iterator[Dict]:
+    """디렉토리의 책 정보를 한 권씩 반환"""
+    for payloads in iter_payloads(directory, chunk_size):
+        yield from decode_books(payloads)
+
+
+# 2. 문서 내용 생성 (목차 파싱 + 토큰화)
+def document_contents(book: Dict, structured_toc: List[Dict[str, List[str]]]) -> List[DocumentContent]:
+    """책 한 권의 문서 내용 (제목, 설명, 목차 항목별 "장 - 항목")"""
+    contents = [(book["title"], "title", None), (book["description"], "description", None)]
+    for chapter in structured_toc:
+        for item in chapter["items"]:
+            contents.append((f"{chapter['chapter']} - {item}", "toc", item))
+    return contents
+
+
+def prepare_books(books: List[Dict], parse_toc: Callable, tokenize: Callable) -> List[PreparedBook]:
+    """책마다 목차를 파싱해 문서 내용을 만들고 BM25용 토큰까지 계산"""
+    prepared = []
+    for book in books:
+        contents = document_contents(book, parse_toc(book["toc"]))
+        prepared.append((book, contents, [tokenize(text) for text, _, _ in contents]))
+    return prepared
+
+
+def memoized_tokenize(tokenizer) -> Callable:
+    """같은 문서 내용은 한 번만 토큰화 (반환된 토큰 목록은 읽기만 해야 함)"""
+    return lru_cache(maxsize=TOKEN_MEMO_SIZE)(tokenizer.tokenize)
+
+
+# 3. 워커 프로세스
+_worker = {}
+
+
+def _init_worker(tokenizer_name: str):
+    _worker["tokenize"] = memoized_tokenize(get_tokenizer(tokenizer_name))
+
+
+def _prepare_payloads(payloads: List[Tuple[str, bytes]]) -> List[PreparedBook]:
+    return prepare_books(decode_books(payloads), parse_toc, _worker["tokenize"])
+
+
+def iter_prepared_books(
+    directory: str,
+    tokenizer,
+    workers: int = LOADER_WORKERS,
+    chunk_size: int = LOADER_CHUNK_SIZE,
+) -> Iterator[List[PreparedBook]]:
+    """
+    읽기 -> JSON 디코딩 -> 목차 파싱/문서 내용 생성 -> 토큰화를 묶음 단위로 흘려보내는 제너레이터
+    - workers > 0이면 디코딩부터 토큰화까지(CPU 작업)를 프로세스 풀에서 실행하고 파일 순서대로 반환
+    - 처리 중인 묶음은 워커 수의 2배까지만 두므로 메모리에는 전체 코퍼스가 아니라 몇 묶음만 올라옴
+    """
+    payloads = iter_payloads(directory, chunk_size)
+    if workers <= 0:
+        tokenize = memoized_tokenize(tokenizer)
+        for chunk in payloads:
+            books = decode_books(chunk)
+            # 책 목록 JSON 파일 하나가 커도 문서/토큰은 chunk_size권씩 만들어서 넘김
+            for i in range(0, len(books), chunk_size):
+                yield prepare_books(books[i:i + chunk_size], parse_toc, tokenize)
+        return
+
+    # 검색 스레드 등이 있는 프로세스를 fork하지 않도록 spawn 사용
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(tokenizer.name,),
+    ) as pool:
+        pending = deque()
+        for chunk in payloads:
+            pending.append(pool.submit(_prepare_payloads, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,125 @@
+from typing import Dict, Iterable, List, Optional
+import threading
+import sqlite3
+import os
+
+BOOK_COLUMNS = ("title", "author", "pubDate", "categoryName")
+
+
+class BookStore:
+    """
+    책 정보 테이블 (SQLite)
+    - 문서(Document) metadata에는 정수 book_id만 저장하고 제목, 저자, 목차 등은 이 테이블에서 조회
+    - 목차(toc) HTML은 최종 검색 결과에 포함된 책에 대해서만 읽음
+    - 검색 중에는 읽기 전용 연결만 사용하므로 파일이 바뀌지 않음 (공유 인덱스의 파일 변경 감지와 충돌하지 않음)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._writable = False
+        self._lock = threading.Lock()
+
+    # 1. 연결
+    def _connect(self, write: bool = False) -> sqlite3.Connection:
+        if self._conn is not None and (self._writable or not write):
+            return self._conn
+        if self._conn is not None:
+            self._conn.close()
+
+        if write:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS books (
+                    book_id INTEGER PRIMARY KEY,
+                    book_key TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL,
+                    author TEXT,
+                    pubDate TEXT,
+                    categoryName TEXT,
+                    toc TEXT
+                )
+                """
+            )
+        else:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn, self._writable = conn, write
+        return conn
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def reset(self):
+        """벡터스토어를 새로 만들 때 테이블 비우기"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            if os.path.exists(self.path):
+                os.remove(self.path)  # 이미 열어둔 다른 프로세스는 이전 파일을 계속 읽음
+
+    # 2. 쓰기
+    def upsert_books(self, books: List[Dict], keys: List[str]) -> List[int]:
+        """책 정보를 저장하고 book_id 목록 반환. 같은 키의 책은 같은 book_id를 유지한 채 갱신"""
+        with self._lock:
+            conn = self._connect(write=True)
+            book_ids = []
+            with conn:
+                for book, key in zip(books, keys):
+                    conn.execute(
+                        """
+                        INSERT INTO books (book_key, title, author, pubDate, categoryName, toc)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(book_key) DO UPDATE SET
+                            title = excluded.title, author = excluded.author, pubDate = excluded.pubDate,
+                            categoryName = excluded.categoryName, toc = excluded.toc
+                        """,
+                        (key, *(book.get(column) for column in BOOK_COLUMNS), book.get("toc", "목차 정보 없음")),
+                    )
+                    (book_id,) = conn.execute("SELECT book_id FROM books WHERE book_key = ?", (key,)).fetchone()
+                    book_ids.append(book_id)
+            return book_ids
+
+    def delete_book(self, key: str):
+        with self._lock:
+            conn = self._connect(write=True)
+            with conn:
+                conn.execute("DELETE FROM books WHERE book_key = ?", (key,))
+
+    # 3. 읽기
+    def get_book_id(self, key: str) -> Optional[int]:
+        if not self.exists():
+            return None
+        with self._lock:
+            row = self._connect().execute("SELECT book_id FROM books WHERE book_key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def get_books(self, book_ids: Iterable[int], include_toc: bool = False) -> Dict[int, Dict]:
+        """book_id -> 책 정보. include_toc=True일 때만 목차 HTML을 함께 읽음"""
+        book_ids = list(set(book_ids))
+        if not book_ids or not self.exists():
+            return {}
+
+        columns = ", ".join(("book_id",) + BOOK_COLUMNS + (("toc",) if include_toc else ()))
+        books = {}
+        with self._lock:
+            conn = self._connect()
+            # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for i in range(0, len(book_ids), 500):
+                chunk = book_ids[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT {columns} FROM books WHERE book_id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for book_id, *values in rows:
+                    books[book_id] = dict(zip(BOOK_COLUMNS + ("toc",), values))
+        return books
+
+    def get_category_names(self) -> Dict[int, str]:
+        """모든 책의 book_id -> categoryName (분야 필터 비트맵 생성용)"""
+        if not self.exists():
+            return {}
+        with self._lock:
+            rows = self._connect().execute("SELECT book_id, categoryName FROM books").fetchall()
+        return dict(rows)
@@ -0,0 +1,207 @@
+from AIBookAgent import metrics
+from AIBookAgent.aladin import ITEM_LIST_MAX_RESULTS, get_book, get_item_list
+from AIBookAgent.aladin_scheduler import AladinUnavailable, TokenBucket
+from AIBookAgent.categories import subtree_cids
+from AIBookAgent.hybridRAG import AIBooksRAG, JSON_DIR, get_book_key
+from typing import Dict, List, Union
+from dotenv import load_dotenv
+import orjson
+import time
+import os
+
+load_dotenv()
+
+# 동기화할 분야 (쉼표로 구분. 이름, 경로, CID 모두 가능)
+ALADIN_SYNC_CATEGORIES = [
+    category.strip() for category in os.getenv("ALADIN_SYNC_CATEGORIES", "수험서/자격증").split(",") if category.strip()
+]
+ALADIN_SYNC_QUERY_TYPE = os.getenv("ALADIN_SYNC_QUERY_TYPE", "ItemNewAll")  # 신간 순이라 다시 돌 때 새 책이 앞에 나옴
+ALADIN_SYNC_MAX_PAGES = int(os.getenv("ALADIN_SYNC_MAX_PAGES", "20"))  # 분야 하나에서 가져올 최대 페이지 수
+ALADIN_SYNC_MAX_REQUESTS = int(os.getenv("ALADIN_SYNC_MAX_REQUESTS", "1000"))  # 한 번 실행할 때 보낼 최대 요청 수
+ALADIN_SYNC_RATE_LIMIT = float(os.getenv("ALADIN_SYNC_RATE_LIMIT", "1"))  # 동기화 전용 초당 요청 수 (채팅 요청 몫을 남김)
+ALADIN_SYNC_BATCH_SIZE = int(os.getenv("ALADIN_SYNC_BATCH_SIZE", "100"))  # 이만큼 모이면 색인에 추가하고 파일에 기록
+ALADIN_SYNC_REFRESH_DAYS = float(os.getenv("ALADIN_SYNC_REFRESH_DAYS", "7"))  # 다 돈 분야를 처음부터 다시 도는 주기
+ALADIN_SYNC_CHECKPOINT_PATH = os.path.abspath(
+    os.getenv("ALADIN_SYNC_CHECKPOINT_PATH", "./AIBookAgent/cache/aladin_sync.json")
+)
+
+
+class RequestLimitReached(Exception):
+    """한 번 실행할 때 보낼 수 있는 요청 수를 다 씀"""
+
+
+class CatalogSync:
+    """
+    알라딘 분야별 상품 리스트로 로컬 RAG 코퍼스를 늘리는 동기화 작업
+    1. 선택한 분야(aladin_CID.csv의 하위 분야 전체)의 CID마다 ItemList를 페이지 단위로 가져옴
+    2. 아직 색인에 없는 책만 ItemLookUp으로 목차를 받아옴
+    3. ALADIN_SYNC_BATCH_SIZE권씩 add_books로 색인에 추가한 뒤 코퍼스 디렉토리(books/aladin-<CID>.jsonl)에 기록
+       (벡터스토어 파일이 바뀌므로 서버 워커들은 rag_index의 hot-swap으로 새 인덱스를 사용)
+    - 분야별 다음 페이지를 체크포인트 파일에 저장해서 중단되거나 요청 수 한도에 걸려도 다음 실행에서 이어감
+    - 요청은 알라딘 공용 스케줄러를 거치고, 추가로 동기화 전용 토큰 버킷으로 속도를 낮춤
+      (알라딘 캐시에 있는 책 정보는 요청하지 않으므로 요청 수와 속도 제한에 포함하지 않음)
+    """
+
+    def __init__(
+        self,
+        categories: List = None,
+        rag: AIBooksRAG = None,
+        corpus_dir: str = JSON_DIR,
+        checkpoint_path: str = ALADIN_SYNC_CHECKPOINT_PATH,
+        query_type: str = ALADIN_SYNC_QUERY_TYPE,
+        max_pages: int = ALADIN_SYNC_MAX_PAGES,
+        max_requests: int = ALADIN_SYNC_MAX_REQUESTS,
+        batch_size: int = ALADIN_SYNC_BATCH_SIZE,
+        rate: float = ALADIN_SYNC_RATE_LIMIT,
+    ):
+        self.categories = ALADIN_SYNC_CATEGORIES if categories is None else categories
+        self.rag = rag
+        self.corpus_dir = corpus_dir
+        self.checkpoint_path = checkpoint_path
+        self.query_type = query_type
+        self.max_pages = max_pages
+        self.max_requests = max_requests
+        self.batch_size = batch_size
+        self.bucket = TokenBucket("aladin.sync.rate_limit", rate=rate, burst=1)
+        self.requests = 0
+        self.added = 0
+        self.checkpoint = self._load_checkpoint()
+        self._pending: Dict[int, List[Dict]] = {}  # CID -> 아직 색인에 추가하지 않은 책
+        self._seen = set()  # 이번 실행에서 이미 처리한 ISBN13
+
+    # 1. 체크포인트
+    def _load_checkpoint(self) -> Dict:
+        try:
+            with open(self.checkpoint_path, "rb") as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return {"categories": {}}
+
+    def _save_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        with open(f"{self.checkpoint_path}.tmp", "wb") as f:
+            f.write(orjson.dumps(self.checkpoint, option=orjson.OPT_INDENT_2))
+        os.replace(f"{self.checkpoint_path}.tmp", self.checkpoint_path)
+
+    def _category_state(self, cid: int) -> Dict:
+        state = self.checkpoint["categories"].setdefault(str(cid), {"page": 1, "done_at": None})
+        # 다 돈 분야도 주기가 지나면 새 책을 받기 위해 처음부터 다시 돔 (이미 색인된 책은 건너뛰므로 요청이 적음)
+        if state["done_at"] and time.time() - state["done_at"] >= ALADIN_SYNC_REFRESH_DAYS * 86400:
+            state.update(page=1, done_at=None)
+        return state
+
+    # 2. 요청
+    def _charge(self):
+        """요청 한 번을 보내기 전에 호출. 동기화 전용 속도 제한을 지킴 (요청 수 한도를 넘으면 RequestLimitReached)"""
+        if self.requests >= self.max_requests:
+            raise RequestLimitReached
+        self.requests += 1
+        self.bucket.acquire(max_wait=float("inf"))
+
+    def _call(self, fetch, *args):
+        self._charge()
+        return fetch(*args)
+
+    def _get_rag(self) -> AIBooksRAG:
+        if self.rag is None:
+            self.rag = AIBooksRAG()
+            self.rag.load_vector_store()
+            self.rag.initialize_bm25()
+        return self.rag
+
+    def _is_indexed(self, isbn13: str) -> bool:
+        return isbn13 in self._seen or _in_index(self._get_rag(), isbn13)
+
+    # 3. 분야 하나 동기화
+    def sync_category(self, cid: int):
+        """CID 하나를 체크포인트의 다음 페이지부터 동기화"""
+        state = self._category_state(cid)
+        while not state["done_at"]:
+            listing = self._call(get_item_list, cid, state["page"], self.query_type)
+            items = listing.get("item", [])
+            for item in items:
+                isbn13 = item.get("isbn13")
+                if not isbn13 or self._is_indexed(isbn13):
+                    metrics.incr("catalog_sync.skipped")
+                    continue
+                # 알라딘 캐시에 없어서 실제로 요청할 때만 요청 수와 속도 제한을 씀
+                book = get_book(isbn13, before_request=self._charge)
+                self._seen.add(isbn13)
+                if book is None:
+                    continue
+                self._pending.setdefault(cid, []).append(dict(book, isbn13=isbn13))
+                self.added += 1
+                if sum(len(books) for books in self._pending.values()) >= self.batch_size:
+                    self.flush()
+
+            last_page = min(self.max_pages, -(-int(listing.get("totalResults", 0)) // ITEM_LIST_MAX_RESULTS))
+            if len(items) < ITEM_LIST_MAX_RESULTS or state["page"] >= last_page:
+                state.update(page=1, done_at=time.time())
+            else:
+                state["page"] += 1
+            # 체크포인트는 받아둔 책이 색인에 반영된 뒤에만 저장 (남아 있으면 flush에서 함께 저장)
+            if not self._pending:
+                self._save_checkpoint()
+
+    def flush(self):
+        """
+        모인 책을 색인에 추가하고, 성공하면 코퍼스 파일에 쓴 뒤 체크포인트 저장
+        - 색인 잠금을 잡은 상태에서 처리하므로 다른 동기화 작업과 동시에 쓰지 않음
+        - 그 사이 다른 프로세스가 먼저 추가한 책(같은 ISBN)은 색인에도 파일에도 다시 넣지 않음
+        """
+        if self._pending:
+            rag = self._get_rag()
+            with rag.write_lock():
+                pending = {
+                    cid: [book for book in cid_books if not _in_index(rag, get_book_key(book))]
+                    for cid, cid_books in self._pending.items()
+                }
+                books = [book for cid_books in pending.values() for book in cid_books]
+                self.added -= sum(len(cid_books) for cid_books in self._pending.values()) - len(books)
+                if books:
+                    rag.add_books(books)
+                    # 색인에 반영된 책만 기록 (add_books가 실패하면 파일에도 남기지 않아 다음 실행에서 다시 받음)
+                    os.makedirs(self.corpus_dir, exist_ok=True)
+                    for cid, cid_books in pending.items():
+                        if cid_books:
+                            with open(os.path.join(self.corpus_dir, f"aladin-{cid}.jsonl"), "ab") as f:
+                                f.write(b"".join(orjson.dumps(book) + b"\n" for book in cid_books))
+                    metrics.incr("catalog_sync.added", len(books))
+            self._pending = {}
+        self._save_checkpoint()
+
+    # 4. 전체 실행
+    def run(self) -> Dict:
+        """선택한 분야 전체를 동기화 (요청 수 한도에 걸리거나 알라딘을 쓸 수 없으면 멈추고 다음 실행에서 이어감)"""
+        start = time.perf_counter()
+        cids = sorted({cid for category in self.categories for cid in subtree_cids(_category_arg(category))})
+        print(f"📦 분야 {len(self.categories)}개에서 CID {len(cids)}개를 동기화합니다.")
+
+        completed = 0
+        try:
+            for cid in cids:
+                self.sync_category(cid)
+                completed += 1
+        except RequestLimitReached:
+            print(f"⚠️ 요청 수 한도({self.max_requests})에 도달했습니다. 다음 실행에서 이어갑니다.")
+        except AladinUnavailable as e:
+            print(f"⚠️ 알라딘 API를 사용할 수 없어 동기화를 멈춥니다. 다음 실행에서 이어갑니다: {str(e)}")
+        finally:
+            # 중간에 실패해도 받아둔 책은 색인에 반영 (체크포인트는 완료한 페이지까지만)
+            self.flush()
+
+        elapsed = time.perf_counter() - start
+        metrics.observe("catalog_sync.run", elapsed)
+        print(f"✅ 알라딘 동기화 완료: 새 책 {self.added}권, 완료한 CID {completed}/{len(cids)}개, 요청 {self.requests}회")
+        return {"added": self.added, "completed": completed, "cids": len(cids), "requests": self.requests, "seconds": elapsed}
+
+
+def _in_index(rag: AIBooksRAG, key: str) -> bool:
+    """검색 대상 문서가 있는 책인지 (책 정보만 저장되고 색인 추가에 실패한 책은 다시 받도록 문서 위치로 확인)"""
+    book_id = rag.book_store.get_book_id(key)
+    return book_id is not None and book_id in rag.book_positions
+
+
+def _category_arg(category: Union[str, int]) -> Union[str, int]:
+    """설정 값의 숫자는 CID로 처리"""
+    return int(category) if isinstance(category, str) and category.isdigit() else category
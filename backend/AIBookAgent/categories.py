@@ -0,0 +1,180 @@
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from dotenv import load_dotenv
+import numpy as np
+import threading
+import csv
+import os
+
+load_dotenv()
+
+CATEGORY_CSV_PATH = os.path.abspath("./AIBookAgent/aladin_CID.csv")
+CATEGORY_SEPARATOR = ">"  # 알라딘 categoryName 형식 (예: 국내도서>수험서/자격증>국가기술자격)
+CATEGORY_MASK_CACHE_SIZE = int(os.getenv("RAG_CATEGORY_MASK_CACHE_SIZE", "256"))  # 보관할 분야 비트맵 수
+
+
+def load_categories(path: str = CATEGORY_CSV_PATH) -> List[Dict]:
+    """
+    알라딘 분야(CID) 목록 CSV 읽기
+    - 반환값: {"cid", "name", "path"} 목록. path는 "몰>1Depth>...>5Depth" (알라딘 API의 categoryName과 같은 형식)
+    - 빈 줄은 건너뜀
+    """
+    categories = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader)  # 헤더: CID, 카테고리명, 몰, 1Depth ~ 5Depth
+        for row in reader:
+            if not row or not row[0]:
+                continue
+            cid, name, mall, *depths = row
+            parts = [mall] + [depth for depth in depths[:5] if depth]
+            categories.append({"cid": int(cid), "name": name, "path": CATEGORY_SEPARATOR.join(parts)})
+    return categories
+
+
+@lru_cache(maxsize=1)
+def _csv_category_paths(path: str = CATEGORY_CSV_PATH) -> Dict[int, str]:
+    """CSV의 CID -> 분야 경로 (프로세스마다 한 번만 읽음)"""
+    return {category["cid"]: category["path"] for category in load_categories(path)}
+
+
+def _split_path(path: str) -> Tuple[str, ...]:
+    return tuple(part.strip() for part in path.split(CATEGORY_SEPARATOR) if part.strip())
+
+
+def _tree_nodes(paths: Iterable[Tuple[str, ...]]) -> set:
+    """분야 경로들과 그 중간 경로 전체"""
+    return {parts[:depth] for parts in paths for depth in range(1, len(parts) + 1)}
+
+
+@lru_cache(maxsize=1)
+def _csv_tree_nodes() -> frozenset:
+    return frozenset(_tree_nodes(map(_split_path, _csv_category_paths().values())))
+
+
+def subtree_cids(category: Union[str, int], leaves_only: bool = True) -> List[int]:
+    """
+    CSV에서 분야(하위 분야 포함)에 속한 CID 목록
+    - 분야는 CategoryIndex.resolve와 같이 전체 경로, 경로의 뒷부분, 이름, CID로 줄 수 있음
+    - leaves_only면 하위 분야가 없는 CID만 반환 (상위 분야 리스트는 하위 분야 리스트와 겹치므로)
+    """
+    paths = _csv_category_paths()
+    if isinstance(category, int):
+        if category not in paths:
+            raise ValueError(f"알 수 없는 분야 CID입니다: {category}")
+        category = paths[category]
+    selector = _split_path(str(category))
+    if not selector:
+        raise ValueError(f"알 수 없는 분야입니다: {category}")
+
+    selected = {}
+    for cid, path in paths.items():
+        parts = _split_path(path)
+        if any(parts[:depth][-len(selector):] == selector for depth in range(len(selector), len(parts) + 1)):
+            selected[cid] = parts
+    if not selected:
+        raise ValueError(f"알 수 없는 분야입니다: {category}")
+
+    if leaves_only:
+        parents = {parts[:depth] for parts in selected.values() for depth in range(1, len(parts))}
+        selected = {cid: parts for cid, parts in selected.items() if parts not in parents}
+    return sorted(selected)
+
+
+class CategoryIndex:
+    """
+    분야 트리 + 분야 노드별 문서 비트맵
+    - 노드는 CSV의 분야와 문서들의 categoryName에 나오는 모든 경로(중간 경로 포함)
+    - 노드를 경로 순서(전위 순회)로 번호를 매기면 하위 트리 전체가 연속된 번호 구간이 됨
+    - 문서 위치를 노드 번호 순으로 정렬해두면 어떤 노드든 하위 트리의 문서 목록이 정렬 배열의 한 구간
+    - 노드별 비트맵(문서 위치 -> 포함 여부)은 처음 요청될 때 구간에서 만들고 LRU로 보관
+      (노드 약 2만 개 x 문서 수 비트를 모두 미리 만들면 문서가 많을 때 메모리가 너무 커짐)
+    """
+
+    def __init__(self, doc_categories: Sequence[Optional[str]], category_paths: Sequence[str] = None):
+        # 같은 분야 문자열은 한 번만 나눔
+        split = {path: _split_path(path) for path in set(doc_categories) if path}
+        doc_parts = [split[path] if path else () for path in doc_categories]
+
+        csv_nodes = _csv_tree_nodes() if category_paths is None else _tree_nodes(map(_split_path, category_paths))
+        nodes = sorted(csv_nodes | _tree_nodes(split.values()))
+
+        self.paths = [CATEGORY_SEPARATOR.join(parts) for parts in nodes]
+        self._node_ids = {parts: node for node, parts in enumerate(nodes)}
+        self._by_name = {}  # 분야 이름(경로의 마지막 부분) -> 노드 번호 목록
+        for node, parts in enumerate(nodes):
+            self._by_name.setdefault(parts[-1], []).append(node)
+
+        # 노드마다 하위 트리가 끝나는 노드 번호 (전위 순회이므로 [node, end)가 하위 트리)
+        self._subtree_end = np.arange(1, len(nodes) + 1, dtype=np.int64)
+        stack = []
+        for node, parts in enumerate(nodes):
+            while stack and nodes[stack[-1]] != parts[:len(nodes[stack[-1]])]:
+                self._subtree_end[stack.pop()] = node
+            stack.append(node)
+        for node in stack:
+            self._subtree_end[node] = len(nodes)
+
+        # 문서 위치를 노드 번호 순으로 정렬 (분야가 없는 문서는 어느 노드에도 속하지 않음)
+        doc_nodes = np.asarray([self._node_ids.get(parts, len(nodes)) for parts in doc_parts], dtype=np.int64)
+        self._doc_order = np.argsort(doc_nodes, kind="stable")
+        self._node_starts = np.searchsorted(doc_nodes[self._doc_order], np.arange(len(nodes) + 1))
+        self.n_docs = len(doc_parts)
+        self._masks = OrderedDict()  # 정규화한 필터 -> 문서 비트맵
+        self._lock = threading.Lock()
+
+    def resolve(self, category: Union[str, int, Iterable]) -> List[int]:
+        """
+        분야 필터 -> 노드 번호 목록
+        - "국내도서>수험서/자격증"처럼 전체 경로, "수험서/자격증>공무원"처럼 경로의 뒷부분,
+          "수험서/자격증"처럼 이름만 주거나 CID(정수)를 줄 수 있음. 여러 노드와 맞으면 모두 포함
+        - 여러 필터를 목록으로 주면 합집합
+        """
+        if isinstance(category, (list, tuple, set)):
+            return sorted({node for item in category for node in self.resolve(item)})
+        if isinstance(category, int):
+            category = self._cid_path(category)
+
+        parts = _split_path(str(category))
+        if parts in self._node_ids:
+            return [self._node_ids[parts]]
+        candidates = self._by_name.get(parts[-1], []) if parts else []
+        nodes = [node for node in candidates if _split_path(self.paths[node])[-len(parts):] == parts]
+        if not nodes:
+            raise ValueError(f"알 수 없는 분야입니다: {category}")
+        return nodes
+
+    @staticmethod
+    def _cid_path(cid: int) -> str:
+        path = _csv_category_paths().get(cid)
+        if path is None:
+            raise ValueError(f"알 수 없는 분야 CID입니다: {cid}")
+        return path
+
+    def positions(self, category) -> np.ndarray:
+        """분야 필터(하위 분야 포함)에 속한 문서 위치 (오름차순)"""
+        nodes = self.resolve(category)
+        chunks = [
+            self._doc_order[self._node_starts[node]:self._node_starts[self._subtree_end[node]]]
+            for node in nodes
+        ]
+        return np.unique(np.concatenate(chunks)) if chunks else np.zeros(0, dtype=np.int64)
+
+    def mask(self, category) -> np.ndarray:
+        """분야 필터에 속한 문서 위치가 True인 비트맵 (읽기 전용으로만 사용)"""
+        key = tuple(self.resolve(category))
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                return mask
+
+        mask = np.zeros(self.n_docs, dtype=bool)
+        mask[self.positions(category)] = True
+        mask.flags.writeable = False
+        with self._lock:
+            self._masks[key] = mask
+            while len(self._masks) > CATEGORY_MASK_CACHE_SIZE:
+                self._masks.popitem(last=False)
+        return mask
@@ -0,0 +1,201 @@
+from langchain_core.embeddings import Embeddings
+from AIBookAgent import metrics
+from collections import OrderedDict
+from typing import List, Optional
+from dotenv import load_dotenv
+import numpy as np
+import unicodedata
+import threading
+import hashlib
+import sqlite3
+import time
+import os
+
+load_dotenv()
+
+EMBEDDING_CACHE_PATH = os.path.abspath(
+    os.getenv("RAG_EMBEDDING_CACHE_PATH", "./AIBookAgent/cache/query_embeddings.sqlite3")
+)
+EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("RAG_EMBEDDING_CACHE_MEMORY_SIZE", "2048"))
+EMBEDDING_CACHE_DISK_SIZE = int(os.getenv("RAG_EMBEDDING_CACHE_DISK_SIZE", "200000"))
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 질의 정규화 (유니코드 NFKC, 앞뒤 공백 제거, 연속 공백을 하나로)"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    질의 임베딩 2단계 캐시
+    - 1단계: 프로세스 내 LRU (OrderedDict)
+    - 2단계: 디스크 SQLite (워커 간 공유, 재시작 후에도 유지, 오래 안 쓴 항목부터 삭제)
+    - 키는 (모델 이름, 정규화된 질의). 캐시에 있으면 임베딩 API를 호출하지 않음
+    - 문서 임베딩(embed_documents)은 캐시하지 않고 그대로 전달
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        cache_path: Optional[str] = EMBEDDING_CACHE_PATH,
+        memory_size: int = EMBEDDING_CACHE_MEMORY_SIZE,
+        disk_size: int = EMBEDDING_CACHE_DISK_SIZE,
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._inserts = 0
+        if cache_path:
+            self._open(cache_path)
+
+    # 1. 디스크 캐시 (SQLite)
+    def _open(self, cache_path: str):
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            conn = sqlite3.connect(cache_path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_query_embeddings_last_used ON query_embeddings(last_used)")
+            self._conn = conn
+        except sqlite3.Error as e:
+            # 디스크 캐시를 쓸 수 없어도 검색은 계속 동작해야 함
+            print(f"⚠️ 임베딩 디스크 캐시를 열 수 없습니다. 메모리 캐시만 사용합니다: {str(e)}")
+
+    def _disk_get(self, key: str) -> Optional[List[float]]:
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT vector FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE query_embeddings SET last_used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error:
+            return None
+        return None if row is None else np.frombuffer(row[0], dtype=np.float32).tolist()
+
+    def _disk_put(self, key: str, vector: List[float]):
+        if self._conn is None:
+            return
+        blob = np.asarray(vector, dtype=np.float32).tobytes()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    (key, blob, time.time()),
+                )
+                self._inserts += 1
+                # 삽입 100번마다 크기 제한을 넘은 만큼 오래된 항목 삭제
+                if self._inserts % 100 == 0:
+                    self._evict()
+        except sqlite3.Error as e:
+            print(f"⚠️ 임베딩 디스크 캐시 저장 실패: {str(e)}")
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM query_embeddings").fetchone()
+        if count > self.disk_size:
+            self._conn.execute(
+                """
+                DELETE FROM query_embeddings WHERE key IN (
+                    SELECT key FROM query_embeddings ORDER BY last_used LIMIT ?
+                )
+                """,
+                (count - self.disk_size,),
+            )
+            metrics.incr("embedding_cache.evicted", count - self.disk_size)
+
+    # 2. 메모리 캐시 (LRU)
+    def _memory_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+            return vector
+
+    def _memory_put(self, key: str, vector: List[float]):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    # 3. Embeddings 인터페이스
+    def cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        """메모리 -> 디스크 순서로 캐시 조회"""
+        vector = self._memory_get(key)
+        if vector is not None:
+            metrics.incr("embedding_cache.hit")
+            metrics.incr("embedding_cache.memory_hit")
+            return vector
+
+        vector = self._disk_get(key)
+        if vector is not None:
+            metrics.incr("embedding_cache.hit")
+            metrics.incr("embedding_cache.disk_hit")
+            self._memory_put(key, vector)
+            return vector
+
+        metrics.incr("embedding_cache.miss")
+        return None
+
+    def embed_query(self, text: str) -> List[float]:
+        """캐시(메모리 -> 디스크)를 먼저 확인하고 없을 때만 임베딩 API 호출"""
+        key = self.cache_key(text)
+
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(normalize_query(text))
+            self._memory_put(key, vector)
+            self._disk_put(key, vector)
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 질의를 임베딩. 캐시에 없는 질의만 모아서 API를 한 번만 호출 (같은 질의는 한 번만 요청)"""
+        keys = [self.cache_key(text) for text in texts]
+        vectors = {}
+        missing = {}  # 캐시 키 -> 정규화된 질의
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            vector = self._lookup(key)
+            if vector is None:
+                missing[key] = normalize_query(text)
+            else:
+                vectors[key] = vector
+
+        if missing:
+            for key, vector in zip(missing, self.embeddings.embed_documents(list(missing.values()))):
+                self._memory_put(key, vector)
+                self._disk_put(key, vector)
+                vectors[key] = vector
+        return [vectors[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def stats(self) -> dict:
+        """캐시 적중/미스 횟수와 적중률"""
+        counters = metrics.snapshot()["counters"]
+        return {
+            "memory_hit": counters.get("embedding_cache.memory_hit", 0),
+            "disk_hit": counters.get("embedding_cache.disk_hit", 0),
+            "miss": counters.get("embedding_cache.miss", 0),
+            "hit_rate": metrics.hit_rate("embedding_cache"),
+            "memory_items": len(self._memory),
+        }
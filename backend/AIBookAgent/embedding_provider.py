@@ -0,0 +1,178 @@
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+from AIBookAgent.tokenizer import get_tokenizer
+from functools import lru_cache
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+import numpy as np
+import hashlib
+import json
+import math
+import os
+
+load_dotenv()
+
+# 임베딩 제공자: openai(API), hashing(네트워크 없이 CPU에서 계산)
+EMBEDDING_PROVIDER = os.getenv("RAG_EMBEDDING_PROVIDER", "openai")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# OPENAI_EMBEDDING_MODEL은 예전 Streamlit 앱(AIBook.py)의 설정이라 RAG에서는 읽지 않음 (기존 벡터스토어와 모델이 달라짐)
+OPENAI_EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "text-embedding-3-small")
+# text-embedding-3 모델은 출력 차원을 줄일 수 있음 (예: 512, 256). 0이면 모델 기본 차원
+OPENAI_EMBEDDING_DIMENSIONS_OVERRIDE = int(os.getenv("RAG_EMBEDDING_DIMENSIONS", "0"))
+HASHING_DIMENSION = int(os.getenv("RAG_HASHING_DIMENSION", "512"))
+HASHING_CHAR_NGRAM = 3
+
+# 모델별 기본 출력 차원 (목록에 없는 모델은 만들어진 인덱스의 차원을 그대로 기록)
+OPENAI_EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+# 출력 차원을 줄일 수 있는 모델
+OPENAI_SHORTENABLE_MODELS = ("text-embedding-3-small", "text-embedding-3-large")
+
+# 벡터스토어 디렉토리 안에 함께 저장하는 임베딩 정보 파일
+EMBEDDING_INFO_FILENAME = "embedding.json"
+# 이 파일이 생기기 전에 만든 벡터스토어는 모두 OpenAI text-embedding-3-small로 만든 것
+LEGACY_EMBEDDING_INFO = {"provider": "openai", "model": "text-embedding-3-small"}
+
+
+class EmbeddingMismatchError(ValueError):
+    """벡터스토어를 만든 임베딩과 현재 설정된 임베딩이 다른 경우"""
+
+
+class EmbeddingProvider:
+    """
+    임베딩 제공자
+    - embeddings: 문서/질의 임베딩에 쓰는 LangChain Embeddings
+    - name, model, dimension: 벡터스토어와 함께 저장해서 다른 임베딩으로 만든 인덱스를 로드하지 않도록 확인
+    """
+
+    def __init__(self, name: str, model: str, dimension: Optional[int], embeddings: Embeddings):
+        self.name = name
+        self.model = model
+        self.dimension = dimension
+        self.embeddings = embeddings
+
+    @property
+    def cache_name(self) -> str:
+        """
+        질의 임베딩 캐시 키와 문서 임베딩 체크포인트 디렉토리에 쓰는 이름
+        - OpenAI 기본 차원은 기존처럼 모델 이름, 줄인 차원은 "모델-차원" (같은 모델이어도 벡터가 다름)
+        """
+        if self.name != "openai":
+            return f"{self.name}-{self.model}"
+        if self.dimension and self.dimension != OPENAI_EMBEDDING_DIMENSIONS.get(self.model):
+            return f"{self.model}-{self.dimension}"
+        return self.model
+
+    def info(self, dimension: int) -> Dict:
+        return {"provider": self.name, "model": self.model, "dimension": dimension}
+
+    def save_info(self, directory: str, dimension: int):
+        """벡터스토어 디렉토리에 임베딩 정보 저장"""
+        path = os.path.join(directory, EMBEDDING_INFO_FILENAME)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.info(dimension), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def check_info(self, directory: str, dimension: int):
+        """
+        저장된 임베딩 정보가 현재 제공자와 같은지 확인 (다르면 EmbeddingMismatchError)
+        - 질의 벡터와 문서 벡터가 서로 다른 임베딩 공간이면 검색 결과가 의미 없으므로 로드하지 않음
+        """
+        try:
+            with open(os.path.join(directory, EMBEDDING_INFO_FILENAME), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            stored = {**LEGACY_EMBEDDING_INFO, "dimension": dimension}
+
+        expected = self.info(self.dimension or dimension)
+        if stored.get("dimension") != dimension or stored != expected:
+            raise EmbeddingMismatchError(
+                f"벡터스토어의 임베딩({stored.get('provider')}/{stored.get('model')}, {stored.get('dimension')}차원, "
+                f"인덱스 {dimension}차원)이 현재 설정({expected['provider']}/{expected['model']}, "
+                f"{expected['dimension']}차원)과 다릅니다. 벡터스토어를 다시 생성하세요."
+            )
+
+
+@lru_cache(maxsize=262144)
+def _bucket(feature: str, dimension: int):
+    """특징 -> (차원 위치, 부호). 프로세스가 달라도 같은 값이 나오도록 blake2b 사용"""
+    value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return value % dimension, 1.0 if value >> 63 else -1.0
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    네트워크 없이 CPU에서 계산하는 임베딩 (feature hashing)
+    - 검색용 토크나이저의 토큰(단어, 한글 bigram)과 공백을 뺀 글자 trigram을 부호 있는 해시로 dimension 차원에 누적
+    - 특징 빈도는 1 + log(tf)로 완화하고 길이 1로 정규화 (OpenAI 임베딩처럼 L2 거리로 코사인 유사도 비교)
+    - 모델 파일이나 학습이 필요 없어 오프라인 벤치마크와 테스트 환경에서 사용
+    """
+
+    def __init__(self, dimension: int = HASHING_DIMENSION, tokenizer_name: str = "korean"):
+        self.dimension = dimension
+        self.tokenizer = get_tokenizer(tokenizer_name)
+
+    def _features(self, text: str) -> Dict[str, int]:
+        counts = {}
+        for token in self.tokenizer.tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        chars = "".join(text.lower().split())
+        for i in range(len(chars) - HASHING_CHAR_NGRAM + 1):
+            gram = f"#{chars[i:i + HASHING_CHAR_NGRAM]}"
+            counts[gram] = counts.get(gram, 0) + 1
+        return counts
+
+    def _vector(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature, count in self._features(text).items():
+            position, sign = _bucket(feature, self.dimension)
+            vector[position] += sign * (1.0 + math.log(count))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vector(text).tolist()
+
+
+def _openai_provider(model: str = None, dimensions: int = None) -> EmbeddingProvider:
+    model = model or OPENAI_EMBEDDING_MODEL
+    dimensions = OPENAI_EMBEDDING_DIMENSIONS_OVERRIDE if dimensions is None else dimensions
+    if dimensions and model not in OPENAI_SHORTENABLE_MODELS:
+        raise ValueError(f"{model} 모델은 출력 차원을 줄일 수 없습니다. (가능한 모델: {', '.join(OPENAI_SHORTENABLE_MODELS)})")
+    return EmbeddingProvider(
+        "openai",
+        model,
+        dimensions or OPENAI_EMBEDDING_DIMENSIONS.get(model),
+        # dimensions를 주면 API가 앞쪽 차원만 남기고 다시 정규화한 벡터를 반환
+        OpenAIEmbeddings(model=model, openai_api_key=OPENAI_API_KEY, dimensions=dimensions or None),
+    )
+
+
+def _hashing_provider(model: str = None, dimensions: int = None) -> EmbeddingProvider:
+    # model은 차원 수 (예: "768")
+    dimension = dimensions or (int(model) if model else HASHING_DIMENSION)
+    return EmbeddingProvider("hashing", str(dimension), dimension, HashingEmbeddings(dimension))
+
+
+EMBEDDING_PROVIDERS = {
+    "openai": _openai_provider,
+    "hashing": _hashing_provider,
+}
+
+
+def get_embedding_provider(name: str = None, model: str = None, dimensions: int = None) -> EmbeddingProvider:
+    """
+    이름으로 임베딩 제공자 생성. 이름이 없으면 RAG_EMBEDDING_PROVIDER 환경 변수 사용
+    - dimensions: 줄인 출력 차원 (OpenAI는 기본값 RAG_EMBEDDING_DIMENSIONS)
+    """
+    name = name or EMBEDDING_PROVIDER
+    if name not in EMBEDDING_PROVIDERS:
+        raise ValueError(f"지원하지 않는 임베딩 제공자입니다: {name} (가능한 값: {', '.join(EMBEDDING_PROVIDERS)})")
+    return EMBEDDING_PROVIDERS[name](model, dimensions)
@@ -0,0 +1,175 @@
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+import numpy as np
+import faiss
+import math
+import os
+
+load_dotenv()
+
+# 인덱스 종류: flat(전수 탐색), ivf_flat, hnsw, ivf_pq
+FAISS_INDEX_TYPE = os.getenv("RAG_FAISS_INDEX", "flat")
+FAISS_NLIST = int(os.getenv("RAG_FAISS_NLIST", "0"))  # 0이면 벡터 수에 맞춰 자동 결정
+FAISS_NPROBE = int(os.getenv("RAG_FAISS_NPROBE", "16"))
+FAISS_HNSW_M = int(os.getenv("RAG_FAISS_HNSW_M", "32"))
+FAISS_EF_SEARCH = int(os.getenv("RAG_FAISS_EF_SEARCH", "64"))
+FAISS_PQ_M = int(os.getenv("RAG_FAISS_PQ_M", "0"))  # 0이면 차원 / 4 (벡터당 d바이트, float32 대비 1/4)
+FAISS_TRAIN_SAMPLE = int(os.getenv("RAG_FAISS_TRAIN_SAMPLE", "100000"))
+FAISS_MMAP = os.getenv("RAG_FAISS_MMAP", "true") == "true"
+# 벡터 저장 형식: float32(원래 값), fp16(절반 크기), sq8(차원마다 8비트 스칼라 양자화, 1/4 크기). ivf_pq에는 적용되지 않음
+FAISS_STORAGE = os.getenv("RAG_FAISS_STORAGE", "float32")
+SUBSET_SEARCH_BLOCK = 4096  # 부분 집합 전수 탐색 시 한 번에 복사하는 벡터 수
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+STORAGE_TYPES = ("float32", "fp16", "sq8")
+# 저장 형식별 index_factory 인코딩 (flat / IVF 목록 / HNSW 저장소)
+_STORAGE_CODES = {
+    "float32": ("Flat", "Flat", ""),
+    "fp16": ("SQfp16", "SQfp16", "_SQfp16"),
+    "sq8": ("SQ8", "SQ8", "_SQ8"),
+}
+MIN_POINTS_PER_CENTROID = 39  # faiss k-means가 경고 없이 학습하는 최소 비율
+
+
+def _nlist(n: int) -> int:
+    """IVF 클러스터 수 (기본값: 4 * sqrt(n), 학습 데이터가 부족하면 줄임)"""
+    nlist = FAISS_NLIST or int(4 * math.sqrt(n))
+    return max(1, min(nlist, n // MIN_POINTS_PER_CENTROID))
+
+
+def _pq_m(d: int) -> int:
+    """PQ 부분 벡터 수 (차원을 나누어 떨어지게)"""
+    m = FAISS_PQ_M or max(1, d // 4)
+    while d % m:
+        m -= 1
+    return m
+
+
+def index_spec(index_type: str, n: int, d: int, storage: str = None) -> str:
+    """faiss.index_factory 문자열 (storage: 벡터 저장 형식, 기본값 RAG_FAISS_STORAGE)"""
+    storage = storage or FAISS_STORAGE
+    if storage not in _STORAGE_CODES:
+        raise ValueError(f"지원하지 않는 벡터 저장 형식입니다: {storage} (가능한 값: {', '.join(STORAGE_TYPES)})")
+    flat_code, ivf_code, hnsw_suffix = _STORAGE_CODES[storage]
+
+    if index_type == "flat":
+        return flat_code
+    if index_type == "ivf_flat":
+        return f"IVF{_nlist(n)},{ivf_code}"
+    if index_type == "hnsw":
+        # HNSW는 M 대신 "HNSW32_SQ8"처럼 저장소 형식을 붙임
+        return f"HNSW{FAISS_HNSW_M}{hnsw_suffix}" if hnsw_suffix else f"HNSW{FAISS_HNSW_M},Flat"
+    if index_type == "ivf_pq":
+        # PQ 코드북(256개 중심)을 학습할 데이터가 부족하면 IVF-Flat 사용
+        if n < 256 * MIN_POINTS_PER_CENTROID:
+            print(f"⚠️ 벡터 {n}개로는 PQ를 학습하기 부족해 ivf_flat 인덱스를 사용합니다.")
+            return index_spec("ivf_flat", n, d, storage)
+        return f"IVF{_nlist(n)},PQ{_pq_m(d)}x8"
+    raise ValueError(f"지원하지 않는 FAISS 인덱스 종류입니다: {index_type} (가능한 값: {', '.join(INDEX_TYPES)})")
+
+
+def build_index(vectors: np.ndarray, index_type: str = None, seed: int = 0, storage: str = None) -> faiss.Index:
+    """
+    빈 인덱스 생성 및 학습 (벡터 추가는 LangChain FAISS.add_embeddings에서 수행)
+    - 학습이 필요한 인덱스(IVF, PQ, SQ8)는 전체 중 최대 FAISS_TRAIN_SAMPLE개를 무작위로 뽑아 학습
+    - 거리는 LangChain 기본값과 같은 L2
+    """
+    index_type = index_type or FAISS_INDEX_TYPE
+    n, d = vectors.shape
+    index = faiss.index_factory(d, index_spec(index_type, n, d, storage), faiss.METRIC_L2)
+
+    if not index.is_trained:
+        sample = vectors
+        if n > FAISS_TRAIN_SAMPLE:
+            rng = np.random.default_rng(seed)
+            sample = vectors[np.sort(rng.choice(n, FAISS_TRAIN_SAMPLE, replace=False))]
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+    return index
+
+
+def search_parameters(index: faiss.Index, sel: faiss.IDSelector = None):
+    """인덱스 종류에 맞는 검색 파라미터 (nprobe / efSearch, 삭제 문서 제외용 selector)"""
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=sel, nprobe=FAISS_NPROBE)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=sel, efSearch=FAISS_EF_SEARCH)
+    return None if sel is None else faiss.SearchParameters(sel=sel)
+
+
+def stored_vectors(index: faiss.Index) -> Optional[np.ndarray]:
+    """
+    원래 벡터를 그대로 저장하는 인덱스(Flat, HNSW의 Flat 저장소)의 (ntotal, d) 벡터 배열
+    - 복사 없이 인덱스 메모리를 그대로 참조하므로 인덱스가 바뀌기 전까지만 사용
+    - IVF/PQ 인덱스는 None
+    """
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    if not isinstance(index, faiss.IndexFlat) or index.ntotal == 0:
+        return None
+    return faiss.rev_swig_ptr(index.get_xb(), index.ntotal * index.d).reshape(index.ntotal, index.d)
+
+
+def search_subset(vectors: np.ndarray, query_vectors: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    ids 위치의 벡터만 전수 탐색 (index.search와 같은 형태의 (L2 제곱 거리, 위치) 행렬, 모자라는 자리는 -1)
+    - 전체 인덱스 대신 부분 집합만 읽으므로 비용이 부분 집합 크기에 비례
+    """
+    distances = np.full((len(query_vectors), k), np.inf, dtype=np.float32)
+    positions = np.full((len(query_vectors), k), -1, dtype=np.int64)
+    for start in range(0, len(ids), SUBSET_SEARCH_BLOCK):
+        block = ids[start:start + SUBSET_SEARCH_BLOCK]
+        block_distances, block_positions = faiss.knn(
+            query_vectors, np.ascontiguousarray(vectors[block]), min(k, len(block))
+        )
+        # 지금까지의 상위 k개와 이번 블록의 상위 k개를 합쳐 다시 상위 k개 선택
+        distances = np.concatenate([distances, block_distances], axis=1)
+        positions = np.concatenate([positions, block[block_positions]], axis=1)
+        top = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        distances = np.take_along_axis(distances, top, axis=1)
+        positions = np.take_along_axis(positions, top, axis=1)
+    return distances, positions
+
+
+def _scalar_quantizer(index: faiss.Index):
+    """스칼라 양자화로 벡터를 저장하는 인덱스의 ScalarQuantizer (없으면 None)"""
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    if isinstance(index, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        return index.sq
+    return None
+
+
+def is_lossy(index: faiss.Index) -> bool:
+    """
+    저장된 벡터를 원래 값 그대로 복원할 수 없는 인덱스인지 (PQ, SQ8)
+    - fp16은 복원한 값으로 다시 만들어도 같은 값이 되므로 손실로 보지 않음
+    """
+    sq = _scalar_quantizer(index)
+    if sq is not None:
+        return sq.qtype != faiss.ScalarQuantizer.QT_fp16
+    return isinstance(index, faiss.IndexIVFPQ)
+
+
+def vector_bytes(index: faiss.Index) -> int:
+    """인덱스에 벡터 하나를 저장하는 데 드는 바이트 수 (HNSW 그래프, IVF id 등 부가 정보 제외)"""
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    index = faiss.downcast_index(index)
+    return int(getattr(index, "code_size", 4 * index.d))
+
+
+def read_index(path: str, mmap: bool = FAISS_MMAP) -> faiss.Index:
+    """
+    인덱스 파일 읽기
+    - mmap=True면 IVF 인덱스의 벡터 목록을 메모리 매핑해서 여러 워커가 같은 페이지를 공유
+      (읽기 전용이므로 벡터를 추가하기 전에는 mmap=False로 다시 읽어야 함)
+    """
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+    return faiss.read_index(path, flags)
+
+
+def is_mmapped(index: faiss.Index) -> bool:
+    """읽기 전용으로 메모리 매핑된 인덱스인지 (벡터 추가 불가)"""
+    return isinstance(index, faiss.IndexIVF) and isinstance(
+        faiss.downcast_InvertedLists(index.invlists), faiss.OnDiskInvertedLists
+    )
@@ -1,22 +1,74 @@
 from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain.schema import Document
 from typing import List, Dict, Tuple
-from rank_bm25 import BM25Okapi
+from AIBookAgent.bm25 import SparseBM25
+from AIBookAgent.tokenizer import TokenCache, get_tokenizer
+from AIBookAgent.embedding_cache import CachedQueryEmbeddings
+from AIBookAgent.embedding_provider import EmbeddingMismatchError, EmbeddingProvider, get_embedding_provider
+from AIBookAgent.ingest import EmbeddingPipeline, EMBEDDING_CHECKPOINT_DIR
+from AIBookAgent.book_store import BookStore
+from AIBookAgent.categories import CategoryIndex
+from AIBookAgent.toc_parser import parse_toc
+from AIBookAgent.book_loader import DocumentContent, document_contents, iter_books, iter_prepared_books
+from AIBookAgent import metrics, versioned_dir
+from AIBookAgent.faiss_index import (
+    FAISS_INDEX_TYPE, FAISS_STORAGE, build_index, read_index, search_parameters, search_subset, stored_vectors, is_lossy, is_mmapped,
+)
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+import numpy as np
+import threading
+import fcntl
+import hashlib
+import faiss
 import pickle
 import json
+import time
 import os
 
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
 JSON_DIR = os.path.abspath("./AIBookAgent/books")
 VECTOR_STORE_PATH = os.path.abspath("./AIBookAgent/books_vectorstore")
-METADATA_PATH = os.path.abspath("./AIBookAgent/books_vectorstore/index.pkl")
+LEXICAL_INDEX_PATH = os.path.abspath("./AIBookAgent/cache/bm25")  # 벡터스토어에서 다시 만들 수 있는 캐시
+TOKEN_CACHE_DIR = os.path.abspath("./AIBookAgent/cache/tokens")
+# 저장할 때마다 books_vectorstore/current-<시각>/에 index.faiss, index.pkl, embedding.json을 함께 쓰고
+# books_vectorstore/current 링크를 바꿔서 공개 (링크가 없으면 books_vectorstore/의 예전 파일 사용)
+CURRENT_STORE_LINK = "current"
+TOMBSTONE_PATH = os.path.abspath("./AIBookAgent/books_vectorstore/tombstones.json")
+BOOK_STORE_PATH = os.path.abspath("./AIBookAgent/books_vectorstore/books.sqlite3")
+SEMANTIC_TIMEOUT = float(os.getenv("RAG_SEMANTIC_TIMEOUT", "5"))  # 질의 임베딩(API 호출) 포함
+LEXICAL_TIMEOUT = float(os.getenv("RAG_LEXICAL_TIMEOUT", "2"))
+SEARCH_WORKERS = int(os.getenv("RAG_SEARCH_WORKERS", "8"))
+FUSION_METHOD = os.getenv("RAG_FUSION_METHOD", "normalized")  # normalized 또는 rrf
+FUSION_CANDIDATES = int(os.getenv("RAG_FUSION_CANDIDATES", "100"))  # 검색마다 가져올 후보 문서 수
+RRF_K = 60
+# 최고 관련도가 이보다 낮으면 로컬 코퍼스에 맞는 책이 없다고 보고 알라딘에서 검색 (결합 방식별로 따로 설정)
+# - 관련도는 결합 방식과 상관없이 코사인 유사도와 정규화한 BM25 점수의 가중합 (0~1)
+# - rrf 점수는 순위만으로 계산하므로 코퍼스에 없는 질의에서도 1위 책이 1에 가까워 기준으로 쓸 수 없음
+FALLBACK_THRESHOLDS = {
+    "normalized": float(os.getenv("RAG_FALLBACK_THRESHOLD_NORMALIZED", "0.5")),
+    "rrf": float(os.getenv("RAG_FALLBACK_THRESHOLD_RRF", "0.5")),
+}
+# 검색 대상 문서가 이 수 이하면 인덱스 대신 해당 문서 벡터만 전수 탐색 (Flat 인덱스는 전체의 절반 이하면 항상)
+FILTER_EXACT_LIMIT = int(os.getenv("RAG_FILTER_EXACT_LIMIT", "20000"))
+
+# FAISS 검색과 BM25 검색을 동시에 실행하기 위한 프로세스 공용 스레드 풀
+_search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="hybrid-search")
+
+
+def current_store_dir(vector_store_path: str = VECTOR_STORE_PATH) -> str:
+    """index.faiss, index.pkl, embedding.json이 있는 현재 버전의 디렉토리"""
+    return versioned_dir.resolve(os.path.join(vector_store_path, CURRENT_STORE_LINK)) or vector_store_path
+
+
+def get_book_key(book: Dict) -> str:
+    """색인에서 책을 구분하는 키 (ISBN13이 있으면 ISBN13, 없으면 제목)"""
+    return str(book.get("isbn13") or book.get("isbn") or book["title"])
+
 
 class AIBooksRAG:
     """
@@ -26,149 +78,206 @@ class AIBooksRAG:
     - 하이브리드 검색 기능 제공
     """
 
-    def __init__(self):
+    def __init__(self, embedding_provider: EmbeddingProvider = None):
         self.vector_store = None
         self.metadata = []
         self.bm25 = None
-        self.embeddings = OpenAIEmbeddings(model=OPENAI_EMBEDDING_MODEL, openai_api_key=OPENAI_API_KEY)
+        self.documents = []  # FAISS 인덱스 순서(= BM25 문서 번호 순서)의 문서 목록
+        self.deleted = np.zeros(0, dtype=bool)  # 삭제 표시된 문서 위치 (compact 전까지 유지)
+        self.book_positions = {}  # book_id -> 문서 위치 목록
+        self.doc_books = np.zeros(0, dtype=np.int64)  # 문서 위치 -> book_id (예전 형식의 문서는 음수 코드)
+        self.category_index = None  # 분야 트리 + 분야별 문서 비트맵
+        self.book_store = BookStore(BOOK_STORE_PATH)  # 제목/저자/목차 등 책 정보
+        # 임베딩 제공자 (RAG_EMBEDDING_PROVIDER: openai, hashing). 벡터스토어에 제공자/모델/차원을 함께 기록
+        self.embedding_provider = embedding_provider or get_embedding_provider()
+        # 질의 임베딩은 캐시(메모리 LRU + 디스크 SQLite)를 거쳐 같은 질의의 API 호출을 생략
+        self.embeddings = CachedQueryEmbeddings(
+            self.embedding_provider.embeddings,
+            model_name=self.embedding_provider.cache_name,
+        )
         self.json_dir = JSON_DIR
         self.vector_store_path = VECTOR_STORE_PATH
-        self.metadata_path = METADATA_PATH
+        self.lexical_index_path = LEXICAL_INDEX_PATH
+        self.token_cache_dir = TOKEN_CACHE_DIR
+        self.embedding_checkpoint_dir = EMBEDDING_CHECKPOINT_DIR
+        self.tombstone_path = TOMBSTONE_PATH
+        self.faiss_index_type = FAISS_INDEX_TYPE  # flat, ivf_flat, hnsw, ivf_pq
+        self.faiss_storage = FAISS_STORAGE  # float32, fp16, sq8
+        self.tokenizer = get_tokenizer()
+        self._token_cache = None  # 문서 토큰 캐시 (처음 사용할 때 파일을 한 번 읽고 이후 재사용)
+        self._write_lock = threading.RLock()
+        self._write_lock_file = None  # 다른 프로세스와 공유하는 파일 잠금 (잡고 있는 동안만 열림)
+        self._store_stamp = None  # 마지막으로 로드/저장한 색인 파일의 (inode, 수정 시각)
 
     # 1. 임베딩 생성 함수
     def get_embedding(self, text: str) -> List[float]:
-        """텍스트를 OpenAI 임베딩 모델로 임베딩"""
+        """텍스트를 설정된 임베딩 제공자로 임베딩"""
         return self.embeddings.embed_query(text)
 
     # 2. 목차 파싱 함수
     def parse_toc(self, toc_html: str) -> List[Dict[str, List[str]]]:
         """HTML 형태의 목차 데이터를 파싱하여 계층적 구조로 반환"""
-        soup = BeautifulSoup(toc_html, "html.parser")
-        chapters = [b.get_text() for b in soup.find_all("b")]
-        items = [
-            br.next_sibling.strip()
-            for br in soup.find_all("br")
-            if br.next_sibling and isinstance(br.next_sibling, str)
-        ]
-
-        structured_toc = []
-        current_chapter = None
-
-        for item in items:
-            if item in chapters:
-                current_chapter = item
-                structured_toc.append({"chapter": current_chapter, "items": []})
-            elif current_chapter:
-                structured_toc[-1]["items"].append(item)
-
-        return structured_toc
+        return parse_toc(toc_html)
 
     # 3. 데이터 임베딩 및 문서 생성 함수
-    def create_documents(self, book_data: List) -> List[Document]:
-        """책 데이터를 LangChain Document로 변환"""
+    def create_documents(self, book_data: List, book_ids: List[int] = None) -> List[Document]:
+        """
+        책 데이터를 LangChain Document로 변환
+        - 책 정보는 BookStore에 한 번만 저장하고, 문서 metadata에는 book_id만 저장
+        """
+        if book_ids is None:
+            book_ids = self.book_store.upsert_books(book_data, [get_book_key(book) for book in book_data])
+
         documents = []
         
-        for book in book_data:
-            # 책 기본 정보
-            documents.append(Document(
-                page_content=book["title"],
-                metadata={
-                    "type": "title",
-                    "title": book["title"],
-                    "author": book["author"],
-                    "pubDate": book["pubDate"],
-                    "categoryName": book["categoryName"],
-                    "toc": book.get("toc", "목차 정보 없음")
-                }
-            ))
-            documents.append(Document(
-                page_content=book["description"],
-                metadata={
-                    "type": "description",
-                    "title": book["title"],
-                    "author": book["author"],
-                    "pubDate": book["pubDate"],
-                    "categoryName": book["categoryName"],
-                    "toc": book.get("toc", "목차 정보 없음")
-                }
-            ))
-
-            # 목차 정보
-            toc_html = book["toc"]
-            structured_toc = self.parse_toc(toc_html)
-            for chapter in structured_toc:
-                for item in chapter["items"]:
-                    item_with_context = f"{chapter['chapter']} - {item}"
-                    documents.append(Document(
-                        page_content=item_with_context,
-                        metadata={
-                            "type": "toc",
-                            "title": book["title"],
-                            "author": book["author"],
-                            "pubDate": book["pubDate"],
-                            "categoryName": book["categoryName"],
-                            "item": item,
-                            "toc": toc_html
-                        }
-                    ))
+        for book, book_id in zip(book_data, book_ids):
+            # 책 기본 정보(제목, 설명)와 목차 항목
+            documents.extend(self._to_documents(document_contents(book, self.parse_toc(book["toc"])), book_id))
+        return documents
+
+    @staticmethod
+    def _to_documents(contents: List[DocumentContent], book_id: int) -> List[Document]:
+        documents = []
+        for text, doc_type, item in contents:
+            metadata = {"type": doc_type, "book_id": book_id}
+            if item is not None:
+                metadata["item"] = item
+            documents.append(Document(page_content=text, metadata=metadata))
         return documents
 
     # 4. JSON 데이터 로드 함수
     def load_json_files(self, directory: str) -> List[Dict]:
-        """지정된 디렉토리에서 모든 JSON 파일을 읽어 책 정보 리스트 반환"""
-        data = []
+        """지정된 디렉토리의 JSON / JSONL 파일을 모두 읽어 책 정보 리스트 반환 (색인 생성은 스트리밍 로더 사용)"""
         if os.path.exists(directory):
             print(f"{directory}는 존재합니다.")
         else:
             print(f"{directory}는 존재하지 않습니다.")
-        for filename in os.listdir(directory):
-            if filename.endswith(".json"):
-                filepath = os.path.join(directory, filename)
-                with open(filepath, "r", encoding="utf-8") as f:
-                    data.append(json.load(f))
-        return data
+        return list(iter_books(directory))
 
     # 5. FAISS 벡터스토어 생성
     def create_vector_store(self):
-        """JSON 데이터를 읽고 FAISS 벡터스토어 생성 및 저장"""
-        book_data_list = self.load_json_files(self.json_dir)
-        documents = []
-        for book_data in book_data_list:
-            documents.extend(self.create_documents(book_data))
-
-        # LangChain FAISS 벡터스토어 생성
-        vector_store = FAISS.from_documents(documents, self.embeddings)
-        vector_store.save_local(self.vector_store_path)
-        self.vector_store = vector_store
-        self.metadata = documents
+        """
+        JSON 데이터를 읽고 FAISS 벡터스토어 생성 및 저장
+        - 책 파일을 묶음 단위로 흘려보내며 목차 파싱, 문서 생성, 토큰화를 처리 (전체 JSON을 메모리에 올리지 않음)
+        - RAG_LOADER_WORKERS > 0이면 이 단계들을 프로세스 풀에서 병렬로 실행
+        """
+        with self.write_lock():
+            self.book_store.reset()
+            token_cache = self._get_token_cache()
+            documents, tokenized_corpus = [], []
+            n_books = 0
+            for prepared in iter_prepared_books(self.json_dir, self.tokenizer):
+                books = [book for book, _, _ in prepared]
+                book_ids = self.book_store.upsert_books(books, [get_book_key(book) for book in books])
+                for (_, contents, tokens), book_id in zip(prepared, book_ids):
+                    documents.extend(self._to_documents(contents, book_id))
+                    tokenized_corpus.extend(token_cache.add((text for text, _, _ in contents), tokens))
+                n_books += len(books)
+            print(f"📦 책 {n_books}권에서 문서 {len(documents)}개를 만들었습니다.")
+
+            # 배치/동시 요청으로 임베딩 (중복 문서는 한 번만, 중단되면 체크포인트부터 재개)
+            texts = [doc.page_content for doc in documents]
+            pipeline = self._embedding_pipeline()
+            vectors = pipeline.embed(texts)
+
+            # LangChain FAISS 벡터스토어 생성 (설정한 종류의 인덱스를 표본으로 학습한 뒤 벡터 추가)
+            self.vector_store = self._build_vector_store(texts, vectors, [doc.metadata for doc in documents])
+            self._save_vector_store()
+            self.metadata = documents
+            # 저장까지 끝났으므로 코퍼스에서 빠진 문서의 임베딩 체크포인트 삭제
+            pipeline.prune(texts)
         
-        print(f"✅ {self.vector_store_path}에 벡터스토어가 생성되었습니다.")
+            print(f"✅ {self.vector_store_path}에 벡터스토어가 생성되었습니다.")
+
+            # 새 벡터스토어에 맞는 BM25 인덱스도 함께 생성 및 저장 (로더에서 계산한 토큰 사용)
+            self.deleted = np.zeros(self.vector_store.index.ntotal, dtype=bool)
+            self._save_tombstones()
+            self.documents = self._index_documents()
+            self._build_book_positions()
+            self._fit_bm25(tokenized_corpus, save=True)
+            print(f"✅ BM25 검색 엔진 초기화 완료. {self.lexical_index_path}에 저장했습니다.")
+
+    def _build_vector_store(self, texts: List[str], vectors: np.ndarray, metadatas: List[Dict]) -> FAISS:
+        """self.faiss_index_type 종류, self.faiss_storage 저장 형식의 인덱스로 LangChain FAISS 벡터스토어 생성"""
+        vector_store = FAISS(
+            embedding_function=self.embeddings,
+            index=build_index(vectors, self.faiss_index_type, storage=self.faiss_storage),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+        )
+        vector_store.add_embeddings(text_embeddings=list(zip(texts, vectors)), metadatas=metadatas)
+        return vector_store
+
+    def _embedding_pipeline(self) -> EmbeddingPipeline:
+        """모델별 체크포인트를 사용하는 임베딩 파이프라인"""
+        return EmbeddingPipeline(
+            self.embeddings,
+            checkpoint_dir=os.path.join(self.embedding_checkpoint_dir, self.embedding_provider.cache_name),
+        )
+
+    def _store_dir(self) -> str:
+        return current_store_dir(self.vector_store_path)
+
+    def _save_vector_store(self):
+        """
+        FAISS 인덱스, docstore와 이를 만든 임베딩 정보를 새 버전 디렉토리에 저장한 뒤 한 번에 공개
+        - 세 파일을 함께 교체하므로 읽는 쪽이 서로 다른 버전의 index.faiss와 index.pkl을 읽지 않음
+        - 다른 워커가 메모리 매핑으로 열고 있는 이전 버전의 파일은 그대로 둠
+        """
+        def write(directory: str):
+            faiss.write_index(self.vector_store.index, os.path.join(directory, "index.faiss"))
+            # index.pkl은 LangChain save_local과 같은 (docstore, index_to_docstore_id) 튜플
+            with open(os.path.join(directory, "index.pkl"), "wb") as f:
+                pickle.dump((self.vector_store.docstore, self.vector_store.index_to_docstore_id), f)
+            self.embedding_provider.save_info(directory, self.vector_store.index.d)
+
+        versioned_dir.publish(os.path.join(self.vector_store_path, CURRENT_STORE_LINK), write)
 
     # 6. FAISS 벡터스토어 로드
     def load_vector_store(self):
         """FAISS 벡터스토어 및 메타데이터 로드"""
         try:
-            # 경로를 Path 객체로 변환 
-            vector_store_path = Path(self.vector_store_path)
-            metadata_path = Path(self.metadata_path)
-            
-            # 벡터스토어 로드 
-            self.vector_store = FAISS.load_local(
-                self.vector_store_path,
-                embeddings=self.embeddings,
-                allow_dangerous_deserialization=True
-            )
-            print(f"✅ {self.vector_store_path}에서 벡터스토어를 로드했습니다.")
+            # 읽기 전의 파일 상태 (읽는 도중 바뀌면 다음 쓰기에서 다시 로드)
+            stamp = self._index_stamp()
+
+            # 경로를 Path 객체로 변환 (모든 파일을 같은 버전 디렉토리에서 읽음)
+            vector_store_path = Path(self._store_dir())
+            metadata_path = vector_store_path / "index.pkl"
+
+            # 벡터스토어 인덱스 로드 (IVF 인덱스는 메모리 매핑으로 열어서 워커끼리 페이지 공유)
+            index = read_index(str(vector_store_path / "index.faiss"))
+            # 다른 임베딩(제공자, 모델, 차원)으로 만든 인덱스는 거부
+            self.embedding_provider.check_info(str(vector_store_path), index.d)
+            print(f"✅ {vector_store_path}에서 벡터스토어를 로드했습니다.")
             
             # 메타데이터 로드 
-            with open(self.metadata_path, 'rb') as f:
-                self.metadata = pickle.load(f)
-            print(f"✅ {self.metadata_path}에서 메타데이터를 로드했습니다.")
+            with open(metadata_path, 'rb') as f:
+                metadata = pickle.load(f)
+            print(f"✅ {metadata_path}에서 메타데이터를 로드했습니다.")
+
+            # index.pkl은 (docstore, index_to_docstore_id) 튜플
+            docstore, index_to_docstore_id = metadata
+            # 서로 다른 때 저장된 파일이면 문서 위치가 어긋나므로 로드하지 않음 (공유 인덱스는 기존 인스턴스 유지)
+            if index.ntotal != len(index_to_docstore_id):
+                raise ValueError(
+                    f"index.faiss의 벡터 수({index.ntotal})와 index.pkl의 문서 수({len(index_to_docstore_id)})가 다릅니다."
+                )
+            self.metadata = metadata
+            self.vector_store = FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+
+            # 삭제 표시 로드
+            self.deleted = self._load_tombstones()
+            self._store_stamp = stamp
+
+            # 저장된 BM25 인덱스를 메모리 매핑으로 로드 (없거나 FAISS 인덱스와 맞지 않으면 None)
+            self.bm25 = SparseBM25.load(self.lexical_index_path, self._lexical_fingerprint())
+            if self.bm25 is not None:
+                print(f"✅ {self.lexical_index_path}에서 BM25 인덱스를 로드했습니다.")
         except RuntimeError as e:
             # 벡터스토어 파일이 없어서 발생한 경우 
             if "No such file or directory" in str(e):
                 print(f"⚠️ {vector_store_path}가 존재하지 않습니다. 벡터스토어를 생성합니다.")
-                self.create_vector_store()  # 벡터스토어 재생성 
+                self._create_missing_vector_store()  # 벡터스토어 재생성 
                 self.load_vector_store()  # 재귀 호출로 로드 재시도
             else:
                 # 다른 RuntimeError는 재전달 
@@ -176,83 +285,483 @@ class AIBooksRAG:
         except FileNotFoundError as e:
             # 메타데이터 파일이 없어서 발생한 경우 
             print(f"⚠️ {metadata_path}가 존재하지 않습니다. 벡터스토어를 생성합니다.")
-            self.create_vector_store()  # 벡터스토어 재생성 
+            self._create_missing_vector_store()  # 벡터스토어 재생성 
             self.load_vector_store()  # 재귀 호출로 로드 재시도
+        except EmbeddingMismatchError:
+            raise
         except Exception as e:
             raise Exception(f"❌ 로드 중 오류 발생: {str(e)}")
 
+    def _create_missing_vector_store(self):
+        """잠금을 잡은 뒤에도 파일이 없을 때만 생성 (여러 워커가 동시에 시작해도 한 번만 만듦)"""
+        with self.write_lock():
+            store_dir = self._store_dir()
+            if not (os.path.exists(os.path.join(store_dir, "index.faiss")) and os.path.exists(os.path.join(store_dir, "index.pkl"))):
+                self.create_vector_store()
+
     # 7. BM25 초기화
+    def _index_documents(self) -> List[Document]:
+        """FAISS 인덱스 순서대로 정렬된 문서 목록 (BM25 문서 번호와 같은 순서)"""
+        docstore = self.vector_store.docstore._dict
+        return [docstore[doc_id] for doc_id in self.vector_store.index_to_docstore_id.values()]
+
+    def _store_fingerprint(self) -> str:
+        """현재 FAISS 인덱스의 문서 구성(문서 수와 순서)을 나타내는 값"""
+        digest = hashlib.sha256(str(self.vector_store.index.ntotal).encode())
+        for doc_id in self.vector_store.index_to_docstore_id.values():
+            digest.update(f"\n{doc_id}".encode())
+        return digest.hexdigest()
+
+    def _lexical_fingerprint(self) -> str:
+        """저장된 BM25 인덱스가 현재 FAISS 인덱스 및 토크나이저와 맞는지 확인하기 위한 값"""
+        return f"{self.tokenizer.name}:{self._store_fingerprint()}"
+
     def initialize_bm25(self):
-        """BM25 검색 엔진 초기화"""
+        """
+        BM25 검색 엔진 초기화 (저장된 인덱스가 없거나 오래된 경우에만 새로 생성)
+        - 새로 만든 인덱스는 메모리에만 둠. 저장은 색인 잠금을 잡은 쓰기 작업(create_vector_store, add_books, compact)만 함
+        """
         if not self.vector_store:
             raise ValueError("FAISS 벡터스토어가 초기화되지 않았습니다.")
         
         # 벡터스토어의 InMemoryDocstore에서 문서 가져오기
-        documents = self.vector_store.docstore._dict.values()
-        
-        # BM25 코퍼스 생성
-        tokenized_corpus = [
-            doc.page_content.lower().split() for doc in documents
-        ]
+        self.documents = self._index_documents()
+        self._build_book_positions()
+
+        if self.bm25 is not None:
+            print("✅ 저장된 BM25 인덱스를 사용합니다.")
+            return
         
-        self.bm25 = BM25Okapi(tokenized_corpus)
+        self._fit_bm25()
         print("✅ BM25 검색 엔진 초기화 완료.")
 
+    def _get_token_cache(self) -> TokenCache:
+        if self._token_cache is None:
+            self._token_cache = TokenCache(self.tokenizer, self.token_cache_dir)
+        return self._token_cache
+
+    def _fit_bm25(self, tokenized_corpus: List[List[str]] = None, save: bool = False):
+        """
+        현재 문서 목록으로 BM25 인덱스 생성 (이미 토큰화한 문서는 토큰 캐시에서 가져옴)
+        - save=True이면 저장 (write_lock을 잡은 상태에서만)
+        """
+        if tokenized_corpus is None:
+            tokenized_corpus = self._get_token_cache().tokenize_corpus(doc.page_content for doc in self.documents)
+        
+        self.bm25 = SparseBM25().fit(tokenized_corpus)
+        if save:
+            self.bm25.save(self.lexical_index_path, self._lexical_fingerprint())
+
     # 8. Hybrid 검색
-    def hybrid_search(self, query: str, k: int = 5, semantic_weight: float = 0.5) -> List[Tuple[Dict, float]]:
-        """FAISS 및 BM25를 결합한 하이브리드 검색"""
-        # FAISS 검색
-        faiss_results = self.vector_store.similarity_search_with_score(query, k=k)
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 5,
+        semantic_weight: float = 0.5,
+        semantic_timeout: float = SEMANTIC_TIMEOUT,
+        lexical_timeout: float = LEXICAL_TIMEOUT,
+        category=None,
+        with_relevance: bool = False,
+    ) -> List[Tuple[Dict, float]]:
+        """
+        FAISS 및 BM25를 결합한 하이브리드 검색
+        - 두 검색을 스레드 풀에서 동시에 실행하고, 시간 안에 끝나지 않거나 실패한 쪽은 빼고 결합
+        - 단계별 소요 시간은 metrics의 hybrid_search.semantic / hybrid_search.lexical에 기록
+        - category: 분야 필터 (예: "수험서/자격증", "국내도서>외국어>영어시험", CID 또는 이들의 목록).
+          하위 분야를 포함해 해당 분야의 문서만 FAISS/BM25 후보로 사용
+        - with_relevance=True면 (책 정보, 점수, 관련도). 관련도는 is_relevant()로 로컬 결과를 쓸지 판단할 때 사용
+        """
+        return self.hybrid_search_many(
+            [query], k, semantic_weight, semantic_timeout, lexical_timeout, category, with_relevance,
+        )[0]
+
+    def hybrid_search_many(
+        self,
+        queries: List[str],
+        k: int = 5,
+        semantic_weight: float = 0.5,
+        semantic_timeout: float = SEMANTIC_TIMEOUT,
+        lexical_timeout: float = LEXICAL_TIMEOUT,
+        category=None,
+        with_relevance: bool = False,
+    ) -> List[List[Tuple[Dict, float]]]:
+        """
+        여러 질의를 한 번에 하이브리드 검색 (질의 순서대로 hybrid_search와 같은 형태의 결과 목록)
+        - 캐시에 없는 질의는 임베딩 API 한 번으로 요청하고, FAISS는 질의 행렬로 한 번 검색
+        - BM25는 질의 행렬과 postings 행렬의 희소 행렬 곱 한 번으로 계산
+        - category가 있으면 모든 질의에 같은 분야 필터 적용 (알 수 없는 분야면 ValueError)
+        """
+        if not queries:
+            return []
 
+        start = time.perf_counter()
+        mask = self._search_mask(category)
+        semantic_future = _search_pool.submit(self._timed_leg, "semantic", self._semantic_search, queries, k, mask)
+        lexical_future = _search_pool.submit(self._timed_leg, "lexical", self._lexical_search, queries, k, mask)
+
+        # FAISS 검색 (삭제 표시된 문서 제외)
+        faiss_hits = self._leg_result("semantic", semantic_future, start + semantic_timeout, len(queries))
         # BM25 검색
-        tokenized_query = query.lower().split()
-        
-        # InMemoryDocstore에서 문서 가져오기
-        documents = list(self.vector_store.docstore._dict.values())
-        
-        bm25_scores = self.bm25.get_scores(tokenized_query)
-        bm25_results = sorted(
-            [(documents[i], bm25_scores[i]) for i in range(len(documents))],
-            key=lambda x: x[1],
-            reverse=True
-        )[:k]
-
-        # 하이브리드 결합
-        combined_scores = {}
-        doc_info = {}  # 문서 정보를 저장할 딕셔너리 
-        for doc, score in faiss_results:
-            key = doc.metadata.get('title', 'Unknown Title')
-            
-            # FAISS 점수 반영
-            combined_scores[key] = semantic_weight * (1 - score)
-            
-            # 목차 추가 
-            if key not in doc_info: 
-                doc_info[key] = {
-                    'title': doc.metadata.get('title', 'Unknown Title'),
-                    'author': doc.metadata.get('author', 'Unknown Author'),
-                    'categoryName': doc.metadata.get('categoryName', 'Unknown Category'),
-                    'pubDate': doc.metadata.get('pubDate', 'Unknown Date'),
-                    'toc': doc.metadata.get('toc', '목차 정보 없음'),
-                }
-        for doc, score in bm25_results:
-            key = doc.metadata.get('title', 'Unknown Title')
-            if doc.page_content in combined_scores:
-                # BM25 점수 반영
-                combined_scores[key] += (1 - semantic_weight) * score
+        bm25_hits = self._leg_result("lexical", lexical_future, start + lexical_timeout, len(queries))
+
+        # 질의마다 책 단위로 결합
+        fused = [
+            self._fuse(faiss_results, bm25_results, k, semantic_weight)
+            for faiss_results, bm25_results in zip(faiss_hits, bm25_hits)
+        ]
+
+        # 최종 결과에 포함된 책의 정보와 목차를 한 번에 조회
+        books = self.book_store.get_books(
+            (book_id for book_ids, _, _, _ in fused for book_id in book_ids.tolist() if book_id > 0),
+            include_toc=True,
+        )
+        results = [
+            [
+                (book, score, relevance) if with_relevance else (book, score)
+                for book, score, relevance in zip(
+                    (self._book_info(self.documents[position], books) for position in positions.tolist()),
+                    scores.tolist(),
+                    relevances.tolist(),
+                )
+            ]
+            for _, scores, positions, relevances in fused
+        ]
+
+        metrics.observe("hybrid_search.total", time.perf_counter() - start)
+        return results
+
+    def _fuse(self, faiss_results, bm25_results, k: int, semantic_weight: float):
+        """
+        한 질의의 FAISS/BM25 후보 문서를 책 단위로 결합해 상위 k권의 (book_id 배열, 점수 배열, 대표 문서 위치 배열, 관련도 배열)
+        - normalized: FAISS 거리는 단위 벡터의 코사인 유사도(1 - d/2)로, BM25 점수는 질의의 최대 가능 점수로 나눠서 0~1
+        - rrf: 각 검색에서의 순위로 1 / (RRF_K + 순위). 두 검색 모두 1위인 책이 1이 되도록 정규화
+        - 같은 책의 문서(제목, 소개, 목차 항목)가 여러 개 나오면 검색마다 가장 높은 값을 사용
+        - 관련도는 결합 방식과 상관없이 normalized 방식의 점수 (rrf 점수는 질의와 얼마나 맞는지를 나타내지 않음)
+        """
+        (faiss_positions, distances), (bm25_positions, bm25_scores) = faiss_results, bm25_results
+        semantic = np.clip(1 - distances / 2, 0, 1)
+        lexical = bm25_scores
+
+        # 후보 문서를 책으로 묶어서(group by) 책마다 검색별 최댓값 계산
+        positions = np.concatenate([faiss_positions, bm25_positions])
+        book_ids, first, groups = np.unique(self.doc_books[positions], return_index=True, return_inverse=True)
+
+        def combine(semantic, lexical):
+            semantic_best = np.zeros(len(book_ids))
+            lexical_best = np.zeros(len(book_ids))
+            np.maximum.at(semantic_best, groups[:len(faiss_positions)], semantic)
+            np.maximum.at(lexical_best, groups[len(faiss_positions):], lexical)
+            return semantic_weight * semantic_best + (1 - semantic_weight) * lexical_best
+
+        relevances = combine(semantic, lexical)
+        if FUSION_METHOD == "rrf":
+            scores = combine(
+                (RRF_K + 1) / (RRF_K + 1 + np.arange(len(faiss_positions))),
+                (RRF_K + 1) / (RRF_K + 1 + np.arange(len(bm25_positions))),
+            )
+        else:
+            scores = relevances
+
+        # 점수가 높은 순서대로 상위 k권
+        top = np.argsort(-scores, kind="stable")[:k]
+        return book_ids[top], scores[top], positions[first[top]], relevances[top]
+
+    @staticmethod
+    def is_relevant(results: List[Tuple[Dict, float, float]]) -> bool:
+        """with_relevance=True로 검색한 결과의 최고 관련도가 현재 결합 방식의 기준(FALLBACK_THRESHOLDS) 이상인지"""
+        return bool(results) and max(relevance for _, _, relevance in results) >= FALLBACK_THRESHOLDS[FUSION_METHOD]
+
+    def _timed_leg(self, name: str, search, queries: List[str], k: int, mask):
+        """검색 단계 실행 및 소요 시간 기록 (시간 초과로 결과가 버려진 경우도 기록)"""
+        start = time.perf_counter()
+        try:
+            return search(queries, k, mask)
+        finally:
+            metrics.observe(f"hybrid_search.{name}", time.perf_counter() - start)
+
+    def _leg_result(self, name: str, future, deadline: float, n_queries: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """검색 단계 결과. 시간 초과 또는 오류가 나면 질의마다 빈 결과 (나머지 단계 결과만으로 결합)"""
+        try:
+            return future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeoutError:
+            # 실행 중인 스레드는 취소할 수 없으므로 결과만 버림
+            metrics.incr(f"hybrid_search.{name}.timeout")
+            print(f"⚠️ {name} 검색이 제한 시간 안에 끝나지 않아 결과에서 제외합니다.")
+        except Exception as e:
+            metrics.incr(f"hybrid_search.{name}.error")
+            print(f"⚠️ {name} 검색 중 오류 발생: {str(e)}")
+        return [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)) for _ in range(n_queries)]
+
+    def _book_key_of(self, doc: Document):
+        """문서가 속한 책의 식별자 (예전 형식의 문서는 metadata의 제목 사용)"""
+        return doc.metadata["book_id"] if "book_id" in doc.metadata else doc.metadata.get('title', 'Unknown Title')
+
+    def _book_info(self, doc: Document, books: Dict[int, Dict]) -> Dict:
+        """검색 결과로 반환할 책 정보"""
+        # 예전 형식의 문서는 metadata에 책 정보가 모두 들어있음
+        book = books.get(doc.metadata.get("book_id"), doc.metadata)
+        return {
+            'title': book.get('title') or 'Unknown Title',
+            'author': book.get('author') or 'Unknown Author',
+            'categoryName': book.get('categoryName') or 'Unknown Category',
+            'pubDate': book.get('pubDate') or 'Unknown Date',
+            'toc': book.get('toc') or '목차 정보 없음',
+        }
+
+    def _alive_mask(self):
+        """삭제 표시가 없으면 None, 있으면 살아있는 문서 위치가 True인 배열"""
+        return ~self.deleted if self.deleted.any() else None
+
+    def _search_mask(self, category=None):
+        """검색 후보 문서 위치가 True인 배열 (분야 필터와 삭제 표시를 함께 반영, 둘 다 없으면 None)"""
+        alive = self._alive_mask()
+        if category is None:
+            return alive
+        if self.category_index is None:
+            raise ValueError("분야 색인이 초기화되지 않았습니다.")
+        mask = self.category_index.mask(category)
+        return mask if alive is None else mask & alive
+
+    def _lexical_search(self, queries: List[str], k: int, mask=None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """BM25 인덱스에서 질의마다 가까운 문서의 (위치 배열, 0~1로 정규화한 점수 배열)"""
+        tokenized_queries = [self.tokenizer.tokenize(query) for query in queries]
+        k = max(k, FUSION_CANDIDATES)
+
+        # 상위 k개 문서만 희소 행렬 곱 + argpartition으로 선택 (삭제 표시, 분야 필터 밖의 문서 제외)
+        results = self.bm25.top_k_many(tokenized_queries, k, mask=mask)
+        max_scores = self.bm25.max_scores(tokenized_queries)
+        return [
+            (doc_ids.astype(np.int64), bm25_scores / max_score if max_score > 0 else bm25_scores)
+            for (doc_ids, bm25_scores), max_score in zip(results, max_scores)
+        ]
+
+    def _semantic_search(self, queries: List[str], k: int, mask=None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """FAISS 인덱스에서 질의마다 가까운 문서의 (위치 배열, 거리 배열)"""
+        k = max(k, FUSION_CANDIDATES)
+
+        # 캐시에 없는 질의만 모아서 임베딩 API 한 번으로 요청
+        query_vectors = np.asarray(self.embeddings.embed_queries(queries), dtype=np.float32)
+        if self.vector_store._normalize_L2:
+            faiss.normalize_L2(query_vectors)
+
+        index = self.vector_store.index
+        distances, positions = self._search_index(index, query_vectors, k, mask)
+        # 살아있는 문서가 k개보다 적으면 남는 자리는 -1로 채워짐
+        found = positions >= 0
+        return [(row_positions[row], row_distances[row]) for row_positions, row_distances, row in zip(positions, distances, found)]
+
+    def _search_index(self, index, query_vectors: np.ndarray, k: int, mask=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        mask가 True인 문서 중에서 FAISS 검색 (mask가 None이면 전체)
+        - 원래 벡터가 저장된 인덱스(Flat, HNSW)에서 남는 문서가 적으면(분야 필터 등) 그 문서의 벡터만
+          전수 탐색해서 비용이 필터 크기에 비례 (HNSW 그래프 탐색처럼 필터 때문에 후보를 놓치지도 않음)
+        - 그 외에는 비트맵 ID selector로 mask 밖의 문서를 건너뜀
+        """
+        if mask is None:
+            return index.search(query_vectors, k, params=search_parameters(index))
+
+        vectors = stored_vectors(index)
+        if vectors is not None:
+            positions = np.flatnonzero(mask)
+            # 삭제 표시만 있는 경우처럼 대부분의 문서가 남으면 인덱스 검색이 더 빠름
+            small = len(positions) <= index.ntotal // 2 if isinstance(index, faiss.IndexFlat) else False
+            if small or len(positions) <= FILTER_EXACT_LIMIT:
+                metrics.incr("hybrid_search.semantic.subset")
+                return search_subset(vectors, query_vectors, positions, k)
+
+        # faiss 비트맵은 little-endian 비트 순서
+        bits = np.packbits(mask, bitorder="little")
+        selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bits))
+        return index.search(query_vectors, k, params=search_parameters(index, selector))
+
+    # 9. 증분 색인 (책 단위 추가/수정/삭제)
+    def _build_book_positions(self):
+        """book_id -> 문서 위치 목록과 문서 위치 -> book_id 배열 (예전 형식의 문서는 제목 사용)"""
+        self.book_positions = {}
+        legacy_codes = {}  # 제목 -> 음수 코드
+        doc_books = []
+        for position, doc in enumerate(self.documents):
+            key = self._book_key_of(doc)
+            doc_books.append(key if isinstance(key, int) else legacy_codes.setdefault(key, -1 - len(legacy_codes)))
+            if self.deleted[position]:
+                continue
+            self.book_positions.setdefault(key, []).append(position)
+        self.doc_books = np.asarray(doc_books, dtype=np.int64)
+        self._build_category_index()
+
+    def _build_category_index(self):
+        """문서 위치별 분야(BookStore의 categoryName, 예전 형식의 문서는 metadata)로 분야 트리와 비트맵 생성"""
+        names = self.book_store.get_category_names()
+        self.category_index = CategoryIndex([
+            names.get(book_id) if book_id > 0 else doc.metadata.get("categoryName")
+            for doc, book_id in zip(self.documents, self.doc_books.tolist())
+        ])
+
+    def _load_tombstones(self) -> np.ndarray:
+        """저장된 삭제 표시 로드. 현재 FAISS 인덱스와 맞지 않으면 무시"""
+        deleted = np.zeros(self.vector_store.index.ntotal, dtype=bool)
+        try:
+            with open(self.tombstone_path, "r", encoding="utf-8") as f:
+                tombstones = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return deleted
+
+        if tombstones.get("fingerprint") == self._store_fingerprint():
+            deleted[tombstones["positions"]] = True
+        return deleted
+
+    def _save_tombstones(self):
+        tombstones = {
+            "fingerprint": self._store_fingerprint(),
+            "positions": np.flatnonzero(self.deleted).tolist(),
+        }
+        tmp_path = f"{self.tombstone_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(tombstones, f)
+        os.replace(tmp_path, self.tombstone_path)
+        # 색인을 바꾸는 작업은 모두 삭제 표시 저장으로 끝나므로 여기서 현재 파일 상태를 기록
+        self._store_stamp = self._index_stamp()
+
+    def _index_stamp(self) -> Tuple:
+        """현재 버전의 index.faiss와 삭제 표시 파일의 (inode, 수정 시각). 다른 프로세스가 색인을 바꿨는지 확인하는 데 사용"""
+        stamp = []
+        for path in (os.path.join(self._store_dir(), "index.faiss"), self.tombstone_path):
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_ino, stat.st_mtime_ns))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    @contextmanager
+    def write_lock(self):
+        """
+        색인 파일을 고치는 동안 잡는 잠금 (같은 인스턴스 안에서는 중첩 가능)
+        - 동기화 작업, 관리 명령 등 여러 프로세스가 동시에 쓰지 않도록 벡터스토어 디렉토리 안의 잠금 파일에 flock
+          (벡터스토어를 볼륨으로 공유하는 다른 컨테이너와도 같은 파일을 잠금)
+        - 잠금을 잡은 뒤 다른 프로세스가 그 사이 색인을 바꿨으면 다시 로드해서 그 위에 씀 (바뀐 내용을 덮어쓰지 않음)
+        """
+        with self._write_lock:
+            outermost = self._write_lock_file is None
+            if outermost:
+                lock_path = os.path.join(self.vector_store_path, ".lock")
+                os.makedirs(self.vector_store_path, exist_ok=True)
+                self._write_lock_file = open(lock_path, "a")
+                fcntl.flock(self._write_lock_file, fcntl.LOCK_EX)
+            try:
+                if outermost and self.vector_store is not None and self._index_stamp() != self._store_stamp:
+                    print("⚠️ 다른 프로세스가 색인을 바꿨습니다. 다시 로드한 뒤 이어서 씁니다.")
+                    self.load_vector_store()
+                    self.initialize_bm25()
+                yield
+            finally:
+                if outermost:
+                    fcntl.flock(self._write_lock_file, fcntl.LOCK_UN)
+                    self._write_lock_file.close()
+                    self._write_lock_file = None
+
+    def _mark_deleted(self, key: str) -> bool:
+        """책의 문서들에 삭제 표시. 실제 공간은 compact()에서 회수"""
+        book_id = self.book_store.get_book_id(key)
+        positions = self.book_positions.pop(key if book_id is None else book_id, None)
+        if not positions:
+            return False
+        self.deleted[positions] = True
+        return True
+
+    def add_books(self, books: List[Dict]) -> int:
+        """
+        책들을 전체 재생성 없이 색인에 추가 (이미 있는 책은 기존 문서를 삭제 표시한 뒤 새로 추가)
+        - 새 문서만 임베딩해서 FAISS 인덱스와 docstore 뒤에 추가
+        - BM25도 새 문서만 토큰화해서 기존 인덱스 뒤에 추가 (기존 문서는 다시 토큰화하거나 읽지 않음)
+        """
+        with self.write_lock():
+            if not self.vector_store:
+                raise ValueError("FAISS 벡터스토어가 초기화되지 않았습니다.")
+
+            keys = [get_book_key(book) for book in books]
+            for key in keys:
+                self._mark_deleted(key)
+
+            book_ids = self.book_store.upsert_books(books, keys)
+            documents = self.create_documents(books, book_ids)
+            texts = [doc.page_content for doc in documents]
+            vectors = self._embedding_pipeline().embed(texts)
+
+            # 메모리 매핑된 인덱스는 읽기 전용이므로 메모리로 다시 읽은 뒤 추가
+            if is_mmapped(self.vector_store.index):
+                self.vector_store.index = read_index(os.path.join(self._store_dir(), "index.faiss"), mmap=False)
+
+            start = len(self.documents)
+            doc_ids = self.vector_store.add_embeddings(
+                text_embeddings=list(zip(texts, vectors)),
+                metadatas=[doc.metadata for doc in documents],
+            )
+            docstore = self.vector_store.docstore._dict
+            self.documents.extend(docstore[doc_id] for doc_id in doc_ids)
+            self.deleted = np.concatenate([self.deleted, np.zeros(len(doc_ids), dtype=bool)])
+            new_books = [doc.metadata["book_id"] for doc in self.documents[start:]]
+            for position, book_id in enumerate(new_books, start=start):
+                self.book_positions.setdefault(book_id, []).append(position)
+            self.doc_books = np.concatenate([self.doc_books, np.asarray(new_books, dtype=np.int64)])
+            self._build_category_index()
+
+            if self.bm25 is not None and self.bm25.n_docs == start:
+                self.bm25.append(self._get_token_cache().tokenize_corpus(texts))
+                self.bm25.save(self.lexical_index_path, self._lexical_fingerprint())
             else:
-                combined_scores[key] = (1 - semantic_weight) * score
-                doc_info[key] = {
-                    'title': doc.metadata.get('title', 'Unknown Title'),
-                    'author': doc.metadata.get('author', 'Unknown Author'),
-                    'categoryName': doc.metadata.get('categoryName', 'Unknown Category'),
-                    'pubDate': doc.metadata.get('pubDate', 'Unknown Date'),
-                    'toc': doc.metadata.get('toc', '목차 정보 없음'),
-                }
-
-        # 결과 정렬 및 반환 
-        sorted_results = sorted(combined_scores.items(), key=lambda x: x[1], reverse=True)
-        return [(doc_info[key], score) for key, score in sorted_results[:k]]
+                self._fit_bm25(save=True)
+            self._save_vector_store()
+            self._save_tombstones()
+            print(f"✅ 책 {len(books)}권(문서 {len(doc_ids)}개)을 색인에 추가했습니다.")
+            return len(doc_ids)
+
+    def update_book(self, book: Dict) -> int:
+        """책 정보가 바뀐 경우 해당 책의 문서만 다시 색인"""
+        return self.add_books([book])
+
+    def remove_book(self, key: str) -> bool:
+        """책 키(ISBN13 또는 제목)로 책을 검색 대상에서 제외"""
+        with self.write_lock():
+            if not self._mark_deleted(key):
+                return False
+            self.book_store.delete_book(key)
+            self._save_tombstones()
+            print(f"✅ {key} 책을 색인에서 삭제 표시했습니다.")
+            return True
+
+    def compact(self):
+        """삭제 표시된 문서를 FAISS 인덱스, docstore, BM25 인덱스에서 실제로 제거"""
+        with self.write_lock():
+            alive = np.flatnonzero(~self.deleted)
+            removed = len(self.deleted) - len(alive)
+            if removed == 0:
+                return
+
+            documents = [self.documents[i] for i in alive]
+            texts = [doc.page_content for doc in documents]
+            try:
+                if is_lossy(self.vector_store.index):
+                    raise RuntimeError("PQ/SQ8 인덱스는 원래 벡터를 복원할 수 없음")
+                # 인덱스에 저장된 벡터를 그대로 사용
+                vectors = self.vector_store.index.reconstruct_batch(alive)
+            except RuntimeError:
+                # 벡터 복원을 지원하지 않는 인덱스는 임베딩 체크포인트에서 가져옴
+                vectors = self._embedding_pipeline().embed(texts)
+
+            # 남은 벡터로 인덱스를 다시 학습 (IVF 클러스터도 현재 분포에 맞게 갱신)
+            self.vector_store = self._build_vector_store(texts, vectors, [doc.metadata for doc in documents])
+            self.documents = self._index_documents()
+            self.deleted = np.zeros(len(self.documents), dtype=bool)
+            self._build_book_positions()
+
+            self._fit_bm25(save=True)
+            self._save_vector_store()
+            self._save_tombstones()
+            self._embedding_pipeline().prune(texts)
+            # 남은 문서의 토큰만 남겨서 토큰 캐시 파일이 계속 커지지 않도록 함
+            self._get_token_cache().compact(texts)
+            print(f"✅ 삭제 표시된 문서 {removed}개를 정리했습니다.")
 
 
 
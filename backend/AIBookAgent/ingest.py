@@ -0,0 +1,160 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tenacity import retry, stop_after_attempt, wait_random_exponential
+from langchain_core.embeddings import Embeddings
+from AIBookAgent import metrics
+from typing import Dict, List
+from dotenv import load_dotenv
+import numpy as np
+import hashlib
+import sqlite3
+import time
+import os
+
+load_dotenv()
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("RAG_EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_CONCURRENCY = int(os.getenv("RAG_EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("RAG_EMBEDDING_MAX_RETRIES", "5"))
+EMBEDDING_CHECKPOINT_DIR = os.path.abspath(
+    os.getenv("RAG_EMBEDDING_CHECKPOINT_DIR", "./AIBookAgent/cache/embeddings")
+)
+
+
+def content_hash(text: str) -> str:
+    """문서 내용 해시 (중복 제거 및 체크포인트 키)"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingPipeline:
+    """
+    벡터스토어 생성용 문서 임베딩 파이프라인
+    - 같은 내용의 문서("최근기출문제" 같은 반복되는 목차 등)는 한 번만 임베딩
+    - batch_size개씩 묶어서 최대 concurrency개의 요청을 동시에 실행
+    - 실패한 배치는 지수 백오프(jitter)로 재시도
+    - 끝난 배치는 바로 체크포인트(SQLite, 해시 -> 벡터)에 저장하므로, 중간에 실패해도 다시 실행하면 남은 배치만 임베딩
+    - 체크포인트는 필요한 해시만 조회하므로 add_books처럼 몇 권만 추가할 때 코퍼스 크기와 상관없이 빠름
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        checkpoint_dir: str,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        concurrency: int = EMBEDDING_CONCURRENCY,
+        max_retries: int = EMBEDDING_MAX_RETRIES,
+    ):
+        self.embeddings = embeddings
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_path = os.path.join(checkpoint_dir, "checkpoint.sqlite3")
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self._conn = None
+
+    # 1. 체크포인트
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        conn = sqlite3.connect(self.checkpoint_path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn = conn
+        return conn
+
+    def _load_checkpoint(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """체크포인트에 있는 해시만 골라 해시 -> 벡터 딕셔너리로 반환"""
+        conn = self._connect()
+        vectors = {}
+        # SQLite 변수 개수 제한 때문에 나눠서 조회
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            rows = conn.execute(
+                f"SELECT hash, vector FROM embeddings WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+            vectors.update((h, np.frombuffer(blob, dtype=np.float32)) for h, blob in rows)
+        return vectors
+
+    def _save_batch(self, hashes: List[str], vectors: np.ndarray):
+        """완료된 배치를 한 트랜잭션으로 저장"""
+        conn = self._connect()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)",
+                ((h, vector.tobytes()) for h, vector in zip(hashes, vectors)),
+            )
+
+    def prune(self, texts: List[str]) -> int:
+        """
+        texts(현재 색인의 문서 내용)에 없는 체크포인트 행 삭제하고 삭제한 수를 반환
+        - 색인을 새로 만들거나 정리(compact)한 뒤 호출해서 삭제/변경된 문서의 벡터가 쌓이지 않게 함
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep (hash TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM keep")
+            conn.executemany("INSERT OR IGNORE INTO keep (hash) VALUES (?)", ((content_hash(text),) for text in texts))
+            removed = conn.execute("DELETE FROM embeddings WHERE hash NOT IN (SELECT hash FROM keep)").rowcount
+            conn.execute("DELETE FROM keep")
+        if removed:
+            metrics.incr("ingest.checkpoint.pruned", removed)
+            print(f"✅ 색인에 없는 문서의 임베딩 체크포인트 {removed}개를 삭제했습니다.")
+        return removed
+
+    # 2. 배치 임베딩
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        @retry(
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_random_exponential(multiplier=1, max=30),
+            reraise=True,
+        )
+        def call():
+            start = time.perf_counter()
+            vectors = self.embeddings.embed_documents(texts)
+            metrics.observe("ingest.embed_batch", time.perf_counter() - start)
+            return np.asarray(vectors, dtype=np.float32)
+
+        return call()
+
+    # 3. 전체 실행
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """문서 내용 목록을 임베딩해 (문서 수, 차원) 배열로 반환. 순서는 입력과 같음"""
+        hashes = [content_hash(text) for text in texts]
+        unique_texts = dict(zip(hashes, texts))  # 같은 해시는 하나만 남음
+
+        done = self._load_checkpoint(list(unique_texts))
+        todo = [h for h in unique_texts if h not in done]
+        print(
+            f"📦 문서 {len(texts)}개 중 고유 문서 {len(unique_texts)}개, "
+            f"체크포인트 {len(unique_texts) - len(todo)}개, 새로 임베딩할 문서 {len(todo)}개"
+        )
+
+        batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {
+                pool.submit(self._embed_batch, [unique_texts[h] for h in batch]): batch
+                for batch in batches
+            }
+            for i, future in enumerate(as_completed(futures), start=1):
+                batch = futures[future]
+                try:
+                    vectors = future.result()
+                except Exception as e:
+                    # 다른 배치는 계속 진행해서 체크포인트에 남김
+                    errors.append(e)
+                    print(f"❌ 배치 임베딩 실패 ({len(batch)}개 문서): {str(e)}")
+                    continue
+                self._save_batch(batch, vectors)
+                done.update(zip(batch, vectors))
+                print(f"✅ 배치 {i}/{len(batches)} 완료")
+
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)}개 배치의 임베딩에 실패했습니다. 다시 실행하면 남은 배치부터 이어서 진행합니다."
+            ) from errors[0]
+
+        return np.stack([done[h] for h in hashes]) if hashes else np.zeros((0, 0), dtype=np.float32)
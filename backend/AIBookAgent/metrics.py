@@ -0,0 +1,100 @@
+from collections import defaultdict, deque
+from typing import Dict
+import threading
+import logging
+import json
+import time
+import os
+
+# 프로세스 단위의 간단한 카운터/시간 측정값 저장소
+# - 캐시 적중률, 검색 단계별 소요 시간 등을 기록하고 snapshot()으로 조회
+# - 워커마다 따로 쌓이므로 내보낼 때는 pid를 함께 기록
+#   (관리자용 /api/v1/chatrooms/metrics/ 조회, RAG_METRICS_LOG_INTERVAL초마다 로그 출력)
+
+TIMING_WINDOW = 1000  # 이름별로 보관하는 최근 측정값 개수
+METRICS_LOG_INTERVAL = float(os.getenv("RAG_METRICS_LOG_INTERVAL", "300"))  # 0이면 로그로 내보내지 않음
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_gauges: Dict[str, float] = {}
+_timings: Dict[str, deque] = defaultdict(lambda: deque(maxlen=TIMING_WINDOW))
+_reporter = None
+
+
+def incr(name: str, value: float = 1):
+    """카운터 증가"""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float):
+    """현재 값을 기록 (대기열 길이 등)"""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, seconds: float):
+    """소요 시간 기록"""
+    with _lock:
+        _timings[name].append(seconds)
+
+
+def _percentile(values, q: float) -> float:
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[index]
+
+
+def snapshot() -> Dict:
+    """현재까지의 카운터, 게이지, 시간 측정 요약(p50/p95/p99, 초 단위)"""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        timings = {name: sorted(values) for name, values in _timings.items() if values}
+
+    return {
+        "counters": counters,
+        "gauges": gauges,
+        "timings": {
+            name: {
+                "count": len(values),
+                "p50": _percentile(values, 0.50),
+                "p95": _percentile(values, 0.95),
+                "p99": _percentile(values, 0.99),
+                "max": values[-1],
+            }
+            for name, values in timings.items()
+        },
+    }
+
+
+def hit_rate(prefix: str) -> float:
+    """<prefix>.hit / (<prefix>.hit + <prefix>.miss)"""
+    with _lock:
+        hits = _counters.get(f"{prefix}.hit", 0)
+        misses = _counters.get(f"{prefix}.miss", 0)
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+def start_reporter(interval: float = METRICS_LOG_INTERVAL):
+    """interval초마다 snapshot()을 JSON 한 줄로 로그에 남기는 백그라운드 스레드 시작 (프로세스당 한 번만)"""
+    global _reporter
+    if interval <= 0:
+        return
+    with _lock:
+        if _reporter is not None:
+            return
+        _reporter = threading.Thread(target=_report, args=(interval,), name="metrics-reporter", daemon=True)
+    _reporter.start()
+
+
+def _report(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            logger.info("metrics %s", json.dumps({"pid": os.getpid(), **snapshot()}, ensure_ascii=False))
+        except Exception as e:
+            print(f"⚠️ 지표 로그 출력 실패: {str(e)}")
+
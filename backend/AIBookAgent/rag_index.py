@@ -0,0 +1,126 @@
+from AIBookAgent.hybridRAG import AIBooksRAG, VECTOR_STORE_PATH, current_store_dir
+from typing import Tuple
+from dotenv import load_dotenv
+import threading
+import time
+import os
+
+load_dotenv()
+
+# 벡터스토어 파일 변경 여부를 확인하는 최소 간격(초)
+RELOAD_CHECK_INTERVAL = float(os.getenv("RAG_RELOAD_CHECK_INTERVAL", "5"))
+
+# 워커 프로세스 하나당 하나의 AIBooksRAG 인스턴스를 공유
+# - 서버 시작 시(AppConfig.ready) 한 번 로드해두고 모든 요청이 재사용
+# - 벡터스토어 파일이 바뀌면 백그라운드 스레드에서 새 인스턴스를 만든 뒤 참조만 교체(원자적 hot-swap)
+# - 새 인스턴스를 만드는 동안에도 요청들은 기다리지 않고 이전 인스턴스로 계속 검색
+
+# 바뀌면 다시 로드할 파일 (색인을 바꾸는 작업이 쓰는 파일만. cache/의 bm25, tokens 등 로드하면서 만드는 파일은 제외)
+# - index.faiss, index.pkl은 현재 버전 디렉토리(current 링크가 가리키는 곳)에서, 삭제 표시는 벡터스토어 디렉토리에서 확인
+SIGNATURE_FILES = ("index.faiss", "index.pkl")
+TOMBSTONE_FILENAME = "tombstones.json"
+
+_lock = threading.Lock()
+_current = (None, 0)  # (인스턴스, 버전). 함께 읽히도록 한 번에 교체
+_signature = None
+_last_check = 0.0
+
+
+def _store_signature(path: str = VECTOR_STORE_PATH):
+    """색인 파일들의 (경로, 크기, 수정 시각) 목록. 파일이 바뀌면 값이 달라짐 (벡터스토어가 없으면 None)"""
+    if not os.path.isdir(path):
+        return None
+
+    store_dir = current_store_dir(path)
+    entries = []
+    for filepath in [os.path.join(store_dir, filename) for filename in SIGNATURE_FILES] + [os.path.join(path, TOMBSTONE_FILENAME)]:
+        try:
+            stat = os.stat(filepath)
+        except FileNotFoundError:
+            continue
+        entries.append((filepath, stat.st_size, stat.st_mtime_ns))
+    return tuple(entries)
+
+
+def _build_rag() -> AIBooksRAG:
+    """벡터스토어와 BM25를 모두 준비한 새 인스턴스 생성"""
+    rag = AIBooksRAG()
+    rag.load_vector_store()
+    rag.initialize_bm25()
+    return rag
+
+
+def _reload(signature):
+    """(lock을 잡은 상태에서 호출) 새 인스턴스를 만들어 교체. signature는 만들기 전에 확인한 파일 상태"""
+    global _current, _signature
+
+    try:
+        new_rag = _build_rag()
+    except Exception as e:
+        if _current[0] is None:
+            raise
+        # 저장이 끝나지 않은 파일을 읽은 경우 등: 기존 인스턴스를 유지하고 다음 확인 때 재시도
+        print(f"⚠️ 벡터스토어 재로드 실패, 기존 인덱스를 유지합니다: {str(e)}")
+        return
+
+    # 벡터스토어가 없어서 이번 로드에서 만든 경우에는 만든 뒤의 상태를 기록 (다음 확인 때 다시 로드하지 않도록)
+    if signature is None:
+        signature = _store_signature()
+    # 참조 교체는 원자적이므로 읽는 쪽은 lock이 필요 없음
+    version = _current[1] + 1
+    _current, _signature = (new_rag, version), signature
+    print(f"✅ 공유 RAG 인덱스 로드 완료 (version {version})")
+
+
+def _reload_in_background(signature):
+    try:
+        _reload(signature)
+    finally:
+        _lock.release()
+
+
+def get_rag_with_version() -> Tuple[AIBooksRAG, int]:
+    """
+    현재 워커의 공유 AIBooksRAG 인스턴스와 그 버전을 함께 반환
+    - 아직 로드되지 않았다면 로드가 끝날 때까지 대기 (처음 한 번만)
+    - 이미 로드됐다면 대기 없이 반환하고, 파일이 바뀌었으면 백그라운드 스레드에서 새 인스턴스로 교체
+    - 버전을 따로 읽으면 그 사이 hot-swap된 경우 이전 인덱스의 결과에 새 버전이 붙으므로 같이 읽음
+    """
+    global _last_check
+
+    current = _current
+    if current[0] is None:
+        with _lock:
+            if _current[0] is None:
+                _last_check = time.monotonic()
+                _reload(_store_signature())
+            return _current
+
+    # 다른 스레드가 이미 재로드 중이면 lock을 잡지 못하므로 확인하지 않음
+    if time.monotonic() - _last_check >= RELOAD_CHECK_INTERVAL and _lock.acquire(blocking=False):
+        _last_check = time.monotonic()
+        signature = _store_signature()
+        if signature == _signature:
+            _lock.release()
+        else:
+            threading.Thread(target=_reload_in_background, args=(signature,), name="rag-reload", daemon=True).start()
+
+    return current
+
+
+def get_rag() -> AIBooksRAG:
+    """현재 워커의 공유 AIBooksRAG 인스턴스를 반환"""
+    return get_rag_with_version()[0]
+
+
+def index_version() -> int:
+    """현재 공유 인덱스의 버전. hot-swap될 때마다 1씩 증가"""
+    return _current[1]
+
+
+def warm_up():
+    """서버 시작 시 인덱스를 미리 로드"""
+    try:
+        get_rag()
+    except Exception as e:
+        print(f"❌ RAG 인덱스 사전 로드 실패: {str(e)}")
@@ -0,0 +1,114 @@
+from AIBookAgent import metrics
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+from dotenv import load_dotenv
+import threading
+import time
+import os
+
+load_dotenv()
+
+RESULT_CACHE_TTL = float(os.getenv("RAG_RESULT_CACHE_TTL", "300"))  # 초. 0이면 캐시하지 않음
+RESULT_CACHE_SIZE = int(os.getenv("RAG_RESULT_CACHE_SIZE", "1024"))
+
+
+class SingleFlight:
+    """
+    같은 키의 동시 계산을 하나로 합침 (request coalescing)
+    - 처음 요청한 스레드만 계산하고, 계산 중에 들어온 같은 키의 요청은 그 결과(또는 예외)를 기다려서 받음
+    - 계산이 끝나면 키를 지우므로 결과를 보관하지는 않음 (보관은 TTLCache에서)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            metrics.incr(f"{self.name}.coalesced")
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class TTLCache:
+    """
+    유효 시간(TTL)과 최대 개수가 있는 프로세스 내 결과 캐시
+    - 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+    - get_or_compute: 캐시에 없으면 SingleFlight로 계산해서 같은 키의 동시 요청은 한 번만 계산
+    - 계산 중 예외가 나면 캐시하지 않음 (기다리던 요청들은 같은 예외를 받음)
+    - 캐시된 값은 여러 요청이 함께 사용하므로 읽기만 해야 함
+    - 적중/실패/합쳐진 요청 수는 metrics의 {name}.hit / {name}.miss / {name}.coalesced에 기록
+    """
+
+    def __init__(self, name: str, ttl: float = RESULT_CACHE_TTL, max_size: int = RESULT_CACHE_SIZE):
+        self.name = name
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # 키 -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self._flight = SingleFlight(name)
+
+    def _get(self, key: Hashable):
+        """(찾았는지, 값). 만료된 항목은 삭제"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: Hashable, value: Any):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            metrics.set_gauge(f"{self.name}.size", len(self._entries))
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        found, value = self._get(key)
+        if found:
+            metrics.incr(f"{self.name}.hit")
+            return value
+        return self._flight.do(key, lambda: self._compute(key, compute))
+
+    def _compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        # 앞서 계산한 요청이 방금 캐시에 넣었을 수 있음
+        found, value = self._get(key)
+        if found:
+            metrics.incr(f"{self.name}.hit")
+            return value
+
+        metrics.incr(f"{self.name}.miss")
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,302 @@
+from langchain_core.embeddings import Embeddings
+from AIBookAgent import metrics
+from AIBookAgent.embedding_cache import CachedQueryEmbeddings, normalize_query
+from AIBookAgent.embedding_provider import get_embedding_provider
+from AIBookAgent.result_cache import SingleFlight
+from typing import Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+import numpy as np
+import threading
+import hashlib
+import sqlite3
+import re
+import faiss
+import time
+import os
+
+load_dotenv()
+
+SEMANTIC_CACHE_PATH = os.path.abspath(
+    os.getenv("RAG_SEMANTIC_CACHE_PATH", "./AIBookAgent/cache/semantic_responses.sqlite3")
+)
+# 코사인 유사도가 이 값 이상인 이전 질문의 답변을 재사용
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("RAG_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("RAG_SEMANTIC_CACHE_SIZE", "50000"))
+SEMANTIC_CACHE_CANDIDATES = 8  # 유사도 순으로 확인할 후보 수 (만료/삭제된 항목 건너뛰기용)
+SEMANTIC_CACHE_SWEEP_INTERVAL = 60  # 모든 답변이 만료된 범위의 메모리 인덱스를 정리하는 간격(초)
+# 액션별 답변 유효 시간(초). 0이면 해당 액션은 캐시하지 않음
+SEMANTIC_CACHE_TTLS = {
+    "basic_chat": float(os.getenv("RAG_SEMANTIC_CACHE_TTL_BASIC_CHAT", "86400")),
+    "make_plans": float(os.getenv("RAG_SEMANTIC_CACHE_TTL_MAKE_PLANS", "86400")),
+}
+SEMANTIC_CACHE_DEFAULT_TTL = float(os.getenv("RAG_SEMANTIC_CACHE_TTL", "3600"))
+
+NUMBER_RE = re.compile(r"\d+(?:[.,:/-]\d+)*")
+
+
+def history_scope(chat_history) -> str:
+    """
+    LLM에 그대로 넘기는 대화 내역(LangChain 메시지 또는 (역할, 내용) 튜플) 전체의 해시
+    - 캐시 범위로 사용해서 대화 내역이 글자 하나까지 같을 때만 답변을 재사용
+      (다른 사용자나 다른 채팅방의 대화 맥락, 목차 등이 섞인 답변을 돌려주지 않음)
+    """
+    digest = hashlib.sha256()
+    for message in chat_history:
+        if isinstance(message, tuple):
+            role, content = message
+        else:
+            role, content = message.type, message.content
+        digest.update(f"{len(str(role))}:{role}{len(str(content))}:{content}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def question_numbers(question: str) -> str:
+    """
+    질문에 나오는 숫자(기간, 날짜, 회차, 점수 등)를 순서대로 이은 값
+    - "4주 계획"과 "8주 계획"처럼 숫자만 다른 질문은 임베딩 유사도가 threshold보다 높게 나오므로
+      캐시 범위에 넣어서 숫자까지 같을 때만 답변을 재사용
+    """
+    return ",".join(NUMBER_RE.findall(normalize_query(question)))
+
+
+class SemanticCache:
+    """
+    LLM 답변 시맨틱 캐시
+    - 정규화한 질문을 임베딩해서, 같은 범위 안에서 유사도가 threshold 이상인 이전 질문의 답변을 그대로 반환
+    - 답변과 질문 벡터는 SQLite에 저장 (워커 간 공유, 재시작 후에도 유지)
+    - 검색은 (액션, 범위, 임베딩 모델)별 메모리 FAISS 내적 인덱스로 하고, 다른 워커가 추가한 행은 조회할 때마다 가져옴
+    - scope: 정확히 같아야 하는 값. 대화 내역의 해시(history_scope)를 넣고,
+      오늘 날짜가 들어가는 답변은 날짜도 넣어서 같은 날짜 안에서만 재사용
+      (질문에 나오는 숫자와 날짜는 get_or_compute에서 범위에 추가)
+    - 범위별 인덱스는 답변이 모두 만료되거나 삭제되면 메모리에서 제거
+    - 적중/실패 횟수는 metrics의 semantic_cache.<액션>.hit / miss에 기록
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings = None,
+        model_name: str = None,
+        cache_path: str = SEMANTIC_CACHE_PATH,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_size: int = SEMANTIC_CACHE_SIZE,
+        ttls: Dict[str, float] = None,
+    ):
+        # 임베딩을 주지 않으면 처음 조회할 때 RAG_EMBEDDING_PROVIDER 설정으로 생성
+        self.embeddings = embeddings
+        self.model_name = model_name or (type(embeddings).__name__ if embeddings is not None else None)
+        self.cache_path = cache_path
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttls = SEMANTIC_CACHE_TTLS if ttls is None else ttls
+        self._indexes: Dict[Tuple[str, str], faiss.IndexIDMap2] = {}  # (액션, 범위) -> 벡터 인덱스
+        self._expires: Dict[Tuple[str, str], float] = {}  # (액션, 범위) -> 인덱스에 넣은 답변 중 가장 늦은 만료 시각
+        self._last_sweep = 0.0
+        self._last_id = 0  # 메모리 인덱스에 반영한 마지막 행 번호
+        self._inserts = 0
+        self._lock = threading.Lock()
+        self._flight = SingleFlight("semantic_cache")
+        self._conn = None
+
+    # 1. 저장소 (SQLite)
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            conn = sqlite3.connect(self.cache_path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    action TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    response TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_expires_at ON responses(expires_at)")
+            self._conn = conn
+        except sqlite3.Error as e:
+            print(f"⚠️ 시맨틱 캐시를 열 수 없습니다. 캐시 없이 답변을 생성합니다: {str(e)}")
+        return self._conn
+
+    def _sync(self, conn: sqlite3.Connection):
+        """(lock을 잡은 상태에서 호출) 마지막으로 반영한 뒤 추가된 행을 메모리 인덱스에 추가"""
+        rows = conn.execute(
+            "SELECT id, action, scope, vector, expires_at FROM responses WHERE id > ? AND model = ? ORDER BY id",
+            (self._last_id, self.model_name),
+        ).fetchall()
+        if not rows:
+            (max_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) FROM responses").fetchone()
+            self._last_id = max(self._last_id, max_id)
+            return
+
+        groups = {}
+        for row_id, action, scope, blob, expires_at in rows:
+            key = (action, scope)
+            groups.setdefault(key, []).append((row_id, np.frombuffer(blob, dtype=np.float32)))
+            self._expires[key] = max(self._expires.get(key, 0.0), expires_at)
+        for key, items in groups.items():
+            vectors = np.vstack([vector for _, vector in items])
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+            index.add_with_ids(vectors, np.asarray([row_id for row_id, _ in items], dtype=np.int64))
+        self._last_id = rows[-1][0]
+
+    def _evict(self, conn: sqlite3.Connection):
+        """(lock을 잡은 상태에서 호출) 만료된 행과 최대 개수를 넘은 오래된 행을 삭제하고 메모리 인덱스에서도 제거"""
+        now = time.time()
+        removed = conn.execute(
+            "DELETE FROM responses WHERE expires_at <= ? RETURNING id, action, scope", (now,)
+        ).fetchall()
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_size:
+            removed += conn.execute(
+                "DELETE FROM responses WHERE id IN (SELECT id FROM responses ORDER BY id LIMIT ?) RETURNING id, action, scope",
+                (count - self.max_size,),
+            ).fetchall()
+        if removed:
+            metrics.incr("semantic_cache.evicted", len(removed))
+
+        groups = {}
+        for row_id, action, scope in removed:
+            groups.setdefault((action, scope), []).append(row_id)
+        for key, row_ids in groups.items():
+            index = self._indexes.get(key)
+            if index is not None:
+                index.remove_ids(np.asarray(row_ids, dtype=np.int64))
+                if index.ntotal == 0:
+                    self._drop_index(key)
+        self._sweep(now)
+
+    def _sweep(self, now: float):
+        """
+        (lock을 잡은 상태에서 호출) 답변이 모두 만료된 범위의 인덱스 삭제
+        - 다른 워커가 행을 지운 경우에도 만료 시각으로 정리되므로 범위별 인덱스가 계속 쌓이지 않음
+        """
+        self._last_sweep = now
+        for key in [key for key, expires_at in self._expires.items() if expires_at <= now]:
+            self._drop_index(key)
+
+    def _drop_index(self, key: Tuple[str, str]):
+        self._indexes.pop(key, None)
+        self._expires.pop(key, None)
+
+    # 2. 조회 및 저장
+    def prompt_text(self, question: str, context: str = "") -> str:
+        """임베딩할 텍스트 (최근 대화 맥락 + 정규화한 질문)"""
+        question = normalize_query(question)
+        context = normalize_query(context)
+        return f"{context}\n질문: {question}" if context else question
+
+    def _embed(self, text: str) -> np.ndarray:
+        if self.embeddings is None:
+            provider = get_embedding_provider()
+            self.embeddings = CachedQueryEmbeddings(provider.embeddings, model_name=provider.cache_name)
+            self.model_name = provider.cache_name
+        vector = np.asarray([self.embeddings.embed_query(text)], dtype=np.float32)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def lookup(self, action: str, vector: np.ndarray, scope: str = "") -> Optional[Tuple[str, float]]:
+        """유사도가 threshold 이상이고 만료되지 않은 가장 가까운 답변의 (답변, 유사도)"""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            self._sync(conn)
+            now = time.time()
+            if now - self._last_sweep >= SEMANTIC_CACHE_SWEEP_INTERVAL:
+                self._sweep(now)
+            index = self._indexes.get((action, scope))
+            if index is None or index.ntotal == 0:
+                return None
+            similarities, ids = index.search(vector, min(SEMANTIC_CACHE_CANDIDATES, index.ntotal))
+
+            for similarity, row_id in zip(similarities[0].tolist(), ids[0].tolist()):
+                if row_id < 0 or similarity < self.threshold:
+                    break
+                row = conn.execute(
+                    "SELECT response FROM responses WHERE id = ? AND expires_at > ?", (row_id, now)
+                ).fetchone()
+                if row is not None:
+                    return row[0], similarity
+        return None
+
+    def store(self, action: str, prompt: str, vector: np.ndarray, response: str, scope: str = ""):
+        ttl = self.ttls.get(action, SEMANTIC_CACHE_DEFAULT_TTL)
+        if ttl <= 0:
+            return
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    """
+                    INSERT INTO responses (action, scope, model, prompt, vector, response, expires_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (action, scope, self.model_name, prompt, vector.tobytes(), response, time.time() + ttl),
+                )
+                self._inserts += 1
+                # 삽입 100번마다 만료/초과 항목 정리
+                if self._inserts % 100 == 0:
+                    self._evict(conn)
+            except sqlite3.Error as e:
+                print(f"⚠️ 시맨틱 캐시 저장 실패: {str(e)}")
+
+    def get_or_compute(
+        self, action: str, question: str, compute: Callable[[], str], context: str = "", scope: str = ""
+    ) -> str:
+        """
+        비슷한 질문의 답변이 캐시에 있으면 반환하고, 없으면 compute()로 생성해서 저장
+        - 캐시 조회/저장이 실패해도(임베딩 API 오류 등) 답변 생성은 그대로 진행
+        - 같은 질문이 동시에 들어오면 LLM은 한 번만 호출
+        - 질문의 숫자/날짜가 다르면 유사도와 상관없이 재사용하지 않음
+        """
+        if self.ttls.get(action, SEMANTIC_CACHE_DEFAULT_TTL) <= 0:
+            return compute()
+
+        scope = f"{scope}#{question_numbers(question)}"
+
+        prompt = self.prompt_text(question, context)
+        try:
+            vector = self._embed(prompt)
+            cached = self.lookup(action, vector, scope)
+        except Exception as e:
+            print(f"⚠️ 시맨틱 캐시 조회 실패: {str(e)}")
+            return compute()
+
+        if cached is not None:
+            metrics.incr(f"semantic_cache.{action}.hit")
+            return cached[0]
+
+        def generate():
+            metrics.incr(f"semantic_cache.{action}.miss")
+            response = compute()
+            if response:
+                self.store(action, prompt, vector, response, scope)
+            return response
+
+        key = (action, scope, hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+        return self._flight.do(key, generate)
+
+    def stats(self) -> Dict:
+        """액션별 적중/미스 횟수와 적중률"""
+        counters = metrics.snapshot()["counters"]
+        return {
+            action: {
+                "hit": counters.get(f"semantic_cache.{action}.hit", 0),
+                "miss": counters.get(f"semantic_cache.{action}.miss", 0),
+                "hit_rate": metrics.hit_rate(f"semantic_cache.{action}"),
+            }
+            for action in self.ttls
+        }
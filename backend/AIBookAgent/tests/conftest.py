@@ -0,0 +1,14 @@
+from AIBookAgent.benchmarks.synthetic import make_books, make_rag
+from AIBookAgent.embedding_provider import HashingEmbeddings
+import pytest
+
+
+@pytest.fixture
+def books():
+    return make_books(20, toc_items=16)
+
+
+@pytest.fixture
+def rag(tmp_path, books):
+    """tmp_path 아래에 가짜 도서 20권으로 만든 AIBooksRAG (네트워크 없이 로컬 임베딩 사용)"""
+    return make_rag(str(tmp_path), books, HashingEmbeddings(256))
@@ -0,0 +1,89 @@
+from AIBookAgent.aladin_cache import AladinCache
+import pytest
+
+
+class Fetch:
+    """알라딘 API 대역 (호출할 때마다 다른 값)"""
+
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return {"item": [{"isbn13": "9791100000000", "version": self.calls}]}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AladinCache(str(tmp_path / "aladin.sqlite3"), ttls={"lookup": (100, 100)})
+    yield cache
+    cache._refresh_pool.shutdown(wait=True)
+
+
+def age(cache, seconds: float):
+    """저장된 응답을 seconds초 전에 받아온 것으로 변경"""
+    with cache._lock:
+        cache._conn.execute("UPDATE aladin_responses SET fetched_at = fetched_at - ?", (seconds,))
+
+
+def version(value) -> int:
+    return value["item"][0]["version"]
+
+
+def test_fresh_response_is_served_from_cache(cache, tmp_path):
+    fetch = Fetch()
+
+    assert version(cache.get_or_fetch("lookup", "9791100000000", fetch)) == 1
+    assert version(cache.get_or_fetch("lookup", "9791100000000", fetch)) == 1
+    # 다른 워커(인스턴스)도 같은 파일을 사용
+    other = AladinCache(str(tmp_path / "aladin.sqlite3"), ttls={"lookup": (100, 100)})
+    assert version(other.get_or_fetch("lookup", "9791100000000", fetch)) == 1
+    assert fetch.calls == 1
+
+
+def test_stale_response_is_returned_and_refreshed_in_background(cache):
+    fetch = Fetch()
+    cache.get_or_fetch("lookup", "9791100000000", fetch)
+    age(cache, 150)
+
+    assert version(cache.get_or_fetch("lookup", "9791100000000", fetch)) == 1
+    cache._refresh_pool.shutdown(wait=True)
+    assert fetch.calls == 2
+    value, elapsed = cache.get("lookup", "9791100000000")
+    assert version(value) == 2
+    assert elapsed < 100
+
+
+def test_failed_refresh_keeps_stale_response(cache):
+    cache.get_or_fetch("lookup", "9791100000000", Fetch())
+    age(cache, 150)
+
+    assert version(cache.get_or_fetch("lookup", "9791100000000", Fetch(RuntimeError("API 오류")))) == 1
+    cache._refresh_pool.shutdown(wait=True)
+    assert version(cache.get("lookup", "9791100000000")[0]) == 1
+
+
+def test_expired_response_is_fetched_again(cache):
+    fetch = Fetch()
+    cache.get_or_fetch("lookup", "9791100000000", fetch)
+    age(cache, 250)
+
+    assert version(cache.get_or_fetch("lookup", "9791100000000", fetch)) == 2
+    assert fetch.calls == 2
+
+
+def test_none_is_not_cached(cache):
+    assert cache.get_or_fetch("lookup", "9791100000000", lambda: None) is None
+    assert cache.get("lookup", "9791100000000") == (None, None)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = AladinCache(str(tmp_path / "aladin.sqlite3"), max_size=50, ttls={"lookup": (100, 100)})
+    for i in range(100):
+        cache.put("lookup", str(i), {"i": i})
+
+    assert cache.get("lookup", "0") == (None, None)
+    assert cache.get("lookup", "99")[0] == {"i": 99}
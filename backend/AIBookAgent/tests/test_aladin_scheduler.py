@@ -0,0 +1,116 @@
+from AIBookAgent.aladin_scheduler import AladinScheduler, AladinUnavailable, CircuitBreaker, TokenBucket
+import requests
+import time
+import pytest
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def bucket_path(request, tmp_path):
+    """워커 간 공유(SQLite)와 프로세스 안에서만 제한하는 경우"""
+    return str(tmp_path / "rate.sqlite3") if request.param == "sqlite" else None
+
+
+def test_burst_then_rate(bucket_path):
+    bucket = TokenBucket("test.bucket", rate=10, burst=3, path=bucket_path)
+
+    assert [bucket._take(max_wait=0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket._take(max_wait=0) is None
+    # 한도를 넘은 요청은 들어온 순서대로 1 / rate 간격으로 기다림
+    assert bucket._take(max_wait=1) == pytest.approx(0.1, abs=0.02)
+    assert bucket._take(max_wait=1) == pytest.approx(0.2, abs=0.02)
+    with pytest.raises(AladinUnavailable):
+        bucket.acquire(max_wait=0.1)
+
+
+def test_tokens_refill_up_to_burst(bucket_path):
+    bucket = TokenBucket("test.bucket", rate=100, burst=2, path=bucket_path)
+    for _ in range(2):
+        bucket._take(max_wait=0)
+
+    time.sleep(0.1)  # 10개가 찰 시간이지만 burst까지만
+    assert [bucket._take(max_wait=0) for _ in range(2)] == [0.0, 0.0]
+    assert bucket._take(max_wait=0) is None
+
+
+def test_bucket_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "rate.sqlite3")
+    first = TokenBucket("test.shared", rate=1, burst=2, path=path)
+    second = TokenBucket("test.shared", rate=1, burst=2, path=path)
+    other = TokenBucket("test.other", rate=1, burst=2, path=path)
+
+    assert first._take(max_wait=0) == 0.0
+    assert second._take(max_wait=0) == 0.0
+    assert first._take(max_wait=0) is None
+    assert other._take(max_wait=0) == 0.0
+
+
+def test_zero_rate_disables_limit(tmp_path):
+    bucket = TokenBucket("test.unlimited", rate=0, burst=0, path=str(tmp_path / "rate.sqlite3"))
+    assert [bucket.acquire(max_wait=0) for _ in range(5)] == [0.0] * 5
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test.breaker", failure_threshold=3, reset_timeout=60)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.record_success()  # 연속 실패만 셈
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(AladinUnavailable):
+        breaker.before_call()
+
+
+@pytest.mark.parametrize("trial_succeeds", [True, False])
+def test_breaker_allows_one_trial_after_reset_timeout(trial_succeeds):
+    breaker = CircuitBreaker("test.breaker", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(AladinUnavailable):
+        breaker.before_call()  # 시험 호출은 하나만
+
+    if trial_succeeds:
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+    else:
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(AladinUnavailable):
+            breaker.before_call()
+
+
+class Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+def test_scheduler_retries_server_errors_then_opens_breaker():
+    scheduler = AladinScheduler("test.scheduler", attempts=3)
+    scheduler.bucket = TokenBucket("test.scheduler.rate_limit", rate=0, path=None)
+    scheduler.breaker = CircuitBreaker("test.scheduler.circuit", failure_threshold=3, reset_timeout=60)
+    statuses = [503, 200]  # 다 쓰면 계속 503
+    sent = []
+
+    def send():
+        sent.append(statuses.pop(0) if statuses else 503)
+        return Response(sent[-1])
+
+    assert scheduler.request("a", send).status_code == 200
+    assert sent == [503, 200]
+
+    with pytest.raises(requests.HTTPError):
+        scheduler.request("b", send)
+    assert sent == [503, 200, 503, 503, 503]
+    assert scheduler.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(AladinUnavailable):
+        scheduler.request("c", send)
+    assert len(sent) == 5
@@ -0,0 +1,117 @@
+from AIBookAgent.bm25 import SparseBM25
+import numpy as np
+import random
+import os
+import pytest
+
+
+def make_corpus(n_docs: int = 300, n_words: int = 400, seed: int = 0):
+    """단어 빈도가 고르지 않은 임의의 토큰화된 문서 목록 (흔한 단어는 음수 IDF가 되도록)"""
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(n_words)]
+    return [
+        [rng.choice(words[: rng.randint(5, n_words)]) for _ in range(rng.randint(1, 40))]
+        for _ in range(n_docs)
+    ]
+
+
+QUERIES = [["w0", "w1"], ["w3", "w3", "w250"], ["w399"], ["없는단어"], ["w10", "없는단어", "w42"]]
+
+
+def test_scores_match_rank_bm25():
+    rank_bm25 = pytest.importorskip("rank_bm25")
+    corpus = make_corpus()
+    expected = rank_bm25.BM25Okapi(corpus)
+    bm25 = SparseBM25().fit(corpus)
+
+    for query in QUERIES:
+        np.testing.assert_allclose(bm25.get_scores(query), expected.get_scores(query), rtol=0, atol=4e-7)
+
+
+def test_top_k_matches_full_sort():
+    corpus = make_corpus()
+    bm25 = SparseBM25().fit(corpus)
+
+    for query in QUERIES:
+        scores = bm25.get_scores(query)
+        doc_ids, values = bm25.top_k(query, k=10)
+        assert len(doc_ids) == min(10, np.count_nonzero(scores))
+        np.testing.assert_allclose(values, np.sort(scores[scores > 0])[::-1][: len(values)])
+        np.testing.assert_allclose(scores[doc_ids], values)
+
+
+def test_top_k_with_mask_only_returns_allowed_documents():
+    corpus = make_corpus()
+    bm25 = SparseBM25().fit(corpus)
+    mask = np.zeros(len(corpus), dtype=bool)
+    mask[::3] = True
+
+    doc_ids, values = bm25.top_k(["w0", "w1"], k=20, mask=mask)
+    assert len(doc_ids) > 0
+    assert mask[doc_ids].all()
+    scores = np.where(mask, bm25.get_scores(["w0", "w1"]), 0)
+    np.testing.assert_allclose(values, np.sort(scores[scores > 0])[::-1][: len(values)])
+
+
+def test_top_k_many_matches_top_k():
+    bm25 = SparseBM25().fit(make_corpus())
+
+    for (doc_ids, values), query in zip(bm25.top_k_many(QUERIES, k=7), QUERIES):
+        expected_ids, expected_values = bm25.top_k(query, k=7)
+        np.testing.assert_array_equal(doc_ids, expected_ids)
+        np.testing.assert_allclose(values, expected_values)
+
+
+def test_max_scores_bound_document_scores():
+    bm25 = SparseBM25().fit(make_corpus())
+
+    for query, max_score in zip(QUERIES, bm25.max_scores(QUERIES)):
+        assert bm25.get_scores(query).max() <= max_score + 1e-6
+
+
+def test_save_and_load_round_trip(tmp_path):
+    corpus = make_corpus()
+    bm25 = SparseBM25().fit(corpus)
+    path = str(tmp_path / "bm25")
+    bm25.save(path, fingerprint="v1")
+
+    for mmap in (True, False):
+        loaded = SparseBM25.load(path, fingerprint="v1", mmap=mmap)
+        assert loaded is not None
+        for query in QUERIES:
+            np.testing.assert_array_equal(loaded.get_scores(query), bm25.get_scores(query))
+
+
+def test_load_rejects_missing_or_stale_index(tmp_path):
+    path = str(tmp_path / "bm25")
+    assert SparseBM25.load(path, fingerprint="v1") is None
+
+    SparseBM25().fit(make_corpus()).save(path, fingerprint="v1")
+    assert SparseBM25.load(path, fingerprint="v2") is None
+
+
+def test_save_publishes_new_version_and_keeps_two(tmp_path):
+    path = str(tmp_path / "bm25")
+    for seed in range(4):
+        SparseBM25().fit(make_corpus(n_docs=10 + seed, seed=seed)).save(path, fingerprint="v1")
+
+    versions = sorted(entry for entry in os.listdir(tmp_path) if entry.startswith("bm25-"))
+    assert len(versions) == 2
+    assert os.path.realpath(path) == str(tmp_path / versions[-1])
+    assert SparseBM25.load(path, fingerprint="v1").n_docs == 13
+    # 교체 전에 열어 둔 인덱스는 새 버전이 공개돼도 그대로 읽힘
+    old = SparseBM25.load(path, fingerprint="v1")
+    SparseBM25().fit(make_corpus(n_docs=50)).save(path, fingerprint="v1")
+    assert old.n_docs == 13
+    assert len(old.get_scores(["w0"])) == 13
+
+
+def test_append_matches_full_fit():
+    corpus = make_corpus()
+    full = SparseBM25().fit(corpus)
+    incremental = SparseBM25().fit(corpus[:200]).append(corpus[200:250]).append(corpus[250:])
+
+    assert incremental.n_docs == full.n_docs
+    assert incremental.vocab == full.vocab
+    for query in QUERIES:
+        np.testing.assert_array_equal(incremental.get_scores(query), full.get_scores(query))
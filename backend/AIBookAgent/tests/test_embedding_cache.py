@@ -0,0 +1,59 @@
+from AIBookAgent.embedding_cache import CachedQueryEmbeddings, normalize_query
+from AIBookAgent.embedding_provider import HashingEmbeddings
+
+
+class CountingEmbeddings(HashingEmbeddings):
+    """임베딩 API 호출 횟수를 세는 로컬 임베딩"""
+
+    def __init__(self):
+        super().__init__(64)
+        self.queries = []
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return super().embed_query(text)
+
+    def embed_documents(self, texts):
+        self.queries.extend(texts)
+        return super().embed_documents(texts)
+
+
+def test_normalize_query():
+    assert normalize_query("  파이썬   입문\n") == "파이썬 입문"
+    assert normalize_query("ＰＹＴＨＯＮ　입문") == "PYTHON 입문"
+
+
+def test_repeated_query_hits_memory_cache():
+    backend = CountingEmbeddings()
+    cached = CachedQueryEmbeddings(backend, "hashing-64", cache_path=None)
+
+    first = cached.embed_query("파이썬 입문")
+    assert cached.embed_query("  파이썬   입문 ") == first
+    assert backend.queries == ["파이썬 입문"]
+
+
+def test_disk_cache_is_shared_across_instances(tmp_path):
+    path = str(tmp_path / "query_embeddings.sqlite3")
+    first = CachedQueryEmbeddings(CountingEmbeddings(), "hashing-64", cache_path=path)
+    vector = first.embed_query("자료구조")
+
+    backend = CountingEmbeddings()
+    second = CachedQueryEmbeddings(backend, "hashing-64", cache_path=path)
+    assert second.embed_query("자료구조") == vector
+    assert backend.queries == []
+
+    # 모델이 다르면 캐시를 같이 쓰지 않음
+    other = CachedQueryEmbeddings(backend, "other-model", cache_path=path)
+    other.embed_query("자료구조")
+    assert backend.queries == ["자료구조"]
+
+
+def test_embed_queries_requests_only_missing_queries_once():
+    backend = CountingEmbeddings()
+    cached = CachedQueryEmbeddings(backend, "hashing-64", cache_path=None)
+    cached.embed_query("운영체제")
+
+    vectors = cached.embed_queries(["운영체제", "네트워크", " 네트워크 ", "데이터베이스"])
+    assert backend.queries == ["운영체제", "네트워크", "데이터베이스"]
+    assert vectors[1] == vectors[2]
+    assert vectors[0] == cached.embed_query("운영체제")
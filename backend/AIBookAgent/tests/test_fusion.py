@@ -0,0 +1,69 @@
+from AIBookAgent import hybridRAG
+import numpy as np
+import pytest
+
+
+def candidates(positions, values):
+    return np.asarray(positions, dtype=np.int64), np.asarray(values, dtype=np.float32)
+
+
+def documents_of_two_books(rag):
+    """서로 다른 두 책의 문서 위치 (첫 번째 책은 문서 두 개)"""
+    first_book = rag.doc_books[0]
+    same = np.flatnonzero(rag.doc_books == first_book)
+    other = np.flatnonzero(rag.doc_books != first_book)
+    return same[0], same[1], other[0]
+
+
+def test_fuse_takes_best_score_per_book(rag):
+    a1, a2, b = documents_of_two_books(rag)
+    # FAISS 거리 0 -> 유사도 1, 거리 1 -> 유사도 0.5
+    faiss_results = candidates([b, a1], [1.0, 1.2])
+    bm25_results = candidates([a2, a1, b], [1.0, 0.3, 0.2])
+
+    book_ids, scores, positions, relevances = rag._fuse(faiss_results, bm25_results, k=5, semantic_weight=0.5)
+
+    assert book_ids.tolist() == [rag.doc_books[a1], rag.doc_books[b]]
+    np.testing.assert_allclose(scores, [0.5 * 0.4 + 0.5 * 1.0, 0.5 * 0.5 + 0.5 * 0.2], rtol=1e-6)
+    np.testing.assert_allclose(relevances, scores)
+    assert positions.tolist()[1] == b
+
+
+def test_fuse_with_one_leg_missing(rag):
+    a1, _, b = documents_of_two_books(rag)
+    empty = candidates([], [])
+
+    book_ids, scores, _, _ = rag._fuse(empty, candidates([b, a1], [1.0, 0.5]), k=1, semantic_weight=0.5)
+    assert book_ids.tolist() == [rag.doc_books[b]]
+    np.testing.assert_allclose(scores, [0.5])
+
+    book_ids, _, _, _ = rag._fuse(empty, empty, k=5, semantic_weight=0.5)
+    assert len(book_ids) == 0
+
+
+def test_rrf_keeps_normalized_relevance(rag, monkeypatch):
+    monkeypatch.setattr(hybridRAG, "FUSION_METHOD", "rrf")
+    a1, _, b = documents_of_two_books(rag)
+
+    book_ids, scores, _, relevances = rag._fuse(
+        candidates([a1, b], [0.2, 1.0]), candidates([a1, b], [0.1, 0.05]), k=5, semantic_weight=0.5,
+    )
+    assert book_ids.tolist() == [rag.doc_books[a1], rag.doc_books[b]]
+    assert scores[0] == pytest.approx(1.0)
+    np.testing.assert_allclose(relevances, [0.5 * 0.9 + 0.5 * 0.1, 0.5 * 0.5 + 0.5 * 0.05], rtol=1e-6)
+
+
+def test_exact_title_is_first_and_relevant(rag, books):
+    title = books[7]["title"]
+
+    results = rag.hybrid_search(title, k=3, with_relevance=True)
+    assert results[0][0]["title"] == title
+    assert [score for _, score, _ in results] == sorted((score for _, score, _ in results), reverse=True)
+    assert rag.is_relevant(results)
+
+
+def test_unrelated_query_falls_back(rag):
+    results = rag.hybrid_search("quantum chromodynamics lattice", k=3, with_relevance=True)
+
+    assert not rag.is_relevant(results)
+    assert not rag.is_relevant([])
@@ -0,0 +1,116 @@
+from AIBookAgent import metrics
+from AIBookAgent.result_cache import SingleFlight, TTLCache
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import pytest
+
+
+def counter(name: str) -> float:
+    return metrics.snapshot()["counters"].get(name, 0)
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 안에 조건을 만족하지 않았습니다."
+        time.sleep(0.005)
+
+
+class Compute:
+    """호출 횟수를 세고, release 전까지 결과를 돌려주지 않는 계산"""
+
+    def __init__(self, value="결과", error: Exception = None):
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def test_cached_value_is_reused():
+    cache = TTLCache("test_result_cache.reuse", ttl=60)
+    compute = Compute()
+
+    assert cache.get_or_compute("key", compute) == "결과"
+    assert cache.get_or_compute("key", compute) == "결과"
+    assert cache.get_or_compute("other", compute) == "결과"
+    assert compute.calls == 2
+
+
+def test_entry_expires_after_ttl():
+    cache = TTLCache("test_result_cache.ttl", ttl=0.05)
+    compute = Compute()
+
+    cache.get_or_compute("key", compute)
+    time.sleep(0.1)
+    cache.get_or_compute("key", compute)
+    assert compute.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache("test_result_cache.lru", ttl=60, max_size=2)
+    compute = Compute()
+
+    for key in ["a", "b", "a", "c", "a", "b"]:
+        cache.get_or_compute(key, compute)
+    # a, b, c 계산 후 c가 들어오면서 가장 오래 안 쓴 b가 빠짐
+    assert compute.calls == 4
+
+
+def test_zero_ttl_disables_cache():
+    cache = TTLCache("test_result_cache.disabled", ttl=0)
+    compute = Compute()
+
+    cache.get_or_compute("key", compute)
+    cache.get_or_compute("key", compute)
+    assert compute.calls == 2
+
+
+def test_exceptions_are_not_cached():
+    cache = TTLCache("test_result_cache.error", ttl=60)
+    failing = Compute(error=RuntimeError("실패"))
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("key", failing)
+    assert cache.get_or_compute("key", Compute("복구")) == "복구"
+
+
+@pytest.mark.parametrize("error", [None, RuntimeError("실패")])
+def test_single_flight_coalesces_concurrent_calls(error):
+    name = f"test_result_cache.flight.{error is None}"
+    flight = SingleFlight(name)
+    compute = Compute(error=error)
+    compute.release.clear()
+    before = counter(f"{name}.coalesced")
+
+    def call():
+        try:
+            return flight.do("key", compute)
+        except RuntimeError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(call) for _ in range(8)]
+        # 한 스레드가 계산을 시작하고 나머지 7개가 그 결과를 기다릴 때까지 대기
+        wait_for(lambda: counter(f"{name}.coalesced") - before == 7)
+        compute.release.set()
+        results = [future.result() for future in futures]
+
+    assert compute.calls == 1
+    if error is None:
+        assert results == ["결과"] * 8
+    else:
+        assert all(result is error for result in results)
+
+    # 계산이 끝나면 키를 지우므로 다음 호출은 다시 계산
+    compute.error = None
+    assert flight.do("key", compute) == "결과"
+    assert compute.calls == 2
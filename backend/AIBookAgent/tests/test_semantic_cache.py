@@ -0,0 +1,97 @@
+from AIBookAgent.embedding_provider import HashingEmbeddings
+from AIBookAgent.semantic_cache import SemanticCache, history_scope, question_numbers
+from langchain_core.messages import AIMessage, HumanMessage
+import time
+import pytest
+
+
+class Answer:
+    """호출 횟수를 세는 LLM 대역"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"답변 {self.calls}"
+
+
+def make_cache(tmp_path, **kwargs):
+    return SemanticCache(HashingEmbeddings(256), cache_path=str(tmp_path / "semantic.sqlite3"), **kwargs)
+
+
+def test_question_numbers():
+    assert question_numbers("4주 동안 2025.03.01까지 공부 계획") == "4,2025.03.01"
+    assert question_numbers("４주 계획") == "4"
+    assert question_numbers("숫자 없는 질문") == ""
+
+
+def test_history_scope_depends_on_every_message():
+    history = [("human", "정보처리기사 공부법"), ("ai", "기출 위주로 공부하세요")]
+    messages = [HumanMessage(content="정보처리기사 공부법"), AIMessage(content="기출 위주로 공부하세요")]
+
+    assert history_scope(history) == history_scope(messages)
+    assert history_scope(history) != history_scope(history[:1])
+    assert history_scope([("human", "ab"), ("ai", "c")]) != history_scope([("human", "a"), ("ai", "bc")])
+
+
+def test_same_question_reuses_answer_across_instances(tmp_path):
+    answer = Answer()
+    cache = make_cache(tmp_path)
+
+    assert cache.get_or_compute("basic_chat", "전기기사 필기 공부 순서", answer) == "답변 1"
+    assert cache.get_or_compute("basic_chat", "  전기기사 필기   공부 순서 ", answer) == "답변 1"
+    # 다른 워커도 같은 SQLite 파일의 답변을 사용
+    assert make_cache(tmp_path).get_or_compute("basic_chat", "전기기사 필기 공부 순서", answer) == "답변 1"
+    assert answer.calls == 1
+
+
+def test_answers_are_scoped(tmp_path):
+    answer = Answer()
+    cache = make_cache(tmp_path)
+    question = "전기기사 필기 공부 순서"
+
+    cache.get_or_compute("basic_chat", question, answer, scope="history-a")
+    assert cache.get_or_compute("basic_chat", question, answer, scope="history-b") == "답변 2"
+    assert cache.get_or_compute("make_plans", question, answer, scope="history-a") == "답변 3"
+    assert cache.get_or_compute("basic_chat", question, answer, scope="history-a") == "답변 1"
+
+
+def test_numbers_in_question_are_part_of_scope(tmp_path):
+    answer = Answer()
+    cache = make_cache(tmp_path)
+
+    assert cache.get_or_compute("make_plans", "정보처리기사 4주 계획 세워줘", answer) == "답변 1"
+    assert cache.get_or_compute("make_plans", "정보처리기사 8주 계획 세워줘", answer) == "답변 2"
+    assert cache.get_or_compute("make_plans", "정보처리기사 ４주 계획 세워줘", answer) == "답변 1"
+
+
+def test_zero_ttl_action_is_not_cached(tmp_path):
+    answer = Answer()
+    cache = make_cache(tmp_path, ttls={"basic_chat": 0})
+
+    cache.get_or_compute("basic_chat", "질문", answer)
+    cache.get_or_compute("basic_chat", "질문", answer)
+    assert answer.calls == 2
+
+
+@pytest.mark.parametrize("cleanup", ["evict", "sweep"])
+def test_expired_scopes_are_dropped_from_memory(tmp_path, cleanup):
+    answer = Answer()
+    cache = make_cache(tmp_path, ttls={"basic_chat": 0.05})
+
+    for scope in ["a", "b", "c"]:
+        cache.get_or_compute("basic_chat", "질문", answer, scope=scope)
+    cache.lookup("basic_chat", cache._embed("질문"), "a#")
+    assert len(cache._indexes) == 3
+
+    time.sleep(0.1)
+    if cleanup == "evict":
+        with cache._lock:
+            cache._evict(cache._connect())
+    else:
+        cache._last_sweep = 0.0
+        cache.lookup("basic_chat", cache._embed("질문"), "a#")
+    assert cache._indexes == {}
+    assert cache._expires == {}
+    assert cache.get_or_compute("basic_chat", "질문", answer, scope="a") == "답변 4"
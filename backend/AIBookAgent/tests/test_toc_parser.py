@@ -0,0 +1,52 @@
+from AIBookAgent.benchmarks.synthetic import make_books
+from AIBookAgent.toc_parser import parse_toc, parse_toc_soup
+import random
+import pytest
+
+EDGE_CASES = [
+    "",
+    "목차 없음",
+    "<p><b>1장 개요</b><br>1장 개요<br>01. 기본 개념<br>02. 핵심 이론</p>",
+    "<b>A &amp; B</b><br>&lt;부록&gt; &#54620;&#xAE00; &nbsp;정리<br>&unknown; 항목",
+    "<b>굵게 <i>기울임</i> 끝</b><br><i>태그 뒤</i> 텍스트<br>  앞뒤 공백  ",
+    "<B>대문자 태그</B><BR>대문자 br<br/>빈 태그<br />공백 있는 빈 태그",
+    "<b>닫히지 않은 장<br>항목 1<br>항목 2",
+    "</b>여는 태그 없는 닫는 태그<br>항목</p></div>",
+    "<b><b>중첩</b> 장</b><br><br>연속 br 다음<br>",
+    '<a href="x>y">따옴표 안의 꺾쇠</a><br>항목<a href=x/>속성 값의 슬래시<br>끝',
+    "<p>1장<!-- 주석 --><br>주석 뒤 항목</p>",
+    "<b>스크립트</b><script>var s = '<br>';</script><br>스크립트 뒤",
+    "<![CDATA[<br>]]><br>CDATA 뒤",
+    "< b>태그 아님<br>a < b 그리고 c > d<br>",
+]
+
+
+@pytest.mark.parametrize("toc", EDGE_CASES)
+def test_edge_cases_match_beautifulsoup(toc):
+    assert parse_toc(toc) == parse_toc_soup(toc)
+
+
+def test_synthetic_catalog_matches_beautifulsoup():
+    for book in make_books(200, toc_items=40):
+        assert parse_toc(book["toc"]) == parse_toc_soup(book["toc"])
+
+
+def test_random_markup_matches_beautifulsoup():
+    fragments = [
+        "<b>", "</b>", "<br>", "<br/>", "</br>", "<p>", "</p>", "<i>", "</i>", "<B>", "<BR>",
+        "장", "항목 ", " ", "\n", "&amp;", "&lt;", "&#65;", "&nbsp;", "&x;", "<", ">", "'", '"',
+        '<a href="1">', "</a>", "<!-- c -->", "<script>", "</script>",
+    ]
+    rng = random.Random(0)
+    for _ in range(2000):
+        toc = "".join(rng.choice(fragments) for _ in range(rng.randint(1, 30)))
+        assert parse_toc(toc) == parse_toc_soup(toc), toc
+
+
+def test_structure_of_aladin_toc():
+    toc = "<b>1과목 전기자기학</b><br>1과목 전기자기학<br>01. 정전계<br>02. 유전체<br><b>2과목 전력공학</b><br>2과목 전력공학<br>01. 송전"
+    chapters = parse_toc(toc)
+
+    assert [chapter["chapter"] for chapter in chapters] == ["1과목 전기자기학", "2과목 전력공학"]
+    assert chapters[0]["items"] == ["01. 정전계", "02. 유전체"]
+    assert chapters[1]["items"] == ["01. 송전"]
@@ -0,0 +1,45 @@
+from AIBookAgent.benchmarks.synthetic import open_rag
+from AIBookAgent.embedding_provider import EmbeddingMismatchError, EmbeddingProvider
+from AIBookAgent.hybridRAG import CURRENT_STORE_LINK, current_store_dir
+import pickle
+import pytest
+import os
+
+
+def reopen(rag, directory):
+    """같은 임베딩으로 벡터스토어를 다시 여는 AIBooksRAG (로드 전)"""
+    return open_rag(str(directory), rag.embedding_provider)
+
+
+def test_store_is_published_through_current_link(tmp_path, rag):
+    store_path = tmp_path / "books_vectorstore"
+    store_dir = current_store_dir(str(store_path))
+
+    assert os.path.islink(store_path / CURRENT_STORE_LINK)
+    assert os.path.dirname(store_dir) == str(store_path)
+    assert {"index.faiss", "index.pkl", "embedding.json"} <= set(os.listdir(store_dir))
+    assert not (store_path / "index.faiss").exists()
+
+    reopened = reopen(rag, tmp_path)
+    reopened.load_vector_store()
+    assert reopened.vector_store.index.ntotal == rag.vector_store.index.ntotal
+
+
+def test_load_rejects_metadata_from_another_save(tmp_path, rag):
+    metadata_path = os.path.join(current_store_dir(str(tmp_path / "books_vectorstore")), "index.pkl")
+    with open(metadata_path, "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    index_to_docstore_id.pop(0)
+    with open(metadata_path, "wb") as f:
+        pickle.dump((docstore, index_to_docstore_id), f)
+
+    with pytest.raises(Exception, match="index.faiss의 벡터 수"):
+        reopen(rag, tmp_path).load_vector_store()
+
+
+def test_load_rejects_other_embedding(tmp_path, rag):
+    embeddings = rag.embedding_provider.embeddings
+    other = EmbeddingProvider("other", type(embeddings).__name__, None, embeddings)
+
+    with pytest.raises(EmbeddingMismatchError):
+        open_rag(str(tmp_path), other).load_vector_store()
@@ -0,0 +1,179 @@
+from typing import Dict, List
+from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
+import re
+
+# html.parser와 같은 규칙의 태그 (이름은 영문자로 시작, 따옴표 안의 '>'는 태그의 끝이 아님)
+TAG_RE = re.compile(r"""<(/?)([a-zA-Z][^\t\n\r\f />]*)((?:[^>"']|"[^"]*"|'[^']*')*)>""")
+# 빠른 파서가 처리하지 않는 구문 (주석, CDATA, 선언, 내용을 그대로 두는 태그, 잘못된 태그 등) -> BeautifulSoup 사용
+UNSUPPORTED_RE = re.compile(r"<[!?]|</(?![a-zA-Z])|</br\b|<(?:script|style|textarea|title|pre)\b", re.IGNORECASE)
+STRAY_TAG_RE = re.compile(r"</?[a-zA-Z]")
+ENTITY_RE = re.compile(r"&(?:#([0-9]+)|#[xX]([0-9a-fA-F]+)|([a-zA-Z][a-zA-Z0-9]*));")
+UNQUOTED_SLASH_RE = re.compile(r"=\s*[^\s'\"]*/$")  # <a href=x/>의 '/'는 빈 태그 표시가 아니라 속성 값의 일부
+ASCII_SPACES = str.maketrans("", "", " \n\t\x0c\r")
+
+# BeautifulSoup(html.parser)가 닫는 태그 없이 바로 닫는 태그
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta",
+    "param", "source", "track", "wbr", "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer",
+}
+
+
+class _Unsupported(Exception):
+    """빠른 파서로 BeautifulSoup과 같은 결과를 낼 수 없는 입력"""
+
+
+def parse_toc_soup(toc_html: str) -> List[Dict[str, List[str]]]:
+    """BeautifulSoup으로 목차 파싱 (기준 구현)"""
+    soup = BeautifulSoup(toc_html, "html.parser")
+    chapters = [b.get_text() for b in soup.find_all("b")]
+    items = [
+        br.next_sibling.strip()
+        for br in soup.find_all("br")
+        if br.next_sibling and isinstance(br.next_sibling, str)
+    ]
+    return _structure(chapters, items)
+
+
+def parse_toc(toc_html: str) -> List[Dict[str, List[str]]]:
+    """
+    알라딘 <b>/<br> 목차 HTML을 정규식 토크나이저로 파싱 (parse_toc_soup와 같은 결과)
+    - <b> 태그의 텍스트가 장(chapter) 목록, <br> 바로 다음 형제 텍스트가 항목 목록
+    - 트리를 만들지 않고 태그/텍스트를 한 번 훑으면서 BeautifulSoup(html.parser)의 태그 열기/닫기 규칙만 따라감
+    - 주석, script 등 처리하지 않는 구문이 있으면 BeautifulSoup으로 파싱
+    """
+    if UNSUPPORTED_RE.search(toc_html):
+        return parse_toc_soup(toc_html)
+    try:
+        return _parse_fast(toc_html)
+    except _Unsupported:
+        return parse_toc_soup(toc_html)
+
+
+def _unescape(match) -> str:
+    """BeautifulSoup과 같은 방식의 문자 참조 변환 (다르게 처리될 수 있는 값은 _Unsupported)"""
+    decimal, hexadecimal, name = match.groups()
+    if name is not None:
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        if character is None:
+            raise _Unsupported(name)
+        return character
+    code = int(decimal) if decimal is not None else int(hexadecimal, 16)
+    # 128~159는 BeautifulSoup이 windows-1252로 해석
+    if 128 <= code < 160 or code > 0x10FFFF or 0xD800 <= code < 0xE000:
+        raise _Unsupported(code)
+    return chr(code)
+
+
+def _parse_fast(toc_html: str) -> List[Dict[str, List[str]]]:
+    chapters = []
+    items = {}  # <br> 순서 -> 다음 형제 텍스트
+    n_br = 0
+    # 열린 태그 스택: [이름, 마지막 자식이 <br>이면 그 순서]. 맨 아래는 문서 자체
+    stack = [["[document]", None]]
+    open_bold = []  # 열린 <b>의 (chapters 위치, 텍스트 조각 목록)
+    already_closed = []  # html.parser가 이미 닫은 빈 태그 이름 (뒤에 오는 </br> 등은 무시)
+    text_parts = []
+
+    def flush():
+        # 모인 텍스트를 현재 태그의 자식 텍스트 노드로 추가
+        if not text_parts:
+            return
+        text = "".join(text_parts)
+        text_parts.clear()
+        if not text.translate(ASCII_SPACES):
+            text = "\n" if "\n" in text else " "
+        for _, parts in open_bold:
+            parts.append(text)
+        parent = stack[-1]
+        if parent[1] is not None:
+            items[parent[1]] = text.strip()
+            parent[1] = None
+
+    def start(name: str):
+        nonlocal n_br
+        flush()
+        stack[-1][1] = None  # 직전 <br>의 다음 형제가 태그
+        stack.append([name, None])
+        if name == "b":
+            open_bold.append((len(chapters), []))
+            chapters.append("")
+        elif name == "br":
+            stack[-2][1] = n_br
+            n_br += 1
+
+    def end(name: str):
+        flush()
+        if not any(tag[0] == name for tag in stack[1:]):
+            return
+        while True:
+            closed, _ = stack.pop()
+            if closed == "b":
+                index, parts = open_bold.pop()
+                chapters[index] = "".join(parts)
+            if closed == name:
+                return
+
+    position = 0
+    for match in TAG_RE.finditer(toc_html):
+        text = toc_html[position:match.start()]
+        position = match.end()
+        if text:
+            _check_text(text)
+            text_parts.append(ENTITY_RE.sub(_unescape, text) if "&" in text else text)
+
+        closing, name, rest = match.group(1), match.group(2).lower(), match.group(3)
+        if closing:
+            if name in already_closed:
+                already_closed.remove(name)
+            else:
+                end(name)
+        elif rest.endswith("/") and not UNQUOTED_SLASH_RE.search(rest):
+            # <tag/>: 같은 이름의 빈 태그가 앞에서 이미 닫혔으면 html.parser 규칙상 열린 채로 남음
+            start(name)
+            if name in already_closed:
+                already_closed.remove(name)
+            else:
+                end(name)
+        else:
+            start(name)
+            if name in VOID_TAGS:
+                end(name)
+                already_closed.append(name)
+
+    text = toc_html[position:]
+    if text:
+        _check_text(text)
+        text_parts.append(ENTITY_RE.sub(_unescape, text) if "&" in text else text)
+    flush()
+    # 끝까지 닫히지 않은 <b>
+    for index, parts in open_bold:
+        chapters[index] = "".join(parts)
+
+    return _structure(chapters, [items[i] for i in sorted(items)])
+
+
+def _check_text(text: str):
+    """태그로 해석되지 않은 '<태그' 조각이나 변환할 수 없는 '&'가 있으면 _Unsupported"""
+    if STRAY_TAG_RE.search(text):
+        raise _Unsupported(text)
+    if "&" in text and text.count("&") != len(ENTITY_RE.findall(text)):
+        raise _Unsupported(text)
+
+
+def _structure(chapters: List[str], items: List[str]) -> List[Dict[str, List[str]]]:
+    """장 제목과 같은 항목이 나오면 새 장을 시작하고, 나머지 항목은 현재 장에 추가"""
+    chapter_set = set(chapters)
+    structured_toc = []
+    current_chapter = None
+
+    for item in items:
+        if item in chapter_set:
+            current_chapter = item
+            structured_toc.append({"chapter": current_chapter, "items": []})
+        elif current_chapter:
+            structured_toc[-1]["items"].append(item)
+
+    return structured_toc
+
@@ -0,0 +1,189 @@
+from typing import Dict, Iterable, List
+from dotenv import load_dotenv
+import unicodedata
+import hashlib
+import sys
+import json
+import re
+import os
+
+load_dotenv()
+
+# 색인과 질의에 함께 쓰이는 토크나이저 이름 (whitespace, korean)
+RAG_TOKENIZER = os.getenv("RAG_TOKENIZER", "korean")
+
+# 단어 끝에서 떼어낼 조사 (긴 것부터 비교)
+KOREAN_PARTICLES = sorted(
+    ["은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "도", "만", "로", "으로",
+     "에서", "에게", "까지", "부터", "이나", "이란", "란"],
+    key=len,
+    reverse=True,
+)
+PARTICLE_SET = set(KOREAN_PARTICLES)
+
+WORD_RE = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+class WhitespaceTokenizer:
+    """소문자 변환 후 공백 기준으로 분리 (기존 BM25 방식)"""
+
+    name = "whitespace"
+
+    def tokenize(self, text: str) -> List[str]:
+        return text.lower().split()
+
+
+class KoreanTokenizer:
+    """
+    한국어 검색용 토크나이저
+    - 한글/영문/숫자 단위로 분리하고 특수문자는 제거
+    - 한글 단어는 끝의 조사를 떼어낸 형태와 글자 bigram을 함께 생성
+      (예: "전기자기학" -> 전기자기학, 전기, 기자, 자기, 기학)
+    - 붙여 쓴 복합어도 부분 일치로 검색됨
+    """
+
+    name = "korean"
+
+    def __init__(self, ngram: int = 2):
+        self.ngram = ngram
+
+    def strip_particle(self, word: str) -> str:
+        """조사를 떼고도 두 글자 이상 남는 경우에만 조사 제거"""
+        for particle in KOREAN_PARTICLES:
+            if word.endswith(particle) and len(word) - len(particle) >= 2:
+                return word[: -len(particle)]
+        return word
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens = []
+        n = self.ngram
+        for word in WORD_RE.findall(unicodedata.normalize("NFKC", text).lower()):
+            if not "가" <= word[0] <= "힣":
+                tokens.append(word)
+                continue
+
+            if word in PARTICLE_SET:
+                continue  # "Python으로"처럼 영문 뒤에 붙은 조사
+
+            stem = self.strip_particle(word) if len(word) > 2 else word
+            tokens.append(stem)
+            if len(stem) > n:
+                tokens.extend(stem[i:i + n] for i in range(len(stem) - n + 1))
+        return tokens
+
+
+TOKENIZERS = {
+    WhitespaceTokenizer.name: WhitespaceTokenizer,
+    KoreanTokenizer.name: KoreanTokenizer,
+}
+
+
+def get_tokenizer(name: str = None):
+    """이름으로 토크나이저 생성. 이름이 없으면 RAG_TOKENIZER 환경 변수 사용"""
+    name = name or RAG_TOKENIZER
+    if name not in TOKENIZERS:
+        raise ValueError(f"지원하지 않는 토크나이저입니다: {name} (가능한 값: {', '.join(TOKENIZERS)})")
+    return TOKENIZERS[name]()
+
+
+class TokenCache:
+    """
+    문서 내용 해시 -> 토큰 목록을 디스크(JSON Lines)에 보관하는 캐시
+    - 토크나이저마다 파일을 따로 사용 (<cache_dir>/<토크나이저 이름>.jsonl)
+    - BM25 인덱스를 다시 만들 때 이미 토큰화한 문서는 다시 계산하지 않음
+    """
+
+    def __init__(self, tokenizer, cache_dir: str):
+        self.tokenizer = tokenizer
+        self.cache_path = os.path.join(cache_dir, f"{tokenizer.name}.jsonl")
+        self._tokens: Dict[str, List[str]] = None
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _load(self):
+        self._tokens = {}
+        if not os.path.exists(self.cache_path):
+            return
+        with open(self.cache_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 쓰다가 중단된 마지막 줄
+                self._tokens[entry["h"]] = entry["t"]
+
+    def tokenize_corpus(self, texts: Iterable[str]) -> List[List[str]]:
+        """문서 목록을 토큰화. 캐시에 없는 문서만 토큰화하고 결과를 파일 끝에 추가"""
+        if self._tokens is None:
+            self._load()
+
+        corpus = []
+        new_entries = []
+        for text in texts:
+            key = self.content_hash(text)
+            tokens = self._tokens.get(key)
+            if tokens is None:
+                tokens = self.tokenizer.tokenize(text)
+                self._tokens[key] = tokens
+                new_entries.append(json.dumps({"h": key, "t": tokens}, ensure_ascii=False))
+            corpus.append(tokens)
+
+        self._append(new_entries)
+        return corpus
+
+    def add(self, texts: Iterable[str], token_lists: Iterable[List[str]]) -> List[List[str]]:
+        """
+        다른 곳(로더 워커 등)에서 미리 토큰화한 결과를 캐시에 추가하고 문서별 토큰 목록 반환
+        - 캐시에 없던 문서만 파일 끝에 기록
+        - 같은 내용의 문서는 캐시의 토큰 목록 하나를 같이 쓰고, 토큰 문자열은 intern해서 메모리 절약
+          (워커에서 받은 토큰은 문서마다 별도의 문자열 객체)
+        """
+        if self._tokens is None:
+            self._load()
+
+        corpus = []
+        new_entries = []
+        for text, tokens in zip(texts, token_lists):
+            key = self.content_hash(text)
+            cached = self._tokens.get(key)
+            if cached is None:
+                cached = self._tokens[key] = [sys.intern(token) for token in tokens]
+                new_entries.append(json.dumps({"h": key, "t": cached}, ensure_ascii=False))
+            corpus.append(cached)
+        self._append(new_entries)
+        return corpus
+
+    def compact(self, texts: Iterable[str]):
+        """
+        주어진 문서들의 토큰만 남기고 캐시 파일을 다시 씀 (색인에서 빠진 문서의 토큰 정리)
+        - 임시 파일에 쓴 뒤 교체 (색인 잠금을 잡은 상태에서 호출)
+        """
+        if self._tokens is None:
+            self._load()
+
+        keep = {}
+        for text in texts:
+            key = self.content_hash(text)
+            tokens = self._tokens.get(key)
+            if tokens is not None:
+                keep[key] = tokens
+        removed = len(self._tokens) - len(keep)
+        self._tokens = keep
+        if removed == 0:
+            return
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, tokens in keep.items():
+                f.write(json.dumps({"h": key, "t": tokens}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.cache_path)
+
+    def _append(self, entries: List[str]):
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(entries) + "\n")
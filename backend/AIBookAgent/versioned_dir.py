@@ -0,0 +1,63 @@
+from typing import Callable, Optional
+import shutil
+import time
+import os
+
+# 여러 파일로 된 색인을 버전 디렉토리에 쓴 뒤 심볼릭 링크 하나만 바꿔서 한 번에 공개
+# - 읽는 쪽은 링크를 한 번 따라간 디렉토리에서 모든 파일을 읽으므로 서로 다른 버전의 파일이 섞이지 않음
+# - 링크 교체(os.replace)는 원자적이라 읽는 쪽은 이전 버전 또는 새 버전 중 하나만 봄
+# - 이전 버전을 메모리 매핑으로 열고 있는 프로세스는 디렉토리가 지워져도 열린 파일을 계속 사용
+
+KEEP_VERSIONS = 2  # 남겨둘 버전 수 (교체 직전에 링크를 따라간 읽는 쪽이 파일을 다 열 수 있도록)
+
+
+def resolve(link: str) -> Optional[str]:
+    """링크가 가리키는 버전 디렉토리 (아직 공개된 버전이 없으면 None)"""
+    if not os.path.islink(link):
+        return None
+    return os.path.realpath(link)
+
+
+def publish(link: str, write: Callable[[str], None], keep: int = KEEP_VERSIONS) -> str:
+    """
+    write(디렉토리)로 새 버전을 만든 뒤 link가 가리키도록 교체하고, 새 버전 디렉토리 경로를 반환
+    - 버전 디렉토리는 link 옆에 <링크 이름>-<시각> 이름으로 만듦
+    - write가 실패하면 임시 디렉토리만 지우고 기존 버전을 그대로 둠
+    - 쓰는 쪽은 하나뿐이어야 함 (호출하는 쪽에서 잠금을 잡음)
+    """
+    parent, name = os.path.split(link)
+    os.makedirs(parent, exist_ok=True)
+
+    version = f"{name}-{time.time_ns()}"
+    tmp_dir = os.path.join(parent, f".{version}.tmp-{os.getpid()}")
+    os.makedirs(tmp_dir)
+    try:
+        write(tmp_dir)
+        os.rename(tmp_dir, os.path.join(parent, version))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # 링크는 상대 경로 (디렉토리째 옮기거나 다른 경로에 볼륨으로 마운트해도 유지)
+    tmp_link = os.path.join(parent, f".{name}.tmp-{os.getpid()}")
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(version, tmp_link)
+    if os.path.isdir(link) and not os.path.islink(link):
+        # 버전 관리 전에 같은 이름으로 저장한 디렉토리
+        shutil.rmtree(link)
+    os.replace(tmp_link, link)
+
+    _remove_old_versions(parent, name, keep)
+    return os.path.join(parent, version)
+
+
+def _remove_old_versions(parent: str, name: str, keep: int):
+    """최근 keep개를 제외한 버전 디렉토리 삭제"""
+    versions = []
+    for entry in os.listdir(parent):
+        prefix, _, stamp = entry.rpartition("-")
+        if prefix == name and stamp.isdigit():
+            versions.append((int(stamp), entry))
+    for _, entry in sorted(versions)[:-keep]:
+        shutil.rmtree(os.path.join(parent, entry), ignore_errors=True)
@@ -198,3 +198,15 @@ SIMPLE_JWT = {
 MEDIA_URL = '/media/'
 # MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_ROOT = "/app/media"
+
+# 로깅 설정 (AIBookAgent의 주기적 지표 로그를 콘솔로 출력)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "AIBookAgent": {"handlers": ["console"], "level": "INFO"},
+    },
+}
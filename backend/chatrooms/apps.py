@@ -1,6 +1,27 @@
 from django.apps import AppConfig
+import threading
+import sys
+import os
 
 
 class ChatroomsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "chatrooms"
+
+    def ready(self):
+        # migrate, check 등 관리 명령에서는 인덱스를 로드하지 않음 (runserver만 예외)
+        if os.path.basename(sys.argv[0]) == "manage.py" and "runserver" not in sys.argv:
+            return
+
+        from AIBookAgent import metrics
+
+        # 워커별 지표를 RAG_METRICS_LOG_INTERVAL초마다 로그로 내보냄
+        metrics.start_reporter()
+
+        if os.getenv("RAG_PRELOAD", "true").lower() != "true":
+            return
+
+        from AIBookAgent.rag_index import warm_up
+
+        # 워커 부팅이 지연되지 않도록 백그라운드에서 로드. 로드 전에 들어온 요청은 완료될 때까지 대기
+        threading.Thread(target=warm_up, name="rag-warm-up", daemon=True).start()
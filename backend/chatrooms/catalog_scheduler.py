@@ -0,0 +1,44 @@
+import logging
+import os
+
+from apscheduler.schedulers.background import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from django_apscheduler.jobstores import DjangoJobStore
+
+from AIBookAgent.catalog_sync import CatalogSync
+
+# 알라딘 카탈로그 동기화 실행 시각 (매일, Asia/Seoul)
+ALADIN_SYNC_CRON_HOUR = os.getenv("ALADIN_SYNC_CRON_HOUR", "4")
+ALADIN_SYNC_CRON_MINUTE = os.getenv("ALADIN_SYNC_CRON_MINUTE", "0")
+
+# 카탈로그 동기화 전용 스케줄러
+# - 색인 파일(books/, books_vectorstore/)을 직접 고치므로 서버와 같은 파일을 보는 곳에서 실행해야 함
+scheduler = BlockingScheduler({
+    'apscheduler.timezone': 'Asia/Seoul',
+    'apscheduler.job_defaults.coalesce': True,
+    'apscheduler.job_defaults.max_instances': 1,
+    'apscheduler.job_defaults.misfire_grace_time': 3600,
+})
+scheduler.add_jobstore(DjangoJobStore(), "default")
+
+def run_catalog_sync():
+    """설정한 분야를 동기화 (요청 수 한도에 걸리면 다음 실행에서 체크포인트부터 이어감)"""
+    try:
+        result = CatalogSync().run()
+        logging.info(f"Aladin catalog sync finished: {result}")
+    except Exception as e:
+        logging.error(f"Aladin catalog sync failed: {str(e)}")
+
+def start():
+    """스케줄러 시작"""
+    scheduler.add_job(
+        run_catalog_sync,
+        trigger=CronTrigger(hour=ALADIN_SYNC_CRON_HOUR, minute=ALADIN_SYNC_CRON_MINUTE),
+        id="aladin_catalog_sync_job",
+        replace_existing=True
+    )
+    try:
+        scheduler.start()
+        print("Catalog sync scheduler started successfully")
+    except Exception as e:
+        print(f"Error starting catalog sync scheduler: {str(e)}")
@@ -7,7 +7,11 @@ from langchain_core.tools import tool
 from langchain.tools import Tool
 
 from AIBookAgent.aladin import search_aladin
-from AIBookAgent.hybridRAG import AIBooksRAG
+from AIBookAgent import metrics
+from AIBookAgent.rag_index import get_rag_with_version
+from AIBookAgent.result_cache import TTLCache
+from AIBookAgent.embedding_cache import normalize_query
+from AIBookAgent.semantic_cache import SemanticCache, history_scope
 
 from typing import Union, List, Dict
 from pydantic import BaseModel
@@ -142,38 +146,75 @@ class AIAgent:
             raise ValueError(f"Parsing Error: {e}")
 
 
-# tool setting: 도서 검색
-@tool
-def search_books(query: str, k: int = 5):
-    """
-    책을 검색하는 함수 
-    먼저 AIBookRAG의 hybrid 검색을 이용
-    만약 hybrid 검색 결과가 없거나 신뢰도가 낮다면 그냥 알라딘에서 검색 
-    """
-    book_rag = AIBooksRAG()
-    
-    # 벡터스토어 로드
-    book_rag.load_vector_store()
+# 검색 결과 캐시: (정규화한 검색어, k, 인덱스 버전) -> 도서 목록
+# - 인기 시험처럼 같은 검색어가 몰리면 하이브리드 검색/알라딘 검색을 한 번만 실행
+# - 인덱스가 교체되면(hot-swap) 버전이 바뀌므로 이전 결과는 쓰지 않음
+search_results_cache = TTLCache("search_books.cache")
+
+# LLM 답변 시맨틱 캐시: 비슷한 질문(+ 최근 대화 맥락)의 basic_chat / make_plans 답변 재사용
+response_cache = SemanticCache()
+
+
+class LocalFallback(Exception):
+    """알라딘 검색에 실패해서 로컬 검색 결과로 대신함 (이 결과는 검색 결과 캐시에 넣지 않음)"""
 
-    # BM25 초기화
-    book_rag.initialize_bm25()
+    def __init__(self, books):
+        super().__init__("알라딘 검색 실패")
+        self.books = books
 
+
+def _search_books(book_rag, query: str, k: int):
     # 하이브리드 검색
-    results = book_rag.hybrid_search(query, k=5)
+    results = book_rag.hybrid_search(query, k=5, with_relevance=True)
     
-    # 하이브리드 검색 결과의 점수가 낮은 경우 알라딘에서 직접 책 검색 
-    if results[0][1] >= 0.5:
+    # 로컬 코퍼스로 답한 비율(search_books.coverage.hit / miss)과 알라딘 대체 비율을 기록
+    # (카탈로그 동기화로 코퍼스가 늘어날수록 fallback_rate가 줄어야 함)
+    # 관련도 기준은 결합 방식별 설정 (RAG_FALLBACK_THRESHOLD_NORMALIZED / RAG_FALLBACK_THRESHOLD_RRF)
+    local = book_rag.is_relevant(results)
+    metrics.incr(f"search_books.coverage.{'hit' if local else 'miss'}")
+    metrics.set_gauge("search_books.fallback_rate", 1 - metrics.hit_rate("search_books.coverage"))
+
+    # 하이브리드 검색 결과가 없거나(두 검색 모두 시간 초과 등) 점수가 낮은 경우 알라딘에서 직접 책 검색 
+    if local:
         print(f"\n✨ 검색 완료! {len(results)}개의 결과를 찾았습니다.\n")
         books = []
         for result in results:
             books.append(result[0])
         return books
     else:
-        books = search_aladin(query, k)
+        try:
+            books = search_aladin(query, k)
+        except Exception as e:
+            # 알라딘이 느리거나 장애면(차단, 요청 한도 초과, 재시도 실패) 점수가 낮더라도 로컬 결과를 반환
+            metrics.incr("search_books.aladin_error")
+            print(f"⚠️ 알라딘 검색 실패. 로컬 검색 결과를 사용합니다: {str(e)}")
+            raise LocalFallback([result[0] for result in results])
         print(f"\n✨ 검색 완료! {len(books)}개의 결과를 찾았습니다.\n")
         
         return books
 
+
+# tool setting: 도서 검색
+@tool
+def search_books(query: str, k: int = 5):
+    """
+    책을 검색하는 함수 
+    먼저 AIBookRAG의 hybrid 검색을 이용
+    만약 hybrid 검색 결과가 없거나 신뢰도가 낮다면 그냥 알라딘에서 검색 
+    """
+    # 워커 프로세스에 미리 로드된 공유 인덱스 사용
+    # (버전은 인스턴스와 함께 읽음. 따로 읽으면 그 사이 교체된 경우 이전 인덱스의 결과가 새 버전 키로 캐시됨)
+    book_rag, version = get_rag_with_version()
+
+    # 같은 검색어가 동시에 들어오면 한 번만 검색하고 결과를 나눠 가짐
+    key = (normalize_query(query).casefold(), k, version)
+    try:
+        books = search_results_cache.get_or_compute(key, lambda: _search_books(book_rag, query, k))
+    except LocalFallback as e:
+        books = e.books
+    # 캐시된 결과는 다른 요청과 공유하므로 복사해서 반환
+    return [dict(book) for book in books]
+
 # tools 설정
 tools = [
     Tool(
@@ -399,7 +440,13 @@ def make_plans(query: str, chat_history):
     chain = {"question": RunnablePassthrough()} | prompt | LLM
     
     try:
-        response = chain.invoke({"question": query }).content 
+        # 대화 내역이 같고 비슷한 질문의 계획이 캐시에 있으면 재사용 (오늘 날짜가 들어가므로 같은 날짜 안에서만)
+        response = response_cache.get_or_compute(
+            "make_plans",
+            query,
+            lambda: chain.invoke({"question": query }).content,
+            scope=f"{dt.today().strftime('%Y%m%d')}:{history_scope(chat_history)}",
+        )
         return response
     except Exception as e:
         raise ValueError(f"Parsing Error: {e}")
@@ -428,7 +475,13 @@ def basic_chat(query: str, chat_history):
 
     chain = {"question": RunnablePassthrough()} | prompt | LLM
     
-    response = chain.invoke({"question": query }).content 
+    # 대화 내역이 같고 비슷한 질문의 답변이 캐시에 있으면 LLM을 호출하지 않음
+    response = response_cache.get_or_compute(
+        "basic_chat",
+        query,
+        lambda: chain.invoke({"question": query }).content,
+        scope=history_scope(chat_history),
+    )
     
     return response
 
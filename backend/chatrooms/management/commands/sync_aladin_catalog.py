@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from AIBookAgent.catalog_sync import (
+    ALADIN_SYNC_CATEGORIES,
+    ALADIN_SYNC_MAX_PAGES,
+    ALADIN_SYNC_MAX_REQUESTS,
+    CatalogSync,
+)
+import logging
+
+class Command(BaseCommand):
+    help = "Sync Aladin category listings into the local RAG corpus and index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--category", action="append", dest="categories",
+            help="분야 이름, 경로 또는 CID (여러 번 지정 가능, 기본값: ALADIN_SYNC_CATEGORIES)",
+        )
+        parser.add_argument("--max-pages", type=int, default=ALADIN_SYNC_MAX_PAGES, help="CID 하나에서 가져올 최대 페이지 수")
+        parser.add_argument("--max-requests", type=int, default=ALADIN_SYNC_MAX_REQUESTS, help="이번 실행의 최대 요청 수")
+        parser.add_argument("--schedule", action="store_true", help="한 번 실행하지 않고 매일 정해진 시각에 실행")
+
+    def handle(self, *args, **options):
+        if options["schedule"]:
+            from chatrooms.catalog_scheduler import start
+
+            logging.info("Starting catalog sync scheduler process...")
+            try:
+                start()
+            except KeyboardInterrupt:
+                logging.info("Catalog sync scheduler terminated gracefully.")
+            return
+
+        sync = CatalogSync(
+            categories=options["categories"] or ALADIN_SYNC_CATEGORIES,
+            max_pages=options["max_pages"],
+            max_requests=options["max_requests"],
+        )
+        result = sync.run()
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {result['added']} books from {result['completed']}/{result['cids']} categories "
+            f"with {result['requests']} requests in {result['seconds']:.1f}s"
+        ))
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import ChatListView, ChatMsgListView
+from .views import ChatListView, ChatMsgListView, MetricsView
 
 app_name = 'chatrooms'
 
@@ -13,4 +13,7 @@ urlpatterns = [
         ChatMsgListView.as_view(),
         name='chatmessages'
     ),
+
+    # 검색/캐시 지표 조회 (관리자 전용)
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
@@ -1,12 +1,14 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.permissions import BasePermission, IsAuthenticated, IsAdminUser
 from langchain_core.messages import HumanMessage, AIMessage
 
 from .serializers import ChatRoomSerializer, ChatMsgSerializer
 from .models import ChatRoom, ChatMessage
 from .chatbot import chatbot
+from AIBookAgent import metrics
+import os
 
 # 특정 사용자 인증에 대한 class 
 class IsOwner(BasePermission):
@@ -275,4 +277,17 @@ class ChatMsgListView(APIView):
         except Exception as e:
             return Response({
                 "message": f"채팅 메시지 전송 오류 {str(e)}"
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# 검색/캐시/알라딘 지표 조회 (관리자 전용)
+class MetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """
+        요청을 처리한 워커 프로세스의 지표(카운터, 게이지, 소요 시간 백분위수) 조회
+        - 지표는 워커마다 따로 쌓이므로 pid를 함께 반환 (전체 워커 값은 주기적 로그로 확인)
+        """
+        return Response({"pid": os.getpid(), **metrics.snapshot()}, status=status.HTTP_200_OK)
+